@@ -1352,6 +1352,21 @@ def init_infer_service():
         #     logging.error("启动推理服务失败")
 
 
+@click.command(
+    "backfill-app-statistics", help="重新生成应用每日统计（含可合并的中间状态）"
+)
+@click.option("--days", default=30, help="回填最近多少天，默认30天")
+def backfill_app_statistics(days):
+    from datetime import date, timedelta
+
+    from parts.cost_audit.service import CostService
+
+    for offset in range(days, 0, -1):
+        stat_date = date.today() - timedelta(days=offset)
+        CostService.daily_app_statistics(stat_date)
+        click.echo(f"应用统计已回填: {stat_date.isoformat()}")
+
+
 def register_commands(app):
     app.cli.add_command(reset_password)
     app.cli.add_command(upgrade_db)
@@ -1373,3 +1388,4 @@ def register_commands(app):
     app.cli.add_command(init_apps)
     app.cli.add_command(init_mcp_service)
     app.cli.add_command(init_infer_service)
+    app.cli.add_command(backfill_app_statistics)
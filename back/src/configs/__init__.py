@@ -21,6 +21,11 @@ class LazyConfig(MailConfig, DatabaseConfig, RedisConfig):
         description="CELERY_BROKER_URL", default=None
     )
 
+    TOOL_LOG_REDIS_SPILL: bool = Field(
+        description="whether to keep recent tool logs in redis for late joiners.",
+        default=False,
+    )
+
     @computed_field
     @property
     def CELERY_RESULT_BACKEND(self) -> str | None:
@@ -14,11 +14,14 @@
 # limitations under the License.
 
 import base64
+import json
 import logging
 import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
 
+from sqlalchemy.orm import make_transient_to_detached
+
 from core.languages import language_timezone_mapping
 from libs.helper import RateLimiter, TokenManager
 from libs.http_exception import CommonError
@@ -65,6 +68,22 @@ class Constants:
 
     # 活动时间间隔
     ACTIVE_TIME_THRESHOLD_MINUTES = 10
+    LAST_ACTIVE_CACHE_PREFIX = "account_last_active"
+
+    # 认证主体缓存
+    PRINCIPAL_CACHE_PREFIX = "account_principal"
+    PRINCIPAL_CACHE_TTL_SECONDS = 5 * 60
+    # 只缓存认证和常用展示所需的字段，密码等敏感字段不写入缓存，访问时从数据库加载
+    PRINCIPAL_CACHE_FIELDS = (
+        "id",
+        "name",
+        "email",
+        "avatar",
+        "interface_language",
+        "timezone",
+        "status",
+        "last_active_at",
+    )
 
 
 logger = logging.getLogger(__name__)
@@ -111,6 +130,100 @@ def _get_login_cache_key(*, account_id: str, token: str) -> str:
     return f"{Constants.LOGIN_CACHE_PREFIX}:{account_id}:{token}"
 
 
+def _get_principal_cache_key(account_id: str) -> str:
+    """生成认证主体缓存键。
+
+    Args:
+        account_id (str): 账户ID。
+
+    Returns:
+        str: 格式化的缓存键字符串。
+    """
+    return f"{Constants.PRINCIPAL_CACHE_PREFIX}:{account_id}"
+
+
+class PrincipalCache:
+    """已认证主体缓存。
+
+    缓存已解析的账户字段、当前租户ID和角色，使请求认证只需一次 Redis 往返，
+    不再查询数据库。账户登出、被封禁或角色、租户变更时需调用 invalidate 失效。
+    """
+
+    @staticmethod
+    def save(account: Account) -> None:
+        """写入账户的认证主体缓存。
+
+        Args:
+            account (Account): 已通过 load_user 加载的账户对象。
+        """
+        values = {}
+        for key in Constants.PRINCIPAL_CACHE_FIELDS:
+            value = getattr(account, key)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            values[key] = value
+
+        tenant = account.current_tenant
+        data = {
+            "account": values,
+            "tenant_id": tenant.id if tenant else None,
+            "role": tenant.current_role if tenant else None,
+        }
+        try:
+            redis_client.set(
+                _get_principal_cache_key(account.id),
+                json.dumps(data),
+                ex=Constants.PRINCIPAL_CACHE_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f"写入认证缓存失败: {e}")
+
+    @staticmethod
+    def restore(raw) -> Optional[Account]:
+        """从缓存内容恢复账户对象并挂载到当前会话, 不产生数据库查询。
+
+        Args:
+            raw (bytes | str): 缓存中的 JSON 内容。
+
+        Returns:
+            Optional[Account]: 恢复的账户对象，缓存内容无效时返回 None。
+        """
+        try:
+            data = json.loads(raw)
+            values = {
+                key: value
+                for key, value in data["account"].items()
+                if key in Constants.PRINCIPAL_CACHE_FIELDS
+            }
+            for column in Account.__table__.columns:
+                if isinstance(column.type, db.DateTime) and values.get(column.key):
+                    values[column.key] = datetime.fromisoformat(values[column.key])
+            account = Account(**values)
+        except Exception as e:
+            logger.warning(f"认证缓存内容无效: {e}")
+            return None
+
+        make_transient_to_detached(account)
+        account = db.session.merge(account, load=False)
+        account.set_cached_current_tenant(data.get("tenant_id"), data.get("role"))
+        return account
+
+    @staticmethod
+    def invalidate(*account_ids: str) -> None:
+        """使指定账户的认证主体缓存失效。
+
+        Args:
+            *account_ids (str): 账户ID列表。
+        """
+        keys = [_get_principal_cache_key(account_id) for account_id in account_ids]
+        if not keys:
+            return
+        try:
+            redis_client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"清理认证缓存失败: {e}")
+
+
 class PasswordManager:
     """密码管理器类。
 
@@ -284,15 +397,38 @@ class AccountService:
             available_ta.current = True
             db.session.commit()
 
-        # 更新最后活动时间
+        AccountService.touch_last_active(account)
+        return account
+
+    @staticmethod
+    def touch_last_active(account: Account) -> None:
+        """合并更新最后活动时间。
+
+        每个账户在活动时间间隔内最多触发一次更新，由 Redis 键在多个进程间去重，
+        实际写库交给后台任务完成，不占用请求路径。
+
+        Args:
+            account (Account): 账户对象。
+        """
         current_time = TimeTools.now_datetime_china()
-        if current_time - account.last_active_at > timedelta(
-            minutes=Constants.ACTIVE_TIME_THRESHOLD_MINUTES
-        ):
-            account.last_active_at = current_time
-            db.session.commit()
+        threshold = timedelta(minutes=Constants.ACTIVE_TIME_THRESHOLD_MINUTES)
+        if account.last_active_at and current_time - account.last_active_at <= threshold:
+            return
 
-        return account
+        try:
+            if not redis_client.set(
+                f"{Constants.LAST_ACTIVE_CACHE_PREFIX}:{account.id}",
+                "1",
+                nx=True,
+                ex=int(threshold.total_seconds()),
+            ):
+                return
+
+            from tasks.account_task import update_account_last_active_task
+
+            update_account_last_active_task.delay(account.id, current_time.isoformat())
+        except Exception as e:
+            logger.warning(f"更新用户 {account.id} 最后活动时间失败: {e}")
 
     @staticmethod
     def get_account_jwt_token(account: Account, days: int = None) -> str:
@@ -476,6 +612,7 @@ class AccountService:
 
         try:
             db.session.commit()
+            PrincipalCache.invalidate(account.id)
             logger.info(f"用户 {account.id} 密码更新成功")
         except Exception as e:
             db.session.rollback()
@@ -567,6 +704,7 @@ class AccountService:
                     raise AttributeError(f"Invalid key: {key}")
 
             db.session.commit()
+            PrincipalCache.invalidate(account.id)
             logger.info(f"账户 {account.id} 信息更新成功")
             return account
 
@@ -618,14 +756,36 @@ class AccountService:
     @staticmethod
     def logout(*, account: Account, token: str):
         redis_client.delete(_get_login_cache_key(account_id=account.id, token=token))
+        PrincipalCache.invalidate(account.id)
 
     @staticmethod
     def load_logged_in_account(*, account_id: str, token: str):
-        if not redis_client.get(
-            _get_login_cache_key(account_id=account_id, token=token)
-        ):
+        """加载已登录的账户。
+
+        登录令牌与认证主体缓存在一次 Redis 往返中读取，缓存命中时不查询数据库。
+
+        Args:
+            account_id (str): 账户ID。
+            token (str): 登录令牌。
+
+        Returns:
+            Optional[Account]: 令牌有效时返回账户对象，否则返回 None。
+        """
+        logged_in, principal = redis_client.mget(
+            _get_login_cache_key(account_id=account_id, token=token),
+            _get_principal_cache_key(account_id),
+        )
+        if not logged_in:
             return None
-        return AccountService.load_user(account_id)
+
+        account = PrincipalCache.restore(principal) if principal else None
+        if account is None:
+            account = AccountService.load_user(account_id)
+            PrincipalCache.save(account)
+            return account
+
+        AccountService.touch_last_active(account)
+        return account
 
     @classmethod
     def send_reset_password_email(cls, account):
@@ -786,6 +946,7 @@ class TenantService:
             if ta.role != role:
                 ta.role = role
                 db.session.commit()
+                PrincipalCache.invalidate(account_id)
                 return True
             else:
                 return False
@@ -912,6 +1073,7 @@ class TenantService:
             # Set the current tenant for the account
             account.current_tenant_id = ta.tenant_id
             db.session.commit()
+            PrincipalCache.invalidate(account.id)
 
     @classmethod
     def get_all_members(cls, args, tenant_id, only_self=None):
@@ -14,9 +14,10 @@
 # limitations under the License.
 
 import logging
-from collections import OrderedDict
+import uuid
 
 import sqlalchemy
+from sqlalchemy import exists, literal, or_, select, union_all
 
 from libs.http_exception import BaseHTTPError, CommonError
 from models.model_account import Tenant  # noqa
@@ -32,7 +33,8 @@ from parts.knowledge_base.model import KnowledgeBase
 from parts.models_hub.model import Lazymodel, LazymodelOnlineModels, AITools
 from parts.prompt.model import Prompt
 from parts.tools.model import Tool
-from utils.util_database import db
+from utils.util_database import db, invalidate_on_commit
+from utils.util_redis import redis_client
 
 
 class LeftAssetError(BaseHTTPError):
@@ -95,6 +97,239 @@ def sort_asset_models():
 sort_asset_models()
 
 
+def _owner_column(modelcls):
+    """返回资产模型中表示所有者的列。"""
+    if modelcls in CREATED_MODELS:
+        return modelcls.created_by
+    return modelcls.user_id
+
+
+def _query_owned_pairs(pairs):
+    """用一条 UNION ALL 查询检查各 (租户, 账户) 组合是否存在资产。
+
+    每个组合对应一个分支，分支内对每类资产做 EXISTS 判断，
+    数据库找到一条记录即可返回，不必扫描账户拥有的全部记录。
+
+    Args:
+        pairs (list): (tenant_id, account_id) 列表，租户为 None 时不按租户过滤。
+
+    Returns:
+        set: 存在资产的 (tenant_id, account_id) 集合。
+    """
+    selects = []
+    for index, (tenant_id, account_id) in enumerate(pairs):
+        conditions = []
+        for modelcls in CREATED_MODELS + USERNAME_MODELS + USERID_MODELS:
+            stmt = exists().where(_owner_column(modelcls) == account_id)
+            if tenant_id is not None:
+                stmt = stmt.where(modelcls.tenant_id == tenant_id)
+            conditions.append(stmt)
+        selects.append(
+            select(literal(index).label("idx"), or_(*conditions).label("owned"))
+        )
+    rows = db.session.execute(union_all(*selects)).all()
+    return {pairs[index] for index, owned in rows if owned}
+
+
+def _query_tenant_only_assets(tenant_ids):
+    """找出存在只属于租户（无所有者）资产的租户，每个租户一个 EXISTS 分支。"""
+    if not TENANT_ONLY_MODELS or not tenant_ids:
+        return set()
+    selects = [
+        select(
+            literal(index).label("idx"),
+            or_(
+                *[
+                    exists().where(modelcls.tenant_id == tenant_id)
+                    for modelcls in TENANT_ONLY_MODELS
+                ]
+            ).label("owned"),
+        )
+        for index, tenant_id in enumerate(tenant_ids)
+    ]
+    rows = db.session.execute(union_all(*selects)).all()
+    return {tenant_ids[index] for index, owned in rows if owned}
+
+
+class AssetFlagCache:
+    """资产存在标记缓存。
+
+    以 (租户, 账户) 为单位在 Redis 中记录是否存在资产，账户为空表示只属于租户的资产，
+    租户为空表示账户在所有租户下的资产。缓存键同时包含全局版本号和该组合自己的版本号，
+    资产的新增、删除或归属变化在事务提交后只刷新受影响组合的版本号，
+    无法确定具体记录的批量修改才递增全局版本号。
+    """
+
+    VERSION_KEY = "asset_flag:version"
+    FLAG_PREFIX = "asset_flag"
+    EXPIRE_SECONDS = 24 * 3600
+
+    @classmethod
+    def _key(cls, version, tenant_id, account_id):
+        return f"{cls.FLAG_PREFIX}:{version}:{tenant_id or '*'}:{account_id or '*'}"
+
+    @classmethod
+    def _version_key(cls, tenant_id, account_id):
+        return f"{cls.VERSION_KEY}:{tenant_id or '*'}:{account_id or '*'}"
+
+    @classmethod
+    def get_many(cls, pairs):
+        """批量读取标记。
+
+        Args:
+            pairs (list): (tenant_id, account_id) 列表。
+
+        Returns:
+            tuple: (各组合的版本号字典, 命中的标记字典)，Redis 不可用时版本号为 None。
+        """
+        try:
+            values = redis_client.mget(
+                [cls.VERSION_KEY] + [cls._version_key(*pair) for pair in pairs]
+            )
+            global_version = values[0].decode("utf-8") if values[0] else "0"
+            versions = {
+                pair: f"{global_version}.{value.decode('utf-8') if value else '0'}"
+                for pair, value in zip(pairs, values[1:])
+            }
+            values = redis_client.mget(
+                [cls._key(versions[pair], *pair) for pair in pairs]
+            )
+        except Exception as e:
+            logging.warning(f"Failed to read asset flags: {e}")
+            return None, {}
+        return versions, {
+            pair: value == b"yes"
+            for pair, value in zip(pairs, values)
+            if value is not None
+        }
+
+    @classmethod
+    def set_many(cls, versions, flags):
+        """批量写入标记，versions 为读取时的版本号，期间发生变化的写入自然失效。"""
+        if versions is None or not flags:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for pair, has_assets in flags.items():
+                pipe.setex(
+                    cls._key(versions[pair], *pair),
+                    cls.EXPIRE_SECONDS,
+                    "yes" if has_assets else "no",
+                )
+            pipe.execute()
+        except Exception as e:
+            logging.warning(f"Failed to write asset flags: {e}")
+
+    @classmethod
+    def invalidate(cls, pairs=None):
+        """资产变化后调用，使受影响组合的标记失效。
+
+        Args:
+            pairs: 受影响的 (tenant_id, account_id) 集合，为 None 时使所有标记失效。
+        """
+        try:
+            if pairs is None:
+                redis_client.incr(cls.VERSION_KEY)
+                return
+            pipe = redis_client.pipeline(transaction=False)
+            for pair in pairs:
+                # 版本号取随机值，过期后重新生成也不会与旧标记的键重合
+                pipe.setex(
+                    cls._version_key(*pair), cls.EXPIRE_SECONDS * 2, uuid.uuid4().hex
+                )
+            pipe.execute()
+        except Exception as e:
+            logging.warning(f"Failed to invalidate asset flags: {e}")
+
+    @classmethod
+    def load(cls, tenant_ids, account_ids):
+        """读取一批 (租户, 账户) 的资产标记，未命中的组合合并为一次查询。
+
+        Args:
+            tenant_ids: 租户 ID 列表，为 None 时检查账户在所有租户下的资产。
+            account_ids: 账户 ID 列表，为 None 时检查只属于租户的资产。
+
+        Returns:
+            dict: (tenant_id, account_id) 到是否存在资产的映射。
+        """
+        tenant_ids = None if tenant_ids is None else [str(_id) for _id in tenant_ids]
+        account_ids = (
+            None if account_ids is None else [str(_id) for _id in account_ids]
+        )
+        pairs = [
+            (tenant_id, account_id)
+            for tenant_id in (tenant_ids if tenant_ids is not None else [None])
+            for account_id in (account_ids if account_ids is not None else [None])
+        ]
+        versions, flags = cls.get_many(pairs)
+        missing = [pair for pair in pairs if pair not in flags]
+        if not missing:
+            return flags
+
+        if account_ids is None:
+            found = {
+                (tenant_id, None)
+                for tenant_id in _query_tenant_only_assets(
+                    [tenant_id for tenant_id, _ in missing]
+                )
+            }
+        else:
+            found = _query_owned_pairs(missing)
+        loaded = {pair: pair in found for pair in missing}
+        cls.set_many(versions, loaded)
+        flags.update(loaded)
+        return flags
+
+
+def _changed_asset_pairs(obj):
+    """返回资产记录变化时受影响的标记组合，归属变化时新旧归属都会受影响。
+
+    归属字段未加载（如提交后过期再修改或删除）时无法确定旧归属，返回 None。
+    """
+    state = sqlalchemy.inspect(obj)
+    keys = ["tenant_id"]
+    if type(obj) not in TENANT_ONLY_MODELS:
+        keys.append(_owner_column(type(obj)).key)
+
+    values = {}
+    for key in keys:
+        history = state.attrs[key].history
+        if key in state.unloaded or (
+            history.added and not history.deleted and not state.pending
+        ):
+            return None
+        values[key] = {
+            str(value)
+            for value in history.sum()
+            if value
+        }
+
+    tenant_ids = values["tenant_id"]
+    if len(keys) == 1:
+        return {(tenant_id, None) for tenant_id in tenant_ids}
+    pairs = set()
+    for account_id in values[keys[1]]:
+        pairs.add((None, account_id))
+        pairs.update((tenant_id, account_id) for tenant_id in tenant_ids)
+    return pairs
+
+
+ASSET_MODELS = frozenset(
+    CREATED_MODELS + USERNAME_MODELS + USERID_MODELS + TENANT_ONLY_MODELS
+)
+
+invalidate_on_commit(
+    "asset_flag_changed",
+    # 资产的新增、删除或归属变化都会影响资产标记
+    {
+        modelcls.__tablename__: ("tenant_id", "created_by", "user_id")
+        for modelcls in ASSET_MODELS
+    },
+    AssetFlagCache.invalidate,
+    collect=_changed_asset_pairs,
+)
+
+
 class AssetManager:
     """资产管理器。
 
@@ -113,41 +348,27 @@ class AssetManager:
     def _has_no_assets(self, tenant_id, account_id):
         """检查指定租户和账户是否没有任何资产。
 
+        优先读取 Redis 中的资产标记，未命中时每类检查只执行一条 UNION ALL 查询。
+
         Args:
             tenant_id: 租户 ID，如果为 None 则不按租户过滤。
-            account_id: 账户 ID，如果为 None 则不按账户过滤。
+            account_id: 账户 ID。
 
         Returns:
             bool: 如果没有任何资产返回 True，否则返回 False。
         """
-        odict = OrderedDict()
-        if tenant_id:
-            odict["tenant_id"] = str(tenant_id)
-        if account_id:
-            odict["created_by"] = str(account_id)
-        for modelcls in CREATED_MODELS:
-            if modelcls.query.filter_by(**odict).first():
-                logging.info(f"have assets: {modelcls.__name__}, query={odict}")
-                return False
-
-        odict = OrderedDict()
-        if tenant_id:
-            odict["tenant_id"] = str(tenant_id)
-        if account_id:
-            odict["user_id"] = str(account_id)
-        for modelcls in USERNAME_MODELS + USERID_MODELS:
-            if modelcls.query.filter_by(**odict).first():
-                logging.info(f"have assets: {modelcls.__name__}, query={odict}")
-                return False
+        tenant_ids = [tenant_id] if tenant_id else None
+        flags = AssetFlagCache.load(tenant_ids, [account_id])
+        if any(flags.values()):
+            logging.info(f"have assets: tenant={tenant_id}, account={account_id}")
+            return False
 
         # 检查只有 tenant_id 的模型
         if tenant_id:
-            odict = OrderedDict()
-            odict["tenant_id"] = str(tenant_id)
-            for modelcls in TENANT_ONLY_MODELS:
-                if modelcls.query.filter_by(**odict).first():
-                    logging.info(f"have assets: {modelcls.__name__}, query={odict}")
-                    return False
+            flags = AssetFlagCache.load(tenant_ids, None)
+            if any(flags.values()):
+                logging.info(f"have tenant assets: tenant={tenant_id}")
+                return False
 
         return True
 
@@ -270,7 +491,6 @@ class AssetManager:
             LeftAssetError: 当账户在租户下有资产时抛出，提示需要先转移资产。
         """
         if not self._has_no_assets(tenant.id, account.id):
-            self.set_has_assets(tenant.id, account.id, "yes")
             if self.operator.id == account.id:
                 raise LeftAssetError(
                     "您在本工作空间内存在资产，无法退出，请先进行资产转移后再操作"
@@ -279,8 +499,6 @@ class AssetManager:
                 raise LeftAssetError(
                     f"用户：{account.name}，在工作空间内存在资产，无法删除，请先进行资产转移后再操作"
                 )
-        else:
-            self.set_has_assets(tenant.id, account.id, "no")
 
     def check_tenant_assets(self, tenant):
         """检查租户的资产状态。
@@ -379,116 +597,49 @@ class AssetManager:
 
     @staticmethod
     def set_has_assets(tenant_id, account_id, v):
-        """设置账户资产状态标记。
+        """设置账户在租户下的资产标记。
+
+        资产转移提交后调用，直接写入新的标记，之后的检查无需再查询数据库。
 
         Args:
             tenant_id: 租户 ID。
             account_id: 账户 ID。
-            v: 资产状态值。
-
-        Note:
-            此方法已废弃，逻辑改为从数据库实时读取而不是从 Redis。
+            v: 资产状态值，"yes" 或 "no"。
         """
-        return  # 后续不需要执行了, 逻辑废弃: 从数据库实时读取而不是从redis
+        pair = (str(tenant_id), str(account_id))
+        versions, _ = AssetFlagCache.get_many([pair])
+        AssetFlagCache.set_many(versions, {pair: v == "yes"})
 
     @staticmethod
     def get_tenant_list_account_assets(tenant_id_list, account_id):
-        """获取账户在多个租户中的资产统计。
-
-        统计指定账户在给定租户列表中每个租户下的资产数量。
+        """获取账户在多个租户中是否存在资产。
 
         Args:
             tenant_id_list: 租户 ID 列表。
             account_id: 账户 ID。
 
         Returns:
-            dict: 租户 ID 到资产数量的映射字典。
+            dict: 租户 ID 到是否存在资产的映射字典。
         """
-        account_id = str(account_id)
-        result = {str(_id): 0 for _id in tenant_id_list}
-
-        def build_result(queryset):
-            """构建结果统计。
-
-            Args:
-                queryset: 数据库查询结果集。
-            """
-            for tenant_id, count in queryset:
-                tenant_id = str(tenant_id)
-                if tenant_id in result:
-                    result[tenant_id] += count
-
-        odict = {"created_by": account_id}
-        for modelcls in CREATED_MODELS:
-            queryset = (
-                db.session.query(
-                    modelcls.tenant_id, sqlalchemy.func.count(modelcls.tenant_id)
-                )
-                .filter_by(**odict)
-                .group_by(modelcls.tenant_id)
-            )
-            build_result(queryset)
-
-        odict = {"user_id": account_id}
-        for modelcls in USERNAME_MODELS + USERID_MODELS:
-            queryset = (
-                db.session.query(
-                    modelcls.tenant_id, sqlalchemy.func.count(modelcls.tenant_id)
-                )
-                .filter_by(**odict)
-                .group_by(modelcls.tenant_id)
-            )
-            build_result(queryset)
-
-        return result
+        if not tenant_id_list:
+            return {}
+        flags = AssetFlagCache.load(tenant_id_list, [account_id])
+        return {tenant_id: has_assets for (tenant_id, _), has_assets in flags.items()}
 
     @staticmethod
     def get_account_list_tenant_assets(account_id_list, tenant_id):
-        """获取租户内多个账户的资产统计。
-
-        统计指定租户内给定账户列表中每个账户的资产数量。
+        """获取租户内多个账户是否存在资产。
 
         Args:
             account_id_list: 账户 ID 列表。
             tenant_id: 租户 ID。
 
         Returns:
-            dict: 账户 ID 到资产数量的映射字典。
+            dict: 账户 ID 到是否存在资产的映射字典。
         """
-        tenant_id = str(tenant_id)
-        result = {str(_id): 0 for _id in account_id_list}
-
-        def build_result(queryset):
-            """构建结果统计。
-
-            Args:
-                queryset: 数据库查询结果集。
-            """
-            for account_id, count in queryset:
-                account_id = str(account_id)
-                if account_id in result:
-                    result[account_id] += count
-
-        odict = {"tenant_id": tenant_id}
-        for modelcls in CREATED_MODELS:
-            queryset = (
-                db.session.query(
-                    modelcls.created_by, sqlalchemy.func.count(modelcls.created_by)
-                )
-                .filter_by(**odict)
-                .group_by(modelcls.created_by)
-            )
-            build_result(queryset)
-
-        odict = {"tenant_id": tenant_id}
-        for modelcls in USERNAME_MODELS + USERID_MODELS:
-            queryset = (
-                db.session.query(
-                    modelcls.user_id, sqlalchemy.func.count(modelcls.user_id)
-                )
-                .filter_by(**odict)
-                .group_by(modelcls.user_id)
-            )
-            build_result(queryset)
-
-        return result
+        if not account_id_list:
+            return {}
+        flags = AssetFlagCache.load([tenant_id], account_id_list)
+        return {
+            account_id: has_assets for (_, account_id), has_assets in flags.items()
+        }
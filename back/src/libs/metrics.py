@@ -0,0 +1,214 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import logging
+import math
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 默认耗时分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}")
+        return tuple(str(v) for v in labels)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        """产出 (后缀, 标签串, 值)。"""
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield "", _format_labels(self.labelnames, labels), value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """单调递增的计数器。"""
+
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """可增可减的当前值。
+
+    传入 collect 时在导出时调用它读取最新值，适合队列长度这类只在抓取时才需要的数据。
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def set(self, *labels, value):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, *labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self._collect is not None:
+            try:
+                for labels, value in self._collect():
+                    self.set(*labels, value=value)
+            except Exception as e:
+                logging.warning(f"Failed to collect metric {self.name}: {e}")
+        yield from super().samples()
+
+
+class Histogram(_Metric):
+    """按分桶统计的分布。"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # 各桶的非累计计数（最后一个为 +Inf）、总和
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *labels):
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted(
+                (labels, (list(state[0]), state[1]))
+                for labels, state in self._values.items()
+            )
+        bounds = self.buckets + (math.inf,)
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield "_bucket", _format_labels(
+                    self.labelnames, labels, [("le", _format_value(float(bound)))]
+                ), cumulative
+            label_str = _format_labels(self.labelnames, labels)
+            yield "_sum", label_str, total
+            yield "_count", label_str, cumulative
+
+
+class MetricsRegistry:
+    """进程内指标注册表，按 Prometheus 文本格式导出。"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"指标 {metric.name} 已注册为其他类型")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), collect=None):
+        return self._register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def clear(self):
+        """清空全部指标的数据，注册关系保留。"""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def render(self):
+        """导出全部指标。
+
+        Returns:
+            str: Prometheus 文本格式。
+        """
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,151 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import json
+import math
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+class KeysetPage:
+    """列表分页结果。
+
+    属性与 Flask-SQLAlchemy 的 Pagination 保持一致，原有 marshal 字段无需修改；
+    额外提供 next_cursor，客户端传回即可按游标翻页。
+    """
+
+    def __init__(self, items, page, per_page, total, has_next, next_cursor):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.has_next = has_next
+        self.next_cursor = next_cursor
+
+    @property
+    def pages(self):
+        if not self.per_page or self.total is None:
+            return 0
+        return math.ceil(self.total / self.per_page)
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values, total=None):
+    """把排序键的值编码为游标字符串，total 为首页统计的总数，随游标带到后续页。"""
+    data = [_encode_value(v) for v in values]
+    if total is not None:
+        data = {"keys": data, "total": total}
+    data = json.dumps(data, default=str)
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor):
+    """解析游标字符串，返回 (排序键的值, 总数)，格式错误时抛出 ValueError。"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("无效的分页游标") from None
+    total = None
+    if isinstance(data, dict):
+        total = data.get("total")
+        data = data.get("keys")
+    if not isinstance(data, list) or not (total is None or isinstance(total, int)):
+        raise ValueError("无效的分页游标")
+    return [_decode_value(v) for v in data], total
+
+
+def decode_cursor(cursor):
+    """解析游标字符串，格式错误时抛出 ValueError。"""
+    return _decode_cursor(cursor)[0]
+
+
+def _keyset_filter(order_columns, values):
+    """构造 (c1, c2, ...) < (v1, v2, ...) 的条件，所有排序键均为降序。"""
+    clauses = []
+    for i, (column, value) in enumerate(zip(order_columns, values)):
+        equals = [c == v for c, v in zip(order_columns[:i], values[:i])]
+        clauses.append(and_(*equals, column < value))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, order_columns, page=1, per_page=20, cursor=None):
+    """按排序键进行游标分页。
+
+    传入 cursor 时从游标位置之后取下一页，深翻页与首页代价相同；
+    未传入时按 page 偏移，兼容只传页码的调用方。
+    总数只在不带游标的请求中统计，并随 next_cursor 带到后续页，
+    按游标翻页不再执行 COUNT；重新从首页查询即可看到新增和删除后的总数。
+
+    Args:
+        query: 已包含筛选条件、未排序的 Query。
+        order_columns (list): 降序排序键，最后一个应为主键以保证顺序唯一。
+        page (int, optional): 页码，从 1 开始。
+        per_page (int, optional): 每页数量。
+        cursor (str, optional): 上一页返回的 next_cursor。
+
+    Returns:
+        KeysetPage: 分页结果。查询包含多个实体时 items 中每项为元组。
+
+    Raises:
+        ValueError: 游标格式错误时抛出。
+    """
+    page = max(page or 1, 1)
+    entity_count = len(query.column_descriptions)
+    total = None
+
+    page_query = query.add_columns(
+        *[column.label(f"_keyset_{i}") for i, column in enumerate(order_columns)]
+    ).order_by(*[column.desc() for column in order_columns])
+    if cursor:
+        values, total = _decode_cursor(cursor)
+        page_query = page_query.filter(_keyset_filter(order_columns, values))
+    elif page > 1:
+        page_query = page_query.offset((page - 1) * per_page)
+    if total is None:
+        total = query.order_by(None).count()
+    rows = page_query.limit(per_page + 1).all()
+
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    items = [row[0] if entity_count == 1 else tuple(row[:entity_count]) for row in rows]
+    next_cursor = (
+        encode_cursor(rows[-1][entity_count:], total) if has_next else None
+    )
+    return KeysetPage(items, page, per_page, total, has_next, next_cursor)
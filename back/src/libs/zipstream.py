@@ -0,0 +1,147 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import urllib.parse
+import zipfile
+
+from flask import Response, stream_with_context
+
+# 读取文件和输出数据块的大小
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkBuffer:
+    """不可寻址的输出缓冲，zipfile 写入的数据暂存于此，由调用方取走。"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStreamWriter:
+    """流式 ZIP 写入器。
+
+    条目内容边写入边压缩，每个 add_* 方法都是生成器，产出已经压缩好的字节块，
+    可直接作为 HTTP 响应体发送。内存占用只与单个数据块大小有关，不需要临时文件。
+
+    示例:
+        writer = ZipStreamWriter()
+        yield from writer.add_bytes("info.txt", b"...")
+        yield from writer.finish()
+    """
+
+    def __init__(self, compression=zipfile.ZIP_DEFLATED):
+        self._buffer = _ChunkBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, "w", compression=compression)
+
+    def _drain(self):
+        data = self._buffer.pop()
+        if data:
+            yield data
+
+    def add_stream(self, arcname, chunks):
+        """写入内容由多个数据块组成的条目。
+
+        Args:
+            arcname (str): 条目在压缩包中的名称。
+            chunks (Iterable[bytes | str]): 条目内容，字符串按 UTF-8 编码。
+
+        Yields:
+            bytes: 压缩后的数据块。
+        """
+        with self._zip.open(arcname, "w", force_zip64=True) as entry:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                entry.write(chunk)
+                yield from self._drain()
+        yield from self._drain()
+
+    def add_bytes(self, arcname, data):
+        """写入内容已在内存中的条目。
+
+        Args:
+            arcname (str): 条目在压缩包中的名称。
+            data (bytes | str): 条目内容。
+
+        Yields:
+            bytes: 压缩后的数据块。
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._zip.writestr(arcname, data)
+        yield from self._drain()
+
+    def add_file(self, file_path, arcname):
+        """按块读取本地文件并写入条目。
+
+        Args:
+            file_path (str): 本地文件路径。
+            arcname (str): 条目在压缩包中的名称。
+
+        Yields:
+            bytes: 压缩后的数据块。
+        """
+        zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+        zinfo.compress_type = self._zip.compression
+        with open(file_path, "rb") as src, self._zip.open(zinfo, "w") as entry:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                entry.write(chunk)
+                yield from self._drain()
+        yield from self._drain()
+
+    def finish(self):
+        """写入中央目录并结束压缩包。
+
+        Yields:
+            bytes: 压缩包末尾的数据块。
+        """
+        self._zip.close()
+        yield from self._drain()
+
+
+def zip_stream_response(filename, chunks):
+    """构造以附件形式下载的流式 ZIP 响应。
+
+    Args:
+        filename (str): 下载文件名。
+        chunks (Iterable[bytes]): 压缩包数据块。
+
+    Returns:
+        Response: 流式响应，生成器在请求上下文中执行。
+    """
+    encoded_filename = urllib.parse.quote(filename)
+    return Response(
+        stream_with_context(chunks),
+        status=200,
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={encoded_filename}",
+        },
+    )
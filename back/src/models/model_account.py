@@ -149,8 +149,24 @@ class Account(UserMixin, db.Model):
             RoleTypes.NORMAL,
         )
 
+    def set_cached_current_tenant(self, tenant_id, role):
+        """从认证缓存恢复当前租户, 租户对象在首次访问时才从数据库加载"""
+        self._cached_current_tenant = (tenant_id, role)
+
+    def _has_unloaded_cached_tenant(self):
+        return (
+            "_current_tenant" not in self.__dict__
+            and "_cached_current_tenant" in self.__dict__
+        )
+
     @property
     def current_tenant(self):
+        if self._has_unloaded_cached_tenant():
+            tenant_id, role = self._cached_current_tenant
+            tenant = db.session.get(Tenant, tenant_id) if tenant_id else None
+            if tenant:
+                tenant.current_role = role
+            self._current_tenant = tenant
         return self._current_tenant
 
     @current_tenant.setter
@@ -167,6 +183,8 @@ class Account(UserMixin, db.Model):
 
     @property
     def current_tenant_id(self):
+        if self._has_unloaded_cached_tenant() and self._cached_current_tenant[0]:
+            return self._cached_current_tenant[0]
         return self.current_tenant.id
 
     @current_tenant_id.setter
@@ -201,6 +219,9 @@ class Account(UserMixin, db.Model):
 
     @property
     def current_role(self):
+        if self._has_unloaded_cached_tenant():
+            tenant_id, role = self._cached_current_tenant
+            return role if tenant_id else None
         if self.current_tenant:
             return self.current_tenant.current_role
         return None
@@ -28,10 +28,11 @@ from werkzeug.datastructures import FileStorage
 from lazyllm.engine import LightEngine
 
 import parts.data.data_reflux_service as reflux
-from core.restful import Resource
+from core.restful import ForbiddenError, Resource
 from libs import helper
 from libs.feature_gate import require_internet_feature
 from libs.login import login_required
+from libs.metrics import CONTENT_TYPE, registry
 from libs.timetools import TimeTools
 from parts.app.node_run.app_run_service import AppRunService, EventHandler
 from parts.app.node_run.engine_manager import RedisStateManager
@@ -41,11 +42,12 @@ from parts.urls import api
 from utils.util_database import db
 from utils.util_redis import redis_client
 
-from . import fields
+from . import fields, run_metrics
 from .app_service import AppService, TemplateService, WorkflowService
 from .model import App, Workflow
 from .refer_service import ReferManager
 from .reflux_helper import RefluxHelper
+from .version_store import MAX_APP_VERSIONS
 
 
 def get_create_app_parser():
@@ -109,6 +111,7 @@ class AppListApi(Resource):
             default=20,
             location="args",
         )
+        parser.add_argument("cursor", type=str, location="args", required=False)
         parser.add_argument("search_name", type=str, location="args", required=False)
         parser.add_argument("search_tags", type=str, location="args", required=False)
         parser.add_argument(
@@ -200,6 +203,7 @@ class AppListPageApi(Resource):
             default=20,
             location="json",
         )
+        parser.add_argument("cursor", type=str, location="json", required=False)
         parser.add_argument("search_name", type=str, location="json", required=False)
         parser.add_argument(
             "search_tags", type=list, location="json", required=False
@@ -615,6 +619,7 @@ class TemplateListApi(Resource):
             default=20,
             location="args",
         )
+        parser.add_argument("cursor", type=str, location="args", required=False)
         parser.add_argument("search_name", type=str, location="args", required=False)
         parser.add_argument("search_tags", type=str, location="args", required=False)
         parser.add_argument(
@@ -775,6 +780,7 @@ class AppReportApi(Resource):
             turn_number = int(split[5]) if split[5] else 1
         except Exception:
             # logging.exception(e)
+            run_metrics.record_report_error("parse")
             return
 
         # 1. 费用审计记录tokens
@@ -789,6 +795,7 @@ class AppReportApi(Resource):
         CostService.add(user_id, app_id, tokens, call_type, track_id, cost_time)
 
         # 2. 数据回流
+        nodes_map = {}
         try:
             state_manager = RedisStateManager(app_id, mode)
             nodes_map = state_manager.get_graph_nodes_map()
@@ -814,13 +821,22 @@ class AppReportApi(Resource):
                         "is_satisfied": True,
                         "user_feedback": "",
                     }
-                    reflux.create_reflux_data(data)
+                    reflux.enqueue_reflux_data(data)
                     # reflux.update_reflux_data_feedback(data)
         except Exception as e:
             logging.info(f"处理node数据回流时发生异常: {e}")
+            run_metrics.record_report_error("backflow")
 
         # 3. 显示逐步调试信息
         nodedata = nodes_map.get(node_id, None)
+        run_metrics.record_node_report(
+            app_id,
+            mode,
+            (nodedata or {}).get("kind"),
+            cost_time,
+            prompt_tokens,
+            completion_tokens,
+        )
         if (mode == "draft" or mode == "node") and nodedata is not None:
             # eg. node_id = draft-48f9e95a-e54c-4812-a41b-f61f635816b8-1731324014737
             front_node_id = node_id.split("-")[-1]
@@ -840,6 +856,22 @@ class AppReportApi(Resource):
             state_manager.set_detail(node_finished, turn_number)
 
 
+class AppMetricsApi(Resource):
+    # 该接口不需要登录，只允许本机访问
+    def get(self):
+        """以 Prometheus 文本格式导出节点执行指标。
+
+        Returns:
+            Response: 指标文本
+
+        Raises:
+            ForbiddenError: 非本机请求时抛出
+        """
+        if not run_metrics.is_local_address(request.remote_addr):
+            raise ForbiddenError()
+        return Response(registry.render(), status=200, content_type=CONTENT_TYPE)
+
+
 class DraftDebugDetailApi(Resource):
 
     def get(self, app_id, mode="draft"):
@@ -1180,9 +1212,9 @@ class CheckVersionsCount(Resource):
         version_count = AppService().get_version_count(app_id)
         message = ""
         is_over_limit = False
-        if version_count >= 10:
+        if version_count >= MAX_APP_VERSIONS:
             is_over_limit = True
-            message = "版本数量已达10个上限，发布将删除最早版本，确认继续？"
+            message = f"版本数量已达{MAX_APP_VERSIONS}个上限，发布将删除最早版本，确认继续？"
         return {"is_over_limit": is_over_limit, "message": message}
 
 
@@ -1192,7 +1224,8 @@ class AppRestore(Resource):
         parser.add_argument("version", required=True, type=str, location="json")
         args = parser.parse_args()
 
-        app_version_info = AppService().get_specific_app_versions(
+        app_service = AppService()
+        app_version_info = app_service.get_specific_app_versions(
             app_id=app_id, version=args["version"]
         )
         file_path = app_version_info.file_path
@@ -1200,8 +1233,7 @@ class AppRestore(Resource):
         if not os.path.exists(file_path):
             raise FileNotFoundError("当前版本记录不存在")
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            rawdata = json.load(f)
+        rawdata = app_service.load_app_version(app_version_info)
 
         workflow = WorkflowService().get_draft_workflow(app_id)
         workflow.nested_update_graph(current_user, rawdata.get("graph", {}))
@@ -1315,6 +1347,7 @@ api.add_resource(TemplateDetailApi, "/apptemplate/<uuid:app_id>")
 api.add_resource(TemplateConvertToApp, "/apptemplate/to/apps")
 
 api.add_resource(AppReportApi, "/app/report")
+api.add_resource(AppMetricsApi, "/app/metrics")
 api.add_resource(
     DraftDebugDetailApi, "/apps/<uuid:app_id>/workflows/<string:mode>/debug-detail"
 )
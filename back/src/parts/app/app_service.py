@@ -13,28 +13,33 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
-import json
 import logging
 import os
-import time
 from datetime import datetime, timezone
 
 from flask_restful import marshal
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_
 
 from lazyllm.tools.rag.utils import DocListManager
 
 from libs.filetools import FileTools
+from libs.pagination import keyset_paginate
 from libs.timetools import TimeTools
 from models.model_account import Account
 from parts.app.node_run.lazy_converter import LazyConverter
 from parts.tag.model import Tag
 from utils.util_database import db
+from utils.util_redis import redis_client
 
 from . import fields
+from .doc_progress import DocParseProgress, DocParseState
 from .model import App, AppTemplate, AppVersion, Workflow
-from .node_run.app_run_service import EventHandler, FlowType, get_app_except
+from .node_run.app_run_service import EventHandler, FlowType
+from .version_store import MAX_APP_VERSIONS, AppVersionStore, load_app_snapshot
+
+
+# 保存应用版本时持有应用级别锁的超时时间（秒）
+APP_VERSION_LOCK_TIMEOUT = 60
 
 
 class AppServiceMixin:
@@ -62,16 +67,9 @@ class AppServiceMixin:
         filters = []
 
         if args.get("search_tags"):
-            target_ids = []
-            if isinstance(args.get("search_tags"), str):
-                target_ids = Tag.get_target_ids_by_name(
-                    Tag.Types.APP, args["search_tags"]
-                )
-            elif isinstance(args.get("search_tags"), (list, tuple)):
-                target_ids = Tag.get_target_ids_by_names(
-                    Tag.Types.APP, args["search_tags"]
-                )
-            filters.append(model_cls.id.in_(target_ids))
+            filters.append(
+                Tag.target_filter(Tag.Types.APP, args["search_tags"], model_cls.id)
+            )
 
         if args.get("search_name"):
             search_name = args["search_name"]
@@ -129,21 +127,24 @@ class AppServiceMixin:
             .filter(*filters)  # 这里 filters 是你的筛选条件
         )
 
-        total = stmt.count()
-        queryset = (
-            stmt.order_by(model_cls.created_at.desc())
-            .limit(args["limit"])
-            .offset((args["page"] - 1) * args["limit"])
+        page = keyset_paginate(
+            stmt,
+            [model_cls.created_at, model_cls.id],
+            page=args["page"],
+            per_page=args["limit"],
+            cursor=args.get("cursor"),
         )
 
         pagination = {
-            "page": args["page"],
-            "per_page": args["limit"],
-            "total": total,
-            "items": queryset.all(),  # 每个 item 是 (App, Workflow.updated_at)
-            "has_next": args["page"] * args["limit"] < total,
+            "page": page.page,
+            "per_page": page.per_page,
+            "total": page.total,
+            "items": page.items,  # 每个 item 是 (App, Workflow.updated_at)
+            "has_next": page.has_next,
+            "next_cursor": page.next_cursor,
         }
         ret_list = []
+        model_cls.prefetch_list_fields([item for item, _ in pagination["items"]])
         for item, workflow_updated_at in pagination["items"]:
             item.workflow_updated_at = workflow_updated_at
             if (
@@ -401,8 +402,11 @@ class AppService(AppServiceMixin):
         return {"items": new_instances}
 
     def get_version_count(self, app_id):
-        versions = self.get_app_versions(app_id)
-        return len(versions.get("items", []))
+        return (
+            db.session.query(func.count(AppVersion.id))
+            .filter(AppVersion.app_id == app_id)
+            .scalar()
+        )
 
     def update_app_last_version_status(self, app_id, new_status):
         versions = self.get_specific_last_app_versions(app_id)
@@ -448,28 +452,57 @@ class AppService(AppServiceMixin):
         )
         return instances
 
+    def get_version_blob_dir(self, app_id):
+        return FileTools.create_storage_dir("app_version", app_id, "blobs")
+
     def save_app_json(self, app_id):
-        app_versions = (
-            db.session.query(AppVersion)
-            .filter(AppVersion.app_id == app_id)
-            .order_by(AppVersion.id)
-            .all()
-        )
+        """保存应用当前画布的版本快照。
 
-        # 如果记录超过10条，删除最早的记录
-        if len(app_versions) >= 10:
-            oldest_version = app_versions[0]
+        画布按子画布拆分为内容寻址的 blob，未变化的子画布不会重复写入；
+        超过 MAX_APP_VERSIONS 个版本时删除最早的版本，并按引用计数删除不再引用的 blob。
+        同一应用的保存串行执行，避免删除并发保存刚复用的 blob。
 
+        Args:
+            app_id (str): 应用ID
+
+        Returns:
+            str: 版本清单文件路径
+        """
+        with redis_client.lock(
+            name=f"app_version_lock:{app_id}",
+            timeout=APP_VERSION_LOCK_TIMEOUT,
+            blocking_timeout=APP_VERSION_LOCK_TIMEOUT,
+        ):
+            return self._save_app_json(app_id)
+
+    def _save_app_json(self, app_id):
+        store = AppVersionStore(self.get_version_blob_dir(app_id))
+        if not store.has_ref_counts():
+            # 引用计数出现之前保存的版本，首次保存时根据全部清单重建一次
+            store.rebuild_ref_counts(
+                [
+                    path
+                    for (path,) in db.session.query(AppVersion.file_path).filter(
+                        AppVersion.app_id == app_id
+                    )
+                ]
+            )
+        if self.get_version_count(app_id) >= MAX_APP_VERSIONS:
+            oldest_version = (
+                db.session.query(AppVersion)
+                .filter(AppVersion.app_id == app_id)
+                .order_by(AppVersion.id)
+                .first()
+            )
             old_file_path = oldest_version.file_path
-            if os.path.exists(old_file_path):
-                os.remove(old_file_path)
             db.session.delete(oldest_version)
             db.session.commit()
+            store.remove_snapshot(old_file_path)
 
         app_model = self.get_app(app_id, raise_error=False)
         result = marshal(app_model, fields.app_export_fields)
         workflow = Workflow.default_getone(app_id, None)
-        result["graph"] = workflow.nested_graph_dict if workflow else {}
+        graph = workflow.nested_graph_dict if workflow else {}
 
         version_dir = FileTools.create_storage_dir(
             "app_version", app_id, "workflow_json"
@@ -479,11 +512,20 @@ class AppService(AppServiceMixin):
             app_name, datetime.now().strftime("%Y%m%d%H%M%S")
         )
         file_path = os.path.join(version_dir, filename)
+        return store.save_snapshot(result, graph, file_path)
 
-        with open(file_path, "w") as f_write:
-            f_write.write(json.dumps(result))
+    def load_app_version(self, app_version):
+        """读取版本快照的完整导出数据。
 
-        return file_path
+        Args:
+            app_version (AppVersion): 版本记录
+
+        Returns:
+            dict: 应用导出数据，graph 为完整的嵌套画布
+        """
+        return load_app_snapshot(
+            app_version.file_path, self.get_version_blob_dir(app_version.app_id)
+        )
 
     def get_apps_references(self, app_ids):
         from .model import WorkflowRefer
@@ -691,21 +733,24 @@ class WorkflowService:
         """
         if isinstance(dataset_path, list) and len(dataset_path) > 0:
             dataset_path = dataset_path[0]
-        dlm = DocListManager(dataset_path, name, enable_path_monitoring=False)
         group_name = "__default__"
-        files_in_path = [
-            file[1] for file in dlm.list_kb_group_files(group=group_name, details=False)
-        ]
-        file_count = self.count_files(dataset_path)
-
-        # 如果文件数据还未写入到数据库，就等待数据写入之后，再查询状态
-        while not files_in_path and file_count:
-            time.sleep(1)
-            files_in_path = [
-                file[1]
-                for file in dlm.list_kb_group_files(group=group_name, details=False)
+        progress = DocParseProgress(app_id, name, dataset_path)
+        dlm = None
+
+        def fetch_statuses():
+            # 只在监控线程中调用, DocListManager 在该线程内创建
+            nonlocal dlm
+            if dlm is None:
+                dlm = DocListManager(dataset_path, name, enable_path_monitoring=False)
+            return [
+                file[5]
+                for file in dlm.list_kb_group_files(
+                    group=group_name, details=True, status=DocListManager.Status.all
+                )
             ]
-            continue
+
+        expect_files = self.has_files(dataset_path)
+        progress.ensure_monitor(fetch_statuses, expect_files)
 
         event_handler = EventHandler(
             flow_type=FlowType.APP_RUN,
@@ -713,35 +758,26 @@ class WorkflowService:
 
         try:
             yield event_handler.start_event()
-            parsed_total = 0
-            file_total = len(files_in_path)
-            files_in_path_copy = copy.deepcopy(files_in_path)
             last_rogress = "0 / 0"
             success_flag = True
-            while True:
-                files = dlm.list_kb_group_files(
-                    group=group_name, details=True, status=DocListManager.Status.all
-                )
-                for file in files:
-                    path = file[1]
-                    status = file[5]
-                    if status not in [dlm.Status.waiting, dlm.Status.working]:
-                        files_in_path_copy.remove(path)
-                        parsed_total += 1
-                cur_last_rogress = f"{parsed_total} / {file_total}"
+            for snapshot in progress.subscribe():
+                if snapshot is None:
+                    # 监控所在进程退出后锁会过期, 由当前订阅方接管
+                    progress.ensure_monitor(fetch_statuses, expect_files)
+                    continue
+
+                parsed_total = snapshot["done"] + snapshot["failed"]
+                cur_last_rogress = f"{parsed_total} / {snapshot['total']}"
                 if last_rogress != cur_last_rogress:
                     last_rogress = cur_last_rogress
                     yield event_handler.chunk_event(cur_last_rogress)
-                files_in_path = files_in_path_copy
-                if not files_in_path:
-                    break
 
-                except_str = get_app_except(app_id, name, dataset_path)
-                if except_str:
+                if snapshot["state"] == DocParseState.FAILED:
                     success_flag = False
                     yield event_handler.fail_event(Exception("文档解析失败"))
                     break
-                time.sleep(1)
+                if snapshot["state"] == DocParseState.SUCCESS:
+                    break
 
             if success_flag:
                 yield event_handler.success_event()
@@ -753,19 +789,16 @@ class WorkflowService:
             yield event_handler.stop_event()
             return event_handler
 
-    def count_files(self, dataset_path):
-        """统计数据集中的文件数量。
+    def has_files(self, dataset_path):
+        """数据集中是否存在文件, 找到第一个文件即返回。
 
         Args:
             dataset_path (str): 数据集路径
 
         Returns:
-            int: 文件总数
-
-        Raises:
-            Exception: 当统计失败时抛出
+            bool: 是否存在文件
         """
-        file_count = 0
         for _, _, files in os.walk(dataset_path):
-            file_count += len(files)
-        return file_count
+            if files:
+                return True
+        return False
@@ -0,0 +1,206 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from utils.util_redis import redis_client
+
+DOC_PROGRESS_PREFIX = "doc_parse_progress"
+# 进度数据保留时间（秒）
+DOC_PROGRESS_TTL = 3600
+# 监控线程统计状态的间隔（秒），也是订阅方的空闲检查间隔
+DOC_PROGRESS_INTERVAL = 1
+# 监控锁超时时间（秒），监控进程退出后由其他订阅方接管
+DOC_MONITOR_LOCK_TIMEOUT = 30
+
+# DocListManager 的文件状态到计数器的映射，其余状态视为已完成
+STATUS_COUNTERS = {
+    "waiting": "queued",
+    "working": "working",
+    "failed": "failed",
+}
+COUNTER_FIELDS = ("queued", "working", "done", "failed")
+
+
+class DocParseState:
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+
+
+def count_statuses(statuses):
+    """把文件状态列表汇总为计数器。
+
+    Args:
+        statuses (Iterable[str]): 每个文件的解析状态。
+
+    Returns:
+        dict: queued/working/done/failed 各自的数量及 total。
+    """
+    counts = dict.fromkeys(COUNTER_FIELDS, 0)
+    for status in statuses:
+        counts[STATUS_COUNTERS.get(status, "done")] += 1
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+class DocParseProgress:
+    """文档解析进度。
+
+    进度以计数器的形式保存在 Redis 哈希中，每次变化时把最新快照发布到
+    对应频道。同一个文档节点只有一个监控线程统计文件状态，任意数量的
+    进度流只订阅频道，每次更新的开销与文件数量无关。
+    """
+
+    def __init__(self, app_id, doc_id, path):
+        if isinstance(path, list):
+            path = path[0] if path else ""
+        digest = hashlib.md5(str(path).encode("utf-8")).hexdigest()
+        self.key = f"{DOC_PROGRESS_PREFIX}:{app_id}:{doc_id}:{digest}"
+        self.channel = f"{self.key}:events"
+        self.lock_key = f"{self.key}:monitor"
+
+    def snapshot(self):
+        """读取当前进度。
+
+        Returns:
+            dict: 各计数器、total、state 和 error，没有进度时计数均为 0。
+        """
+        raw = redis_client.hgetall(self.key) or {}
+        data = {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else v
+            )
+            for k, v in raw.items()
+        }
+        result = {field: int(data.get(field) or 0) for field in COUNTER_FIELDS}
+        result["total"] = int(data.get("total") or 0)
+        result["state"] = data.get("state", "")
+        result["error"] = data.get("error", "")
+        return result
+
+    def _publish(self, fields):
+        redis_client.hset(self.key, mapping=fields)
+        redis_client.expire(self.key, DOC_PROGRESS_TTL)
+        redis_client.publish(self.channel, json.dumps(self.snapshot()))
+
+    def reset(self):
+        """开始新一轮解析前清空上一轮的进度。"""
+        redis_client.delete(self.key)
+
+    def update(self, counts, state=DocParseState.RUNNING):
+        """写入最新计数并通知订阅方。
+
+        Args:
+            counts (dict): count_statuses 的结果。
+            state (str, optional): 解析状态。
+        """
+        fields = {field: counts.get(field, 0) for field in COUNTER_FIELDS}
+        fields["total"] = counts.get("total", 0)
+        fields["state"] = state
+        self._publish(fields)
+
+    def fail(self, error):
+        """标记解析失败并通知订阅方。
+
+        Args:
+            error (str): 失败原因。
+        """
+        self._publish({"state": DocParseState.FAILED, "error": str(error)})
+
+    def ensure_monitor(self, fetch_statuses, expect_files=True):
+        """确保有一个监控线程在统计状态，已有监控时直接返回。
+
+        Args:
+            fetch_statuses (Callable[[], Iterable[str]]): 读取全部文件状态，
+                只会在监控线程中调用。
+            expect_files (bool, optional): 数据集中是否有文件，为 True 时
+                文件还未登记到文档库也会继续等待。
+
+        Returns:
+            bool: 是否在本进程启动了监控线程。
+        """
+        if not redis_client.set(
+            self.lock_key, "1", ex=DOC_MONITOR_LOCK_TIMEOUT, nx=True
+        ):
+            return False
+        thread = threading.Thread(
+            target=self.run_monitor, args=(fetch_statuses, expect_files), daemon=True
+        )
+        thread.start()
+        return True
+
+    def run_monitor(self, fetch_statuses, expect_files=True, interval=None):
+        """统计文件状态直到解析结束，计数变化时才写入。
+
+        Args:
+            fetch_statuses (Callable[[], Iterable[str]]): 读取全部文件状态。
+            expect_files (bool, optional): 数据集中是否有文件。
+            interval (float, optional): 统计间隔，默认 DOC_PROGRESS_INTERVAL。
+        """
+        interval = DOC_PROGRESS_INTERVAL if interval is None else interval
+        last = None
+        try:
+            while True:
+                if self.snapshot()["state"] == DocParseState.FAILED:
+                    break
+                counts = count_statuses(fetch_statuses())
+                # 文件还未登记到文档库时继续等待
+                waiting = counts["total"] == 0 and expect_files
+                finished = not waiting and counts["queued"] + counts["working"] == 0
+                state = DocParseState.SUCCESS if finished else DocParseState.RUNNING
+                if (counts, state) != last:
+                    self.update(counts, state)
+                    last = (counts, state)
+                if finished:
+                    break
+                redis_client.expire(self.lock_key, DOC_MONITOR_LOCK_TIMEOUT)
+                time.sleep(interval)
+        except Exception as e:
+            logging.exception(e)
+            self.fail(e)
+        finally:
+            redis_client.delete(self.lock_key)
+
+    def subscribe(self, interval=None):
+        """订阅进度变化。
+
+        先产出当前快照，之后每次变化产出新快照；一个间隔内没有变化时产出 None，
+        调用方可借此做保活检查。
+
+        Args:
+            interval (float, optional): 空闲间隔，默认 DOC_PROGRESS_INTERVAL。
+
+        Yields:
+            dict | None: 进度快照。
+        """
+        interval = DOC_PROGRESS_INTERVAL if interval is None else interval
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        try:
+            # 先订阅再读取快照，避免漏掉两者之间的更新
+            yield self.snapshot()
+            while True:
+                message = pubsub.get_message(timeout=interval)
+                if message and message.get("type") == "message":
+                    yield json.loads(message["data"])
+                else:
+                    yield None
+        finally:
+            pubsub.close()
@@ -52,6 +52,7 @@ app_pagination_fields = {
     "limit": fields.Integer(attribute="per_page"),
     "total": fields.Integer,
     "has_more": fields.Boolean(attribute="has_next"),
+    "next_cursor": fields.String,
     "data": fields.List(fields.Nested(app_detail_fields), attribute="items"),
 }
 
@@ -35,28 +35,9 @@ status_list = [
 ]
 
 
-def compare_list(a_list, b_list):
-    """比较两个列表是否相等。
-
-    Args:
-        a_list (list): 第一个列表
-        b_list (list): 第二个列表
-
-    Returns:
-        bool: 两个列表是否相等
-
-    Raises:
-        Exception: 当比较失败时抛出
-    """
-    if len(a_list) != len(b_list):
-        return False
-    for i, k in enumerate(a_list):
-        if a_list[i] != b_list[i]:
-            return False
-    return True
-
-
 class AppMixin:
+    has_tags = False
+
     id = db.Column(StringUUID, default=lambda: str(uuid.uuid4()))
     tenant_id = db.Column(StringUUID, nullable=False)
     name = db.Column(db.String(255), nullable=False)
@@ -85,13 +66,57 @@ class AppMixin:
 
     @property
     def tenant(self):
+        if "_prefetched_tenant" in self.__dict__:
+            return self._prefetched_tenant
         tenant = db.session.query(Tenant).filter(Tenant.id == self.tenant_id).first()
         return tenant
 
     @property
     def created_by_account(self):
+        if "_prefetched_created_by_account" in self.__dict__:
+            return self._prefetched_created_by_account
         return db.session.get(Account, self.created_by)
 
+    @classmethod
+    def prefetch_list_fields(cls, items):
+        """为一页应用批量加载列表展示需要的标签、创建者和租户。
+
+        每类数据只查询一次，结果挂在实例上，marshal 时不再逐条查询。
+
+        Args:
+            items (list): 应用实例列表
+        """
+        if not items:
+            return
+        account_ids = {item.created_by for item in items if item.created_by}
+        accounts = {
+            account.id: account
+            for account in (
+                db.session.query(Account).filter(Account.id.in_(account_ids))
+                if account_ids
+                else []
+            )
+        }
+        tenant_ids = {item.tenant_id for item in items if item.tenant_id}
+        tenants = {
+            tenant.id: tenant
+            for tenant in (
+                db.session.query(Tenant).filter(Tenant.id.in_(tenant_ids))
+                if tenant_ids
+                else []
+            )
+        }
+        tags = (
+            Tag.get_names_by_target_ids(Tag.Types.APP, [item.id for item in items])
+            if cls.has_tags
+            else {}
+        )
+        for item in items:
+            item._prefetched_created_by_account = accounts.get(item.created_by)
+            item._prefetched_tenant = tenants.get(item.tenant_id)
+            if cls.has_tags:
+                item._prefetched_tags = tags.get(str(item.id), [])
+
     @property
     def categories_as_list(self):
         return self.categories.split(",") if self.categories else []
@@ -157,6 +182,8 @@ class App(db.Model, AppMixin):
         db.PrimaryKeyConstraint("id", name="newapp_pkey"),
         db.Index("newapp_tenant_id_idx", "tenant_id"),
     )
+    has_tags = True
+
     api_url = db.Column(db.String(255), nullable=True)
     # 开启api调用,0 关闭,1 开启
     enable_api_call = db.Column(
@@ -165,6 +192,8 @@ class App(db.Model, AppMixin):
 
     @property
     def tags(self):
+        if "_prefetched_tags" in self.__dict__:
+            return self._prefetched_tags
         return Tag.get_names_by_target_id(Tag.Types.APP, self.id)
 
 
@@ -231,6 +260,8 @@ class Workflow(db.Model):
     ref_tool_ids = db.Column(db.String(1024), nullable=True)
     ref_model_ids = db.Column(db.String(1024), nullable=True)
     ref_knowledge_ids = db.Column(db.String(1024), nullable=True)
+    graph_hash = db.Column(db.String(64), nullable=True)  # graph 内容的哈希
+    refs_hash = db.Column(db.String(64), nullable=True)  # 自身引用关系的摘要
 
     def _set_refers(self, _type, id_list):
         content = ",".join([str(k) for k in id_list if k])
@@ -405,6 +436,33 @@ class Workflow(db.Model):
             .first()
         )
 
+    @classmethod
+    def default_getmany(cls, app_ids, version):
+        """批量获取多个应用的默认工作流。
+
+        Args:
+            app_ids (Iterable[str]): 应用ID列表
+            version (str): 版本号
+
+        Returns:
+            dict: app_id 到最新 Workflow 的映射
+        """
+        app_ids = {str(k) for k in app_ids if k}
+        if not app_ids:
+            return {}
+        filters = [cls.app_id.in_(app_ids)]
+        if version:
+            filters.append(cls.version == version)
+        result = {}
+        for workflow in (
+            db.session.query(cls)
+            .filter(*filters)
+            .order_by(cls.created_at.desc())
+            .all()
+        ):
+            result.setdefault(str(workflow.app_id), workflow)
+        return result
+
     @classmethod
     def new_empty(cls, account, is_main, app_id=None, version="draft"):
         """创建空的工作流。
@@ -476,14 +534,16 @@ class Workflow(db.Model):
             flat_data (dict): 扁平化的工作流数据
 
         Returns:
-            None: 无返回值
+            bool: 画布或汇总的引用关系是否发生变化, 都未变化时调用方无需保存
 
         Raises:
             ValueError: 当存在循环引用时抛出
         """
+        subgraph_ids = []
         for index, nodedata in enumerate(flat_data.get("nodes", [])):
             node_type = self.node_lower_type(nodedata)
             if self.is_subgraph_type(node_type):
+                subgraph_ids.append(str(self.get_subgraph_id(nodedata)))
                 flat_data["nodes"][index]["data"][
                     "config__patent_graph"
                 ] = {}  # 将子画布数据置空
@@ -492,97 +552,147 @@ class Workflow(db.Model):
                     if self.app_id == self.get_subgraph_id(nodedata):
                         raise ValueError("应用不可引用自己")
 
-        self.graph = json.dumps(flat_data)
-
-        # 检测是否有死循环
-        checker = NestedChecker()
-        level = 0
-        checker.add_level(level, self.app_id)
-        self._help_check_referenced(
-            checker, level, False
-        )  # 内部调用了 self._check_refers
+        graph_hash = self.compute_graph_hash(flat_data)
+        graph_changed = self.graph is None or graph_hash != self.unique_hash
+        # 画布哈希不包含子画布的内容, 含子画布时即使画布未变化也要重新汇总引用关系
+        if not graph_changed and not subgraph_ids:
+            return False
+        if graph_changed:
+            self.graph = json.dumps(flat_data)
+            self.graph_hash = graph_hash
+
+        # 引用关系没有变化且不含子画布时, 不需要再检查死循环和维护引用表
+        # (子画布的内容可能已单独修改, 含子画布时总是重新汇总)
+        self._check_refers(0, flat_data)
+        refs_hash = self._own_refs_hash(subgraph_ids)
+        if not subgraph_ids and refs_hash == self.refs_hash:
+            return True
+        self.refs_hash = refs_hash
+
+        # 检测是否有死循环, 同时汇总主画布 + 第一层子画布中的引用关系
+        for sub_workflow, sub_flat_data in self._load_subgraph_tree(flat_data):
+            sub_workflow._check_refers(1, sub_flat_data)
+            self.temp_ref_app_ids |= sub_workflow.temp_ref_app_ids
+            self.temp_ref_model_ids |= sub_workflow.temp_ref_model_ids
+            self.temp_ref_tool_ids |= sub_workflow.temp_ref_tool_ids
+            self.temp_ref_knowledge_ids |= sub_workflow.temp_ref_knowledge_ids
+            self.temp_ref_mcp_ids |= sub_workflow.temp_ref_mcp_ids
 
         # 只在主画布中执行: 检查到主画布 + 所有子画布中的引用关系
         if self.main_app_id == self.app_id:
-            app_id = self.app_id
-            add_refs = []
-            if not compare_list(self._get_refers("app"), list(self.temp_ref_app_ids)):
-                WorkflowRefer.query.filter_by(app_id=app_id, target_type="app").delete()
-                add_refs.extend(
-                    [
-                        WorkflowRefer(
-                            app_id=app_id, target_type="app", target_id=str(k)
-                        )
-                        for k in self.temp_ref_app_ids
-                    ]
-                )
-
-            if not compare_list(
-                self._get_refers("model"), list(self.temp_ref_model_ids)
-            ):
-                WorkflowRefer.query.filter_by(
-                    app_id=app_id, target_type="model"
-                ).delete()
-                add_refs.extend(
-                    [
-                        WorkflowRefer(
-                            app_id=app_id, target_type="model", target_id=str(k)
-                        )
-                        for k in self.temp_ref_model_ids
-                    ]
-                )
-
-            if not compare_list(self._get_refers("tool"), list(self.temp_ref_tool_ids)):
-                WorkflowRefer.query.filter_by(
-                    app_id=app_id, target_type="tool"
-                ).delete()
-                add_refs.extend(
-                    [
-                        WorkflowRefer(
-                            app_id=app_id, target_type="tool", target_id=str(k)
-                        )
-                        for k in self.temp_ref_tool_ids
-                    ]
-                )
-
-            if not compare_list(
-                self._get_refers("document"), list(self.temp_ref_knowledge_ids)
-            ):
-                WorkflowRefer.query.filter_by(
-                    app_id=app_id, target_type="document"
-                ).delete()
-                add_refs.extend(
-                    [
-                        WorkflowRefer(
-                            app_id=app_id, target_type="document", target_id=str(k)
-                        )
-                        for k in self.temp_ref_knowledge_ids
-                    ]
-                )
-
-            if not compare_list(
-                self._get_refers("mcp"), list(self.temp_ref_mcp_ids)
-            ):
-                WorkflowRefer.query.filter_by(
-                    app_id=app_id, target_type="mcp"
-                ).delete()
-                add_refs.extend(
-                    [
-                        WorkflowRefer(
-                            app_id=app_id, target_type="mcp", target_id=str(k)
-                        )
-                        for k in self.temp_ref_mcp_ids
-                    ]
-                )
-
-            if add_refs:
-                db.session.bulk_save_objects(add_refs)
+            refs_changed = self._sync_refers(
+                {
+                    WorkflowRefer.Types.APP.value: self.temp_ref_app_ids,
+                    WorkflowRefer.Types.MODEL.value: self.temp_ref_model_ids,
+                    WorkflowRefer.Types.TOOL.value: self.temp_ref_tool_ids,
+                    WorkflowRefer.Types.DOCUMENT.value: self.temp_ref_knowledge_ids,
+                    WorkflowRefer.Types.MCP.value: self.temp_ref_mcp_ids,
+                }
+            )
 
             self._set_refers("app", self.temp_ref_app_ids)
             self._set_refers("model", self.temp_ref_model_ids)
             self._set_refers("tool", self.temp_ref_tool_ids)
             self._set_refers("document", self.temp_ref_knowledge_ids)
             self._set_refers("mcp", self.temp_ref_mcp_ids)
+            return graph_changed or refs_changed
+        return graph_changed
+
+    def _own_refs_hash(self, subgraph_ids):
+        """当前画布自身引用关系的摘要, 由 _check_refers 的结果和子画布ID计算。"""
+        entity = {
+            "subgraph": sorted(subgraph_ids),
+            "app": sorted(str(k) for k in self.temp_ref_app_ids),
+            "model": sorted(str(k) for k in self.temp_ref_model_ids),
+            "tool": sorted(str(k) for k in self.temp_ref_tool_ids),
+            "document": sorted(str(k) for k in self.temp_ref_knowledge_ids),
+            "mcp": sorted(str(k) for k in self.temp_ref_mcp_ids),
+        }
+        return helper.generate_text_hash(json.dumps(entity, sort_keys=True))
+
+    def _load_subgraph_tree(self, flat_data):
+        """逐层批量加载全部子画布并检测循环引用。
+
+        每一层只查询一次数据库, 子画布的 graph 只解析一次, 循环检测在内存中
+        基于应用之间的引用关系完成。
+
+        Args:
+            flat_data (dict): 当前画布的扁平数据
+
+        Returns:
+            list: 第一层子画布的 (Workflow, 扁平数据) 列表
+
+        Raises:
+            ValueError: 当存在循环引用时抛出
+        """
+        checker = NestedChecker()
+        checker.add_level(0, self.app_id)
+        graphs = {}  # app_id -> (Workflow, 扁平数据)
+        first_level = []
+        level = 0
+        frontier = [flat_data]
+        while frontier:
+            child_ids = []
+            for graph in frontier:
+                for nodedata in graph.get("nodes", []):
+                    if self.is_subgraph_type(self.node_lower_type(nodedata)):
+                        app_id = self.get_subgraph_id(nodedata)
+                        checker.add_level(level + 1, app_id)
+                        child_ids.append(str(app_id))
+
+            missing = {k for k in child_ids if k not in graphs}
+            for app_id, workflow in self.default_getmany(missing, self.version).items():
+                graphs[app_id] = (workflow, workflow.flat_graph_dict)
+
+            # 同一层中重复出现的子画布只需展开一次
+            loaded = [graphs[k] for k in dict.fromkeys(child_ids) if k in graphs]
+            if level == 0:
+                first_level = loaded
+            frontier = [sub_flat_data for _, sub_flat_data in loaded]
+            level += 1
+        return first_level
+
+    def _sync_refers(self, targets):
+        """按差集维护 WorkflowRefer, 只插入新增的引用、删除移除的引用。
+
+        Args:
+            targets (dict): target_type 到目标ID集合的映射
+
+        Returns:
+            bool: 引用表是否有变化
+        """
+        desired = {(t, str(k)) for t, ids in targets.items() for k in ids if k}
+        existing = (
+            db.session.query(
+                WorkflowRefer.id, WorkflowRefer.target_type, WorkflowRefer.target_id
+            )
+            .filter(
+                WorkflowRefer.app_id == self.app_id,
+                WorkflowRefer.target_type.in_(list(targets)),
+            )
+            .all()
+        )
+
+        kept = set()
+        removed_ids = []
+        for row in existing:
+            key = (row.target_type, row.target_id)
+            if key in desired and key not in kept:
+                kept.add(key)
+            else:
+                removed_ids.append(row.id)
+
+        if removed_ids:
+            WorkflowRefer.query.filter(WorkflowRefer.id.in_(removed_ids)).delete(
+                synchronize_session=False
+            )
+        add_refs = [
+            WorkflowRefer(app_id=self.app_id, target_type=t, target_id=k)
+            for t, k in sorted(desired - kept)
+        ]
+        if add_refs:
+            db.session.bulk_save_objects(add_refs)
+        return bool(removed_ids or add_refs)
 
     def nested_update_graph(self, account, graph):
         """导入DSL文件时, 嵌套更新graph字段"""
@@ -646,86 +756,21 @@ class Workflow(db.Model):
 
         return graph
 
+    @staticmethod
+    def compute_graph_hash(flat_data):
+        entity = {"graph": flat_data}
+        return helper.generate_text_hash(json.dumps(entity, sort_keys=True))
+
     @property
     def unique_hash(self):
-        entity = {"graph": self.flat_graph_dict}
-        return helper.generate_text_hash(json.dumps(entity, sort_keys=True))
+        # 保存时已写入 graph_hash, 旧数据才需要重新计算
+        return self.graph_hash or self.compute_graph_hash(self.flat_graph_dict)
 
     def update_resource_ref_status(self, resources):
-        resource_map = {}
-        # app_resource_ids = []
-        tool_resource_ids = []
-        doc_resource_ids = []
-        mcp_tool_resource_ids = []
-        for resource in resources:
-            data = resource.get("data", {})
-            resource_type = data.get("payload__kind").lower()
-            if resource_type == "document":
-                resource_ids = data.get("payload__knowledge_id", [])
-                if resource_ids:
-                    if isinstance(resource_ids, list):
-                        resource_ids = resource_ids[0]
-                    doc_resource_ids.append(resource_ids)
-                    resource_map[resource_ids] = data
-            elif resource_type == "httptool":
-                resource_id = data.get("provider_id", [])
-                tool_resource_ids.append(int(resource_id))
-                resource_map[resource_id] = data
-            elif resource_type == "mcptool":
-                resource_id = data.get("provider_id", [])
-                mcp_tool_resource_ids.append(int(resource_id))
-                resource_map[resource_id] = data
-
-        disabled_docs = self.check_doc_disabled_refs(doc_resource_ids)
-        disabled_tools = self.check_tool_disabled_refs(tool_resource_ids)
-        disabled_mcp_tools = self.check_mcp_tool_disabled_refs(mcp_tool_resource_ids)
-        
-        disabled_resources = disabled_docs | disabled_tools | disabled_mcp_tools
-
-        for resource_id in resource_map.keys():
-            data = resource_map[resource_id]
-            if resource_id in disabled_resources:
-                data["ref_status"] = True
-            else:
-                data["ref_status"] = False
-
-    def check_doc_disabled_refs(self, resource_ids):
-        from parts.knowledge_base.model import KnowledgeBase
-
-        kbs = (
-            db.session.query(KnowledgeBase.id)
-            .filter(KnowledgeBase.id.in_(resource_ids))
-            .all()
-        )
-        return set(resource_ids) - set([kb.id for kb in kbs])
+        """为资源列表写入 ref_status, True 表示资源已被禁用或删除。"""
+        from .resource_status import ResourceStatusService
 
-    def check_tool_disabled_refs(self, resource_ids):
-        from parts.tools.model import Tool
-
-        tools = (
-            db.session.query(Tool.id)
-            .filter(Tool.id.in_(resource_ids), Tool.enable == True)
-            .all()
-        )
-        return set([str(resource_id) for resource_id in resource_ids]) - set([str(tool.id) for tool in tools])
-
-    def check_mcp_tool_disabled_refs(self, resource_ids):
-        from parts.mcp.model import McpServer
-
-        mcp_tools = (
-            db.session.query(McpServer.id)
-            .filter(McpServer.id.in_(resource_ids), McpServer.enable == True)
-            .all()
-        )
-        return set(resource_ids) - set([mcp_tool.id for mcp_tool in mcp_tools])
-
-    def check_app_disabled_refs(self, resource_ids):
-        apps = (
-            db.session.query(App.id)
-            .filter(App.id.in_(resource_ids), App.enable_api == True)
-            .all()
-        )
-        return set(resource_ids) - set([app.id for app in apps])
+        ResourceStatusService.annotate_graph({"resources": resources})
 
 
 class AppVersion(db.Model):
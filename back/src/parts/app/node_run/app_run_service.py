@@ -23,6 +23,7 @@ from typing import Any, Optional, Union
 
 from libs.filetools import FileTools
 from models.model_account import Account
+from parts.app.doc_progress import DocParseProgress
 from parts.app.model import AppMixin
 from parts.logs import Action, LogService, Module
 from utils.util_redis import redis_client
@@ -714,6 +715,7 @@ class AppRunService:
             except Exception as e:
                 self._engine_manager.stop_engine()
                 set_app_except(app_id, doc_id, path[0], f"{e}")
+                DocParseProgress(app_id, doc_id, path).fail(e)
 
         worker_thread = threading.Thread(target=parsed)
         worker_thread.start()
@@ -17,6 +17,9 @@ import time
 
 from utils.util_redis import redis_client
 
+# 调试会话和轮次号的过期时间（秒）
+SESSION_EXPIRE_SECONDS = 3600
+
 
 class DebugSessionManager:
     """调试会话管理器。
@@ -50,7 +53,8 @@ class DebugSessionManager:
     def get_next_turn_number(self) -> int:
         """获取调试会话的下一个轮次号。
 
-        从Redis获取当前轮次号并递增返回下一个轮次号。
+        在一次往返中原子地递增轮次号并刷新会话的存活时间，
+        多个页面同时调试时也不会拿到重复的轮次号。
 
         Args:
             None
@@ -62,22 +66,12 @@ class DebugSessionManager:
             Exception: 当Redis操作失败时抛出。
         """
         try:
-            # Get current turn number from Redis
-            current_turn = redis_client.get(self._turn_key)
-            if current_turn is None:
-                # First time, start with 1
-                next_turn = 1
-            else:
-                # Increment current turn number
-                next_turn = int(current_turn) + 1
-
-            # Store the new turn number with expiration (1 hour)
-            redis_client.setex(self._turn_key, 3600, str(next_turn))
-
-            # Update session timestamp
-            redis_client.setex(self._session_key, 3600, str(time.time()))
-
-            return next_turn
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.incr(self._turn_key)
+            pipe.expire(self._turn_key, SESSION_EXPIRE_SECONDS)
+            pipe.setex(self._session_key, SESSION_EXPIRE_SECONDS, str(time.time()))
+            next_turn, _, _ = pipe.execute()
+            return int(next_turn)
 
         except Exception:
             # Fallback to timestamp-based turn number if Redis fails
@@ -110,8 +104,7 @@ class DebugSessionManager:
             Exception: 当重置失败时抛出
         """
         try:
-            redis_client.delete(self._turn_key)
-            redis_client.delete(self._session_key)
+            redis_client.delete(self._turn_key, self._session_key)
         except Exception:
             pass
 
@@ -13,10 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+import hashlib
 import json
 import logging
+import threading
 import time
-from collections import defaultdict, deque
+import zlib
+from collections import OrderedDict, defaultdict, deque
 from collections.abc import Generator
 from typing import Any, Optional, Union
 
@@ -50,6 +54,73 @@ class EngineStatus:
     ERROR = "error"
 
 
+class GraphDataCache:
+    """进程内的画布解码缓存。
+
+    画布以压缩后的字节存入Redis，内容的哈希作为版本号单独保存。
+    读取时先取版本号，命中缓存则无需下载和解析画布。
+    缓存的数据在多个调用方之间共享，调用方不应修改。
+
+    Attributes:
+        MAX_SIZE (int): 最多缓存的画布版本数。
+    """
+
+    MAX_SIZE = 64
+
+    def __init__(self):
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def encode(graph_data: dict[str, Any]) -> tuple[bytes, str]:
+        """压缩画布并计算版本号。
+
+        Returns:
+            tuple: (压缩后的字节, 版本号)
+        """
+        payload = zlib.compress(json.dumps(graph_data).encode("utf-8"))
+        return payload, GraphDataCache.version_of(payload)
+
+    @staticmethod
+    def version_of(payload: bytes) -> str:
+        return hashlib.sha1(payload).hexdigest()
+
+    @staticmethod
+    def decode(payload: bytes) -> dict[str, Any]:
+        """解码画布，兼容旧版本直接保存的JSON字符串。"""
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error:
+            pass
+        return json.loads(payload)
+
+    def get(self, version: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            entry = self._items.get(version)
+            if entry is not None:
+                self._items.move_to_end(version)
+            return entry
+
+    def put(self, version: str, graph_data: dict[str, Any]) -> dict[str, Any]:
+        """缓存一个版本的画布。
+
+        Returns:
+            dict: 缓存条目，包含 graph 和按需生成的 nodes_map、sorted_nodes。
+        """
+        with self._lock:
+            entry = self._items.get(version)
+            if entry is None:
+                entry = {"graph": graph_data}
+                self._items[version] = entry
+                while len(self._items) > self.MAX_SIZE:
+                    self._items.popitem(last=False)
+            self._items.move_to_end(version)
+            return entry
+
+
+graph_data_cache = GraphDataCache()
+
+
 class RedisStateManager:
     """Redis状态管理器。
 
@@ -72,7 +143,9 @@ class RedisStateManager:
         """Setup Redis key names"""
         key_prefix = f"{self._mode}-{self._app_id}"
         self._graph_key = f"run_graph:{key_prefix}"
+        self._graph_version_key = f"run_graph_version:{key_prefix}"
         self._original_graph_key = f"run_original_graph:{key_prefix}"
+        self._original_graph_version_key = f"run_original_graph_version:{key_prefix}"
         self._status_key = f"run_status:{key_prefix}"
         self._extras_key = f"run_extras:{key_prefix}"
         self._detail_key = f"run_detail:{key_prefix}"
@@ -164,8 +237,11 @@ class RedisStateManager:
     ) -> None:
         """保存图数据。
 
+        画布压缩后保存，并记录内容哈希作为版本号，供读取时校验进程内缓存。
+
         Args:
             graph_data (dict): 图数据
+            original_graph_data (dict, optional): 转换前的原始画布
 
         Returns:
             None: 无返回值
@@ -174,17 +250,40 @@ class RedisStateManager:
             Exception: 当保存失败时抛出
         """
         try:
-            redis_client.set(self._graph_key, json.dumps(graph_data))
+            pipe = redis_client.pipeline(transaction=False)
+            payload, version = GraphDataCache.encode(graph_data)
+            pipe.set(self._graph_key, payload)
+            pipe.set(self._graph_version_key, version)
+            graph_data_cache.put(version, graph_data)
             if original_graph_data:
-                redis_client.set(
-                    self._original_graph_key, json.dumps(original_graph_data)
-                )
+                payload, version = GraphDataCache.encode(original_graph_data)
+                pipe.set(self._original_graph_key, payload)
+                pipe.set(self._original_graph_version_key, version)
+                graph_data_cache.put(version, original_graph_data)
+            pipe.execute()
         except Exception as e:
             self._logger.error(f"Failed to save graph data: {e}")
 
+    def _get_graph_entry(self, graph_key: str, version_key: str) -> dict[str, Any]:
+        """读取画布的缓存条目，版本未变化时不下载画布。"""
+        version = redis_client.get(version_key)
+        if version is not None:
+            entry = graph_data_cache.get(version.decode("utf-8"))
+            if entry is not None:
+                return entry
+
+        payload = redis_client.get(graph_key)
+        if not payload:
+            return {"graph": {}}
+        return graph_data_cache.put(
+            GraphDataCache.version_of(payload), GraphDataCache.decode(payload)
+        )
+
     def get_graph_data(self) -> dict[str, Any]:
         """获取图数据。
 
+        返回的数据与进程内缓存共享，调用方不应修改。
+
         Returns:
             dict: 图数据
 
@@ -192,8 +291,9 @@ class RedisStateManager:
             Exception: 当获取失败时抛出
         """
         try:
-            bytes_data = redis_client.get(self._graph_key)
-            return json.loads(bytes_data) if bytes_data else {}
+            return self._get_graph_entry(self._graph_key, self._graph_version_key)[
+                "graph"
+            ]
         except Exception as e:
             self._logger.error(f"Failed to get graph data: {e}")
             return {}
@@ -338,15 +438,17 @@ class RedisStateManager:
             # 根据节点顺序对数据进行排序
             try:
                 # 如果存在原始图数据，则进行拓扑排序
-                if not self.sorted_nodes and redis_client.exists(
-                    self._original_graph_key
-                ):
-                    bytes_data = redis_client.get(self._original_graph_key)
-                    original_graph_data = json.loads(bytes_data) if bytes_data else {}
-                    self.sorted_nodes = self.topological_sort(
-                        original_graph_data.get("edges", [])
+                if not self.sorted_nodes:
+                    entry = self._get_graph_entry(
+                        self._original_graph_key, self._original_graph_version_key
                     )
-                    logging.info(f"sorted_nodes: {self.sorted_nodes}")
+                    if entry["graph"]:
+                        if "sorted_nodes" not in entry:
+                            entry["sorted_nodes"] = self.topological_sort(
+                                entry["graph"].get("edges", [])
+                            )
+                            logging.info(f"sorted_nodes: {entry['sorted_nodes']}")
+                        self.sorted_nodes = entry["sorted_nodes"]
 
                 if self.sorted_nodes:
                     # 获取所有数据
@@ -589,7 +691,9 @@ class RedisStateManager:
         # 基础key
         redis_keys = [
             self._graph_key,
+            self._graph_version_key,
             self._original_graph_key,
+            self._original_graph_version_key,
             self._status_key,
             self._extras_key,
             self._detail_history_key,
@@ -661,8 +765,21 @@ class RedisStateManager:
         return result
 
     def get_graph_nodes_map(self):
-        print(f"get_graph_nodes_map: {self.get_graph_data()}")
-        return RedisStateManager._get_graph_nodes_map(self.get_graph_data())
+        """获取画布中所有节点的map，同一版本的画布只构建一次。
+
+        返回的数据与进程内缓存共享，调用方不应修改。
+        """
+        try:
+            entry = self._get_graph_entry(self._graph_key, self._graph_version_key)
+        except Exception as e:
+            self._logger.error(f"Failed to get graph data: {e}")
+            entry = {"graph": {}}
+        if "nodes_map" not in entry:
+            # 构建过程会改写节点标题，不能作用在缓存的画布上
+            entry["nodes_map"] = RedisStateManager._get_graph_nodes_map(
+                copy.deepcopy(entry["graph"])
+            )
+        return entry["nodes_map"]
 
     def get_latest_turn_number(self) -> int:
         """获取最大的turn_number（多轮对话的最新轮次）
@@ -849,8 +966,8 @@ class EngineManager:
                 "user_feedback": "",
             }
 
-            self._logger.info(f"Executed {module_type} data reflux: {data}")
-            reflux.create_reflux_data(data)
+            self._logger.info(f"Queued {module_type} data reflux: {data}")
+            reflux.enqueue_reflux_data(data)
 
         except Exception as e:
             self._logger.exception(f"Data reflux failed: {e}")
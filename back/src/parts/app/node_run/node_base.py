@@ -15,6 +15,8 @@
 
 import ast
 import copy
+import hashlib
+import json
 import logging
 import re
 import uuid
@@ -77,9 +79,65 @@ def track_new_attrs(func):
     return wrapper
 
 
+def _normalize_resource_config(value):
+    """规整资源配置：去掉空值和字符串首尾空白，便于比较。"""
+    if isinstance(value, dict):
+        return {
+            k: _normalize_resource_config(v) for k, v in value.items() if v is not None
+        }
+    if isinstance(value, list | tuple):
+        return [_normalize_resource_config(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def resource_fingerprint(kind: str, resource_data: dict[str, Any]) -> str:
+    """计算资源配置的指纹，配置相同的资源指纹相同。
+
+    Args:
+        kind (str): 资源类型，如资源节点的类名。
+        resource_data (dict): 资源节点的 data 配置。
+
+    Returns:
+        str: 指纹字符串。
+    """
+    normalized = json.dumps(
+        _normalize_resource_config(resource_data),
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return f"{kind}:{hashlib.sha1(normalized.encode('utf-8')).hexdigest()}"
+
+
 @dataclass
 class BaseRunContext:
     id_map_basenode: dict[str, "BaseNode"] = field(default_factory=dict)
+    # 资源配置指纹 -> 资源ID，同一画布中相同配置的资源只创建一次
+    resource_ids_by_fingerprint: dict[str, str] = field(default_factory=dict)
+
+    def intern_resource(self, resource_cls, resource_data: dict[str, Any]) -> str:
+        """获取与配置对应的资源节点ID，配置相同时复用已创建的资源。
+
+        复用的资源只做一次密钥查询，运行时也只创建一个模型客户端。
+
+        Args:
+            resource_cls (type): 资源节点类，如 EmbeddingResource。
+            resource_data (dict): 资源节点的 data 配置。
+
+        Returns:
+            str: 资源节点ID。
+        """
+        fingerprint = resource_fingerprint(resource_cls.__name__, resource_data)
+        resource_id = self.resource_ids_by_fingerprint.get(fingerprint)
+        if resource_id is None or resource_id not in self.id_map_basenode:
+            resource_id = str(uuid.uuid4())
+            self.id_map_basenode[resource_id] = resource_cls(
+                {"id": resource_id, "data": resource_data}, self
+            )
+            self.resource_ids_by_fingerprint[fingerprint] = resource_id
+        return resource_id
 
 
 class BaseNode:
@@ -764,15 +822,11 @@ class DocumentNode(BaseNode):
         self.activated_groups = []
         for group_data in self.activated_groups_resource:
             if "embed" in group_data and InferNode.is_infer_node(group_data["embed"]):
-                embed_data = {
-                    "id": str(uuid.uuid4()),
-                    "data": group_data["embed"],
-                }
-                self.run_context.id_map_basenode[embed_data["id"]] = EmbeddingResource(
-                    embed_data, self.run_context
+                embed_id = self.run_context.intern_resource(
+                    EmbeddingResource, group_data["embed"]
                 )
-                self.activated_groups.append([group_data["name"], embed_data["id"]])
-                self.set_used_resources("embed", embed_data["id"])
+                self.activated_groups.append([group_data["name"], embed_id])
+                self.set_used_resources("embed", embed_id)
             else:
                 self.activated_groups.append([group_data["name"], None])
 
@@ -786,29 +840,19 @@ class DocumentNode(BaseNode):
                 and node_data["embed"] is not None
                 and InferNode.is_infer_node(node_data["embed"])
             ):
-                embed_data = {
-                    "id": str(uuid.uuid4()),
-                    "data": node_data["embed"],
-                }
-                self.run_context.id_map_basenode[embed_data["id"]] = EmbeddingResource(
-                    embed_data, self.run_context
+                embed_id = self.run_context.intern_resource(
+                    EmbeddingResource, node_data["embed"]
                 )
-                self.set_used_resources("embed", embed_data["id"])
-                new_data["embed"] = embed_data["id"]
+                self.set_used_resources("embed", embed_id)
+                new_data["embed"] = embed_id
                 print(f"DocumentNode embed: {new_data}")
             else:
                 new_data["embed"] = None
 
             if "llm" in node_data and InferNode.is_infer_node(node_data["llm"]):
-                llm_data = {
-                    "id": str(uuid.uuid4()),
-                    "data": node_data["llm"],
-                }
-                self.run_context.id_map_basenode[llm_data["id"]] = LLMResource(
-                    llm_data, self.run_context
-                )
-                self.set_used_resources("llm", llm_data["id"])
-                new_data["llm"] = llm_data["id"]
+                llm_id = self.run_context.intern_resource(LLMResource, node_data["llm"])
+                self.set_used_resources("llm", llm_id)
+                new_data["llm"] = llm_id
 
             new_data.pop("embed_name", None)
             new_data.pop("enable_embed", None)
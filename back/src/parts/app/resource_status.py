@@ -0,0 +1,259 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from sqlalchemy import String, cast, literal, select, union_all
+
+from utils.util_database import db, invalidate_on_commit
+from utils.util_redis import redis_client
+
+
+class ResourceType:
+    DOCUMENT = "document"
+    TOOL = "tool"
+    MCP = "mcp"
+    APP = "app"
+
+
+# 资源表及决定其启用状态的字段, 这些字段变化或记录增删时缓存失效
+RESOURCE_TABLES = {
+    "knowledge_base": (),
+    "tool": ("enable",),
+    "mcp_server": ("enable",),
+    "newapps": ("enable_api",),
+}
+
+
+class ResourceStatusCache:
+    """资源禁用状态缓存。
+
+    以 (资源类型, 资源ID) 为单位记录是否被禁用，缓存键包含全局版本号，
+    任何资源启用状态变化或增删在事务提交后递增版本号。
+    """
+
+    VERSION_KEY = "resource_status:version"
+    STATUS_PREFIX = "resource_status"
+    EXPIRE_SECONDS = 60
+
+    @classmethod
+    def _key(cls, version, resource_type, resource_id):
+        return f"{cls.STATUS_PREFIX}:{version}:{resource_type}:{resource_id}"
+
+    @classmethod
+    def get_many(cls, refs):
+        """批量读取状态。
+
+        Args:
+            refs (list): (资源类型, 资源ID) 列表。
+
+        Returns:
+            tuple: (版本号, 命中的 {ref: 是否禁用})，Redis 不可用时版本号为 None。
+        """
+        if not refs:
+            return None, {}
+        try:
+            version = redis_client.get(cls.VERSION_KEY)
+            version = version.decode("utf-8") if version else "0"
+            values = redis_client.mget([cls._key(version, *ref) for ref in refs])
+        except Exception as e:
+            logging.warning(f"Failed to read resource status: {e}")
+            return None, {}
+        return version, {
+            ref: value == b"1" for ref, value in zip(refs, values) if value is not None
+        }
+
+    @classmethod
+    def set_many(cls, version, statuses):
+        """批量写入状态，version 为读取时的版本号，期间发生变化的写入自然失效。"""
+        if version is None or not statuses:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for ref, disabled in statuses.items():
+                pipe.setex(
+                    cls._key(version, *ref), cls.EXPIRE_SECONDS, "1" if disabled else "0"
+                )
+            pipe.execute()
+        except Exception as e:
+            logging.warning(f"Failed to write resource status: {e}")
+
+    @classmethod
+    def invalidate(cls):
+        """资源变化后调用，使所有状态失效。"""
+        try:
+            redis_client.incr(cls.VERSION_KEY)
+        except Exception as e:
+            logging.warning(f"Failed to invalidate resource status: {e}")
+
+
+def _query_enabled_refs(refs):
+    """一条 UNION ALL 查询出仍然可用的资源。
+
+    Args:
+        refs (Iterable[tuple]): (资源类型, 资源ID) 列表。
+
+    Returns:
+        set: 可用的 (资源类型, 资源ID)。
+    """
+    from parts.app.model import App
+    from parts.knowledge_base.model import KnowledgeBase
+    from parts.mcp.model import McpServer
+    from parts.tools.model import Tool
+
+    ids = {}
+    for resource_type, resource_id in refs:
+        ids.setdefault(resource_type, set()).add(resource_id)
+
+    def _int_ids(values):
+        return sorted(int(k) for k in values if str(k).isdigit())
+
+    selects = []
+    if ids.get(ResourceType.DOCUMENT):
+        selects.append(
+            select(
+                literal(ResourceType.DOCUMENT).label("type"),
+                cast(KnowledgeBase.id, String(40)).label("id"),
+            ).where(KnowledgeBase.id.in_(sorted(ids[ResourceType.DOCUMENT])))
+        )
+    if _int_ids(ids.get(ResourceType.TOOL, ())):
+        selects.append(
+            select(
+                literal(ResourceType.TOOL).label("type"),
+                cast(Tool.id, String(40)).label("id"),
+            ).where(
+                Tool.id.in_(_int_ids(ids[ResourceType.TOOL])), Tool.enable == True
+            )
+        )
+    if _int_ids(ids.get(ResourceType.MCP, ())):
+        selects.append(
+            select(
+                literal(ResourceType.MCP).label("type"),
+                cast(McpServer.id, String(40)).label("id"),
+            ).where(
+                McpServer.id.in_(_int_ids(ids[ResourceType.MCP])),
+                McpServer.enable == True,
+            )
+        )
+    if ids.get(ResourceType.APP):
+        selects.append(
+            select(
+                literal(ResourceType.APP).label("type"),
+                cast(App.id, String(40)).label("id"),
+            ).where(App.id.in_(sorted(ids[ResourceType.APP])), App.enable_api == True)
+        )
+    if not selects:
+        return set()
+
+    stmt = selects[0] if len(selects) == 1 else union_all(*selects)
+    return {(row.type, row.id) for row in db.session.execute(stmt)}
+
+
+def _resource_ref(data, kind):
+    """节点或资源数据对应的 (资源类型, 资源ID)，不涉及启用状态时返回 None。"""
+    if kind == "document":
+        resource_id = data.get("payload__knowledge_id")
+        if isinstance(resource_id, list):
+            resource_id = resource_id[0] if resource_id else None
+        resource_type = ResourceType.DOCUMENT
+    elif kind == "httptool":
+        resource_id = data.get("provider_id")
+        resource_type = ResourceType.TOOL
+    elif kind == "mcptool":
+        resource_id = data.get("provider_id")
+        resource_type = ResourceType.MCP
+    else:
+        return None
+    return (resource_type, str(resource_id)) if resource_id else None
+
+
+class ResourceStatusService:
+    """工作流引用资源的启用状态。
+
+    一次遍历整个嵌套画布收集全部引用的知识库、工具、MCP 服务和应用，
+    先读缓存，未命中的部分合并为一条查询，再把 ref_status 写回各资源。
+    """
+
+    @staticmethod
+    def collect(graph):
+        """收集嵌套画布中需要标注状态的资源。
+
+        资源列表中的知识库、工具和 MCP 服务，以及画布中引用的应用节点。
+
+        Args:
+            graph (dict): 画布数据，子画布位于节点 data 的 config__patent_graph 中。
+
+        Returns:
+            list: (资源类型, 资源ID, 节点 data) 列表。
+        """
+        found = []
+        stack = [graph]
+        while stack:
+            current = stack.pop()
+            for resource in current.get("resources", []) or []:
+                data = resource.get("data") or {}
+                ref = _resource_ref(data, (data.get("payload__kind") or "").lower())
+                if ref:
+                    found.append((*ref, data))
+            for node in current.get("nodes", []) or []:
+                data = node.get("data") or {}
+                kind = (data.get("payload__kind") or "").lower()
+                if kind == "app" and data.get("payload__patent_id"):
+                    found.append(
+                        (ResourceType.APP, str(data["payload__patent_id"]), data)
+                    )
+                subgraph = data.get("config__patent_graph")
+                if isinstance(subgraph, dict):
+                    stack.append(subgraph)
+        return found
+
+    @staticmethod
+    def resolve_disabled(refs):
+        """查询资源是否被禁用。
+
+        Args:
+            refs (Iterable[tuple]): (资源类型, 资源ID) 列表。
+
+        Returns:
+            dict: (资源类型, 资源ID) 到是否禁用的映射。
+        """
+        refs = sorted(set(refs))
+        version, statuses = ResourceStatusCache.get_many(refs)
+        missing = [ref for ref in refs if ref not in statuses]
+        if missing:
+            enabled = _query_enabled_refs(missing)
+            loaded = {ref: ref not in enabled for ref in missing}
+            ResourceStatusCache.set_many(version, loaded)
+            statuses.update(loaded)
+        return statuses
+
+    @classmethod
+    def annotate_graph(cls, graph):
+        """为画布及全部子画布中的资源写入 ref_status, True 表示资源已被禁用或删除。
+
+        Args:
+            graph (dict): 画布数据, 原地修改。
+        """
+        found = cls.collect(graph)
+        if not found:
+            return
+        statuses = cls.resolve_disabled((t, k) for t, k, _ in found)
+        for resource_type, resource_id, data in found:
+            data["ref_status"] = statuses[(resource_type, resource_id)]
+
+
+invalidate_on_commit(
+    "resource_status_changed", RESOURCE_TABLES, ResourceStatusCache.invalidate
+)
@@ -0,0 +1,102 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ipaddress
+
+from libs.metrics import registry
+from utils.util_redis import redis_client
+
+UNKNOWN_NODE_TYPE = "unknown"
+
+
+def _reflux_queue_depth():
+    from parts.data.data_reflux_service import REFLUX_QUEUE_KEY
+
+    yield (), redis_client.llen(REFLUX_QUEUE_KEY)
+
+
+NODE_LATENCY = registry.histogram(
+    "lazycraft_node_latency_seconds",
+    "节点执行耗时",
+    ("app_id", "node_type"),
+)
+NODE_REPORTS = registry.counter(
+    "lazycraft_node_reports_total",
+    "收到的节点执行报告数",
+    ("mode",),
+)
+NODE_TOKENS = registry.counter(
+    "lazycraft_node_tokens_total",
+    "节点消耗的 token 数",
+    ("app_id", "node_type", "kind"),
+)
+REPORT_ERRORS = registry.counter(
+    "lazycraft_report_errors_total",
+    "处理节点报告时的错误数",
+    ("stage",),
+)
+REFLUX_QUEUE_DEPTH = registry.gauge(
+    "lazycraft_reflux_queue_depth",
+    "待落库的数据回流事件数",
+    collect=_reflux_queue_depth,
+)
+
+
+def record_node_report(
+    app_id, mode, node_type, cost_time, prompt_tokens, completion_tokens
+):
+    """记录一次节点执行报告。
+
+    只更新进程内的计数，不访问 Redis 或数据库。
+
+    Args:
+        app_id (str): 应用ID。
+        mode (str): 运行模式，draft/publish/node 等。
+        node_type (str): 节点类型，未知时记为 unknown。
+        cost_time (float): 节点耗时（秒）。
+        prompt_tokens (int): 提示词 token 数。
+        completion_tokens (int): 完成 token 数。
+    """
+    node_type = node_type or UNKNOWN_NODE_TYPE
+    NODE_REPORTS.inc(mode)
+    NODE_LATENCY.observe(app_id, node_type, value=max(float(cost_time or 0), 0.0))
+    if prompt_tokens:
+        NODE_TOKENS.inc(app_id, node_type, "prompt", amount=prompt_tokens)
+    if completion_tokens:
+        NODE_TOKENS.inc(app_id, node_type, "completion", amount=completion_tokens)
+
+
+def record_report_error(stage):
+    """记录处理报告时的错误。
+
+    Args:
+        stage (str): 出错的环节，parse 或 backflow。
+    """
+    REPORT_ERRORS.inc(stage)
+
+
+def is_local_address(remote_addr):
+    """判断请求是否来自本机，指标接口只对本机开放。
+
+    Args:
+        remote_addr (str): 请求的直连地址，不使用可伪造的代理头。
+
+    Returns:
+        bool: 是否为回环地址。
+    """
+    try:
+        return ipaddress.ip_address(remote_addr or "").is_loopback
+    except ValueError:
+        return False
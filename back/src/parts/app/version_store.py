@@ -0,0 +1,265 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import uuid
+
+# 每个应用保留的版本数量上限
+MAX_APP_VERSIONS = 100
+
+SNAPSHOT_FORMAT = "app_snapshot/v1"
+BLOB_REF_KEY = "$blob"
+SUBGRAPH_KEY = "config__patent_graph"
+
+
+def _canonical_bytes(data):
+    return json.dumps(
+        data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def _is_blob_ref(value):
+    return isinstance(value, dict) and len(value) == 1 and BLOB_REF_KEY in value
+
+
+class AppVersionStore:
+    """应用版本快照的内容寻址存储。
+
+    画布按子画布拆分为多个 blob，以内容哈希命名并 gzip 压缩后保存，
+    父画布中的子画布替换为 {"$blob": 哈希} 引用。内容相同的画布或子画布
+    只保存一份，保存版本时只需写入发生变化的部分。
+    每个版本只保存一个很小的清单文件，记录应用信息、根画布哈希及引用到的全部 blob。
+    blob 目录下的 refs.json 记录每个 blob 被多少个版本引用，删除版本时只需读取
+    该版本的清单，引用数归零的 blob 随即删除。保存和删除版本会修改引用计数，
+    调用方需持有应用级别的锁。
+    """
+
+    REFS_FILE = "refs.json"
+
+    def __init__(self, blob_dir):
+        self.blob_dir = blob_dir
+
+    def _refs_path(self):
+        return os.path.join(self.blob_dir, self.REFS_FILE)
+
+    def has_ref_counts(self):
+        """引用计数文件是否存在，不存在时需先调用 rebuild_ref_counts。"""
+        return os.path.exists(self._refs_path())
+
+    def _load_ref_counts(self):
+        if not self.has_ref_counts():
+            return {}
+        with open(self._refs_path(), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_ref_counts(self, refs):
+        os.makedirs(self.blob_dir, exist_ok=True)
+        path = self._refs_path()
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(refs, sort_keys=True))
+        os.replace(tmp_path, path)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], f"{digest}.json.gz")
+
+    def _put_blob(self, data):
+        raw = _canonical_bytes(data)
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再改名，避免并发保存时读到不完整的 blob
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(raw)
+            os.replace(tmp_path, path)
+        return digest
+
+    def _get_blob(self, digest):
+        with gzip.open(self._blob_path(digest), "rb") as f:
+            return json.loads(f.read())
+
+    def put_graph(self, graph, digests=None):
+        """保存画布及其全部子画布。
+
+        Args:
+            graph (dict): 嵌套画布数据，子画布位于节点 data 的 config__patent_graph 中。
+            digests (set, optional): 用于收集本次引用到的全部 blob 哈希。
+
+        Returns:
+            str: 根画布的哈希。
+        """
+        nodes = []
+        for node in graph.get("nodes", []):
+            data = node.get("data") if isinstance(node, dict) else None
+            subgraph = data.get(SUBGRAPH_KEY) if isinstance(data, dict) else None
+            if isinstance(subgraph, dict) and subgraph.get("nodes"):
+                sub_digest = self.put_graph(subgraph, digests)
+                data = {**data, SUBGRAPH_KEY: {BLOB_REF_KEY: sub_digest}}
+                node = {**node, "data": data}
+            nodes.append(node)
+
+        if "nodes" in graph:
+            graph = {**graph, "nodes": nodes}
+        digest = self._put_blob(graph)
+        if digests is not None:
+            digests.add(digest)
+        return digest
+
+    def get_graph(self, digest):
+        """读取画布并还原全部子画布。
+
+        Args:
+            digest (str): 画布哈希。
+
+        Returns:
+            dict: 嵌套画布数据。
+        """
+        graph = self._get_blob(digest)
+        for node in graph.get("nodes", []):
+            data = node.get("data") if isinstance(node, dict) else None
+            if isinstance(data, dict) and _is_blob_ref(data.get(SUBGRAPH_KEY)):
+                data[SUBGRAPH_KEY] = self.get_graph(data[SUBGRAPH_KEY][BLOB_REF_KEY])
+        return graph
+
+    def save_snapshot(self, app_data, graph, file_path):
+        """保存一个版本的清单文件，并增加其引用的 blob 的引用计数。
+
+        Args:
+            app_data (dict): 应用导出信息，不含画布。
+            graph (dict): 嵌套画布数据。
+            file_path (str): 清单文件路径。
+
+        Returns:
+            str: 清单文件路径。
+        """
+        digests = set()
+        root = self.put_graph(graph or {}, digests)
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "app": app_data,
+            "graph": root,
+            "blobs": sorted(digests),
+        }
+        # 先增加引用计数再写清单，中途失败只会多保留 blob，不会误删
+        refs = self._load_ref_counts()
+        for digest in digests:
+            refs[digest] = refs.get(digest, 0) + 1
+        self._save_ref_counts(refs)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(manifest, ensure_ascii=False))
+        return file_path
+
+    def remove_snapshot(self, file_path):
+        """删除一个版本的清单文件，并删除引用计数归零的 blob。
+
+        Args:
+            file_path (str): 清单文件路径，旧版本的完整 JSON 文件直接删除。
+
+        Returns:
+            int: 删除的 blob 数量。
+        """
+        manifest = _read_manifest(file_path)
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+        if manifest is None:
+            return 0
+
+        refs = self._load_ref_counts()
+        removed = 0
+        for digest in manifest.get("blobs", []):
+            count = refs.get(digest, 0) - 1
+            if count > 0:
+                refs[digest] = count
+                continue
+            refs.pop(digest, None)
+            path = self._blob_path(digest)
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        self._save_ref_counts(refs)
+        return removed
+
+    def rebuild_ref_counts(self, manifest_paths):
+        """根据全部保留的版本清单重建引用计数，并删除不再被引用的 blob。
+
+        Args:
+            manifest_paths (list): 仍保留的版本清单文件路径。
+
+        Returns:
+            int: 删除的 blob 数量。
+        """
+        refs = {}
+        for path in manifest_paths:
+            manifest = _read_manifest(path)
+            if manifest is not None:
+                for digest in manifest.get("blobs", []):
+                    refs[digest] = refs.get(digest, 0) + 1
+
+        removed = 0
+        if os.path.isdir(self.blob_dir):
+            for prefix in os.listdir(self.blob_dir):
+                prefix_dir = os.path.join(self.blob_dir, prefix)
+                if not os.path.isdir(prefix_dir):
+                    continue
+                for name in os.listdir(prefix_dir):
+                    digest = name.split(".", 1)[0]
+                    if name.endswith(".json.gz") and digest not in refs:
+                        os.remove(os.path.join(prefix_dir, name))
+                        removed += 1
+        self._save_ref_counts(refs)
+        return removed
+
+
+def _read_manifest(file_path):
+    """读取清单文件，旧版本的完整 JSON 文件返回 None。"""
+    if not file_path or not os.path.exists(file_path):
+        return None
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Failed to read app version manifest {file_path}: {e}")
+        return None
+    if isinstance(data, dict) and data.get("format") == SNAPSHOT_FORMAT:
+        return data
+    return None
+
+
+def load_app_snapshot(file_path, blob_dir):
+    """读取一个版本的完整导出数据。
+
+    兼容旧版本直接保存的完整 JSON 文件。
+
+    Args:
+        file_path (str): 版本文件路径。
+        blob_dir (str): blob 存储目录。
+
+    Returns:
+        dict: 应用导出数据，graph 为完整的嵌套画布。
+    """
+    manifest = _read_manifest(file_path)
+    if manifest is None:
+        with open(file_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    result = dict(manifest.get("app") or {})
+    result["graph"] = AppVersionStore(blob_dir).get_graph(manifest["graph"])
+    return result
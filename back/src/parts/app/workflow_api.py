@@ -41,9 +41,11 @@ from utils.util_database import db
 
 from . import fields
 from .app_service import AppService, TemplateService, WorkflowService
+from .doc_progress import DocParseProgress
 from .model import Workflow
 from .refer_service import ReferManager
 from .reflux_helper import RefluxHelper
+from .resource_status import ResourceStatusService
 
 
 class DraftWorkflowNotExist(BaseHTTPError):
@@ -81,9 +83,8 @@ class DraftWorkflowApi(Resource):
             self.check_can_read_object(app_model)
 
         workflow_dict = marshal(workflow, fields.workflow_fields)
-        if workflow:
-            new_graph = workflow_dict.get("graph", {})
-            workflow.update_resource_ref_status(new_graph.get("resources", []))
+        # 一次性标注主画布及子画布中全部资源的启用状态
+        ResourceStatusService.annotate_graph(workflow_dict.get("graph") or {})
 
         return workflow_dict
 
@@ -94,7 +95,7 @@ class DraftWorkflowApi(Resource):
         Args:
             app_id (str): 应用ID
             graph (dict, required): 工作流图配置
-            hash (str, optional): 工作流哈希值
+            hash (str, optional): 客户端所基于版本的哈希值, 即上次保存返回的 hash
 
         Returns:
             dict: 同步结果
@@ -138,10 +139,9 @@ class DraftWorkflowApi(Resource):
             workflow.update_graph(graph)
             db.session.add(workflow)
             db.session.commit()
-        else:  # update draft workflow if found
+        elif workflow.update_graph(graph):  # update draft workflow if changed
             workflow.updated_by = current_user.id
             workflow.updated_at = TimeTools.now_datetime_china()
-            workflow.update_graph(graph)
             db.session.commit()
 
         return {
@@ -545,6 +545,7 @@ class DocParseApi(Resource):
 
             # 第一次解析
             if not files_info:
+                DocParseProgress(app_id, doc_id, args["paths"]).reset()
                 app_run.run_single_rsource(
                     app_id, workflow.nested_graph_dict, doc_id, args["paths"]
                 )
@@ -554,6 +555,7 @@ class DocParseApi(Resource):
                 dlm.update_kb_group(
                     files_info.keys(), group_name, new_status=dlm.Status.waiting
                 )
+                DocParseProgress(app_id, doc_id, args["paths"]).reset()
                 app_run.run_single_rsource(
                     app_id, workflow.nested_graph_dict, doc_id, args["paths"]
                 )
@@ -46,7 +46,7 @@ from flask import request
 from flask_login import current_user
 from flask_restful import reqparse
 
-from core.account_manager import AccountService
+from core.account_manager import AccountService, PrincipalCache
 from core.restful import Resource
 from libs.helper import email as email_validate
 from libs.password import hash_password
@@ -423,6 +423,7 @@ class ForgotPasswordResetApi(Resource):
         account.password = password_hash
         account.password_salt = salt
         db.session.commit()
+        PrincipalCache.invalidate(account.id)
         
         return account
 
@@ -562,6 +563,7 @@ class ForgotPasswordAdminResetApi(Resource):
         account.password = password_hash
         account.password_salt = salt
         db.session.commit()
+        PrincipalCache.invalidate(account.id)
 
     def _log_admin_password_reset(self, target_account: Account) -> None:
         """记录管理员密码重置操作日志"""
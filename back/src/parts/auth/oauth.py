@@ -22,7 +22,7 @@ import requests
 from flask import current_app, redirect, request
 from flask_restful import Resource, reqparse
 
-from core.account_manager import AccountService, RegisterService, TenantService
+from core.account_manager import AccountService, PrincipalCache, RegisterService, TenantService
 from libs.helper import get_remote_ip
 from libs.oauth import GitHubOAuth
 from models.model_account import Account
@@ -200,6 +200,7 @@ class OAuthPostHandle(Resource):
             if account:  # 邮箱账号存在
                 account.phone = body.phone
                 db.session.commit()
+                PrincipalCache.invalidate(account.id)
             else:  # 创建账号
                 account = RegisterService.register(
                     save_user["email"], body.phone, save_user["name"], password=None
@@ -192,7 +192,7 @@ class CalcAndSaveAppStatisticsApi(Resource):
                 stat_date (str, optional): 统计日期，格式为"YYYY-MM-DD"。
                 stat_date_start (str, optional): 统计开始日期，格式为"YYYY-MM-DD"。
                 stat_date_end (str, optional): 统计结束日期，格式为"YYYY-MM-DD"。
-                need_save_db (bool, optional): 是否需要保存到数据库，默认为False。
+                need_save_db (bool, optional): 是否需要保存到数据库，默认为False，仅支持单日统计。
 
         Returns:
             dict: 包含统计结果的字典。
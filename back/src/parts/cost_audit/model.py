@@ -70,6 +70,9 @@ class AppStatistics(db.Model):
         cost_time_p50 (Numeric): 响应时间P50值，默认为0。
         cost_time_p99 (Numeric): 响应时间P99值，默认为0。
         web_user_avg_interaction (float): Web用户平均互动数，默认为0。
+        token_sum (int): 当日该调用类型的Token消耗总数。
+        distinct_sketch (str): 用户和会话的去重计数草图（JSON），用于跨天去重合并。
+        cost_time_sketch (str): 响应耗时分位数草图（JSON），用于合并计算P50/P99。
         created_at (datetime): 记录创建时间，默认为当前UTC时间。
     """
 
@@ -89,6 +92,9 @@ class AppStatistics(db.Model):
     cost_time_p50 = db.Column(db.Numeric(10, 5), default=0)
     cost_time_p99 = db.Column(db.Numeric(10, 5), default=0)
     web_user_avg_interaction = db.Column(db.Float, default=0)
+    token_sum = db.Column(db.BigInteger, default=0)
+    distinct_sketch = db.Column(db.Text)
+    cost_time_sketch = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=func.now())
 
     def to_dict(self):
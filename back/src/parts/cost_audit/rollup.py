@@ -0,0 +1,304 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import hashlib
+import json
+import math
+import zlib
+
+
+class LatencySketch:
+    """可合并的耗时分位数草图。
+
+    按对数等比分桶计数，分位数的相对误差不超过 (GAMMA - 1) / 2，
+    多个草图相加即可得到合并区间的分位数，无需保留原始耗时。
+
+    Attributes:
+        GAMMA (float): 相邻分桶的比例。
+        MIN_VALUE (float): 小于该值的耗时计入零值桶。
+    """
+
+    GAMMA = 1.02
+    MIN_VALUE = 1e-6
+
+    def __init__(self, buckets=None, zero_count=0):
+        self.buckets = buckets or {}
+        self.zero_count = zero_count
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.buckets.values())
+
+    def add(self, value):
+        """记录一个耗时。
+
+        Args:
+            value (float): 耗时，单位为秒。
+        """
+        if value < self.MIN_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value, self.GAMMA))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        """合并另一个草图。
+
+        Args:
+            other (LatencySketch): 待合并的草图。
+        """
+        self.zero_count += other.zero_count
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def quantile(self, q):
+        """计算分位数，与对排序后列表取 sorted[int(n * q)] 的口径一致。
+
+        Args:
+            q (float): 分位点，取值 0~1。
+
+        Returns:
+            float: 分位数的近似值，没有数据时返回 0。
+        """
+        n = self.count
+        if n == 0:
+            return 0
+        rank = min(int(n * q), n - 1)
+        if rank < self.zero_count:
+            return 0
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * self.GAMMA**index / (self.GAMMA + 1)
+        return 0
+
+    def to_json(self):
+        return json.dumps({"zero": self.zero_count, "buckets": self.buckets})
+
+    @classmethod
+    def from_json(cls, raw):
+        if not raw:
+            return cls()
+        data = json.loads(raw)
+        buckets = {int(k): v for k, v in data.get("buckets", {}).items()}
+        return cls(buckets=buckets, zero_count=data.get("zero", 0))
+
+
+class DistinctSketch:
+    """可合并的去重计数草图（HyperLogLog）。
+
+    固定 2**PRECISION 个寄存器，去重计数的标准误差约为 1.04 / sqrt(寄存器数)，
+    合并时逐寄存器取最大值，存储和合并开销与数据量无关。
+
+    Attributes:
+        PRECISION (int): 寄存器下标的位数。
+    """
+
+    PRECISION = 11
+    HASH_BITS = 64
+
+    def __init__(self, registers=None):
+        self.registers = registers or bytearray(1 << self.PRECISION)
+
+    def add(self, value):
+        """记录一个元素。
+
+        Args:
+            value (str): 待去重的元素。
+        """
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        rest_bits = self.HASH_BITS - self.PRECISION
+        index = hashed >> rest_bits
+        rest = hashed & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """合并另一个草图。
+
+        Args:
+            other (DistinctSketch): 待合并的草图。
+        """
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        """估算去重后的元素个数。
+
+        Returns:
+            int: 元素个数的估计值，基数较小时使用线性计数修正。
+        """
+        m = len(self.registers)
+        zeros = self.registers.count(0)
+        if zeros == m:
+            return 0
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0**-r for r in self.registers)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_json(self):
+        return base64.b64encode(zlib.compress(bytes(self.registers))).decode()
+
+    @classmethod
+    def from_json(cls, raw):
+        if not raw:
+            return cls()
+        registers = bytearray(zlib.decompress(base64.b64decode(raw)))
+        if len(registers) != 1 << cls.PRECISION:
+            return cls()
+        return cls(registers)
+
+
+class AppStatRollup:
+    """应用统计的可合并中间状态。
+
+    每个应用每天一条，互动数和 Token 按天累加，用户数、会话数用去重草图合并，
+    耗时用分位数草图合并。中间状态的大小固定，周、月等区间的统计由多天的状态
+    合并得到，不必重新扫描原始记录。
+    """
+
+    SYSTEM = "system"
+    WEB = "web"
+    USER_TYPES = (SYSTEM, WEB)
+
+    def __init__(self):
+        self.token_sum = 0
+        self.system_user_token_sum = 0
+        self.web_user_token_sum = 0
+        self.interactions = {user_type: 0 for user_type in self.USER_TYPES}
+        self.users = {user_type: DistinctSketch() for user_type in self.USER_TYPES}
+        self.sessions = {user_type: DistinctSketch() for user_type in self.USER_TYPES}
+        self.latency = LatencySketch()
+
+    @staticmethod
+    def turn_count(first_turn, last_turn):
+        """计算会话在统计区间内的互动数。
+
+        会话跨天时各天只计当天发生的轮次，按天累加后与整段扫描一致；
+        没有有效轮次（单轮对话）时沿用最大轮次的口径。
+
+        Args:
+            first_turn (int): 区间内的最小轮次。
+            last_turn (int): 区间内的最大轮次。
+
+        Returns:
+            int: 互动数。
+        """
+        if not first_turn or first_turn < 1:
+            return last_turn or 0
+        return last_turn - first_turn + 1
+
+    def add_user(self, user_type, user_id):
+        """记录一个用户。"""
+        self.users[user_type].add(user_id)
+
+    def add_session(self, sessionid, user_type, turns):
+        """记录一个会话及其在区间内的互动数。"""
+        self.sessions[user_type].add(sessionid)
+        self.interactions[user_type] += turns
+
+    def merge(self, other):
+        """合并另一段时间的状态。
+
+        Args:
+            other (AppStatRollup): 待合并的状态。
+        """
+        self.token_sum += other.token_sum
+        self.system_user_token_sum += other.system_user_token_sum
+        self.web_user_token_sum += other.web_user_token_sum
+        for user_type in self.USER_TYPES:
+            self.interactions[user_type] += other.interactions[user_type]
+            self.users[user_type].merge(other.users[user_type])
+            self.sessions[user_type].merge(other.sessions[user_type])
+        self.latency.merge(other.latency)
+
+    def to_stat_fields(self):
+        """计算 AppStatistics 的统计字段。
+
+        Returns:
+            dict: AppStatistics 的计数类字段。
+        """
+        web_user_count = self.users[self.WEB].count()
+        web_interactions = self.interactions[self.WEB]
+        return {
+            "system_user_count": self.users[self.SYSTEM].count(),
+            "web_user_count": web_user_count,
+            "system_user_session_count": self.sessions[self.SYSTEM].count(),
+            "web_user_session_count": self.sessions[self.WEB].count(),
+            "system_user_token_sum": self.system_user_token_sum,
+            "web_user_token_sum": self.web_user_token_sum,
+            "system_user_interaction_count": self.interactions[self.SYSTEM],
+            "web_user_interaction_count": web_interactions,
+            "cost_time_p50": self.latency.quantile(0.5),
+            "cost_time_p99": self.latency.quantile(0.99),
+            "web_user_avg_interaction": (
+                web_interactions / web_user_count if web_user_count > 0 else 0
+            ),
+        }
+
+    def apply_to(self, stat):
+        """把状态和统计字段写入 AppStatistics 记录。
+
+        Args:
+            stat (AppStatistics): 目标记录。
+        """
+        for key, value in self.to_stat_fields().items():
+            setattr(stat, key, value)
+        stat.token_sum = self.token_sum
+        sketches = {}
+        for user_type in self.USER_TYPES:
+            sketches[f"{user_type}_users"] = self.users[user_type].to_json()
+            sketches[f"{user_type}_sessions"] = self.sessions[user_type].to_json()
+        stat.distinct_sketch = json.dumps(sketches)
+        stat.cost_time_sketch = self.latency.to_json()
+
+    @staticmethod
+    def has_state(stat):
+        """判断 AppStatistics 记录是否保存了可合并状态。"""
+        return stat.distinct_sketch is not None
+
+    @classmethod
+    def from_model(cls, stat):
+        """从 AppStatistics 记录恢复状态。
+
+        Args:
+            stat (AppStatistics): 已保存状态的记录。
+
+        Returns:
+            AppStatRollup: 恢复的状态。
+        """
+        rollup = cls()
+        rollup.token_sum = stat.token_sum or 0
+        rollup.system_user_token_sum = stat.system_user_token_sum or 0
+        rollup.web_user_token_sum = stat.web_user_token_sum or 0
+        rollup.interactions = {
+            cls.SYSTEM: stat.system_user_interaction_count or 0,
+            cls.WEB: stat.web_user_interaction_count or 0,
+        }
+        sketches = json.loads(stat.distinct_sketch or "{}")
+        for user_type in cls.USER_TYPES:
+            rollup.users[user_type] = DistinctSketch.from_json(
+                sketches.get(f"{user_type}_users")
+            )
+            rollup.sessions[user_type] = DistinctSketch.from_json(
+                sketches.get(f"{user_type}_sessions")
+            )
+        rollup.latency = LatencySketch.from_json(stat.cost_time_sketch)
+        return rollup
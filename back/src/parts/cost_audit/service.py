@@ -15,6 +15,7 @@
 
 import json
 import logging
+import uuid
 from datetime import date, datetime, timedelta
 
 from sqlalchemy import func
@@ -28,6 +29,7 @@ from utils.util_database import db
 from utils.util_redis import redis_client
 
 from .model import AppStatistics, CostAudit
+from .rollup import AppStatRollup
 
 CATEGORY_TYPES = {
     "debug": "应用编排",
@@ -37,6 +39,9 @@ CATEGORY_TYPES = {
     "fine_tune_local": "模型微调(线下模型)",
 }
 
+# 按账号ID批量判断系统用户时每批的数量
+SYSTEM_USER_QUERY_BATCH = 500
+
 
 class CostService:
     def add(
@@ -134,7 +139,10 @@ class CostService:
         - 累计用户数（Conversation.from_who在Account.id中的数量）
         - 临时用户数（Conversation.from_who不在Account.id中的数量）
         - 累计会话数（Conversation.sessionid去重计数）
-        - 累计互动数（Conversation中每个sessionid下from_who为lazyllm的turn_number最大值之和）
+        - 累计互动数（Conversation中每个sessionid下turn_number最大值之和）
+
+        历史部分由AppStatistics中已保存的每日中间状态合并得到，
+        只有当天和尚未汇总的日期需要扫描原始记录。
 
         Args:
             app_id (str): 指定应用ID。
@@ -160,64 +168,27 @@ class CostService:
             except Exception:
                 pass
 
-        # 1. 累计token消费总数
-        token_sum = (
-            db.session.query(func.sum(CostAudit.token_num))
-            .filter(CostAudit.app_id == app_id, CostAudit.call_type == "release")
+        first_time = (
+            db.session.query(func.min(Conversation.created_at))
+            .filter(Conversation.app_id == app_id)
             .scalar()
-            or 0
         )
-
-        # 2. 获取所有有效用户id集合
-        all_user_ids = set(
-            str(acc.id) for acc in Account.query.with_entities(Account.id).all()
-        )
-
-        # 3. 查询该app下所有会话
-        conversations = (
-            db.session.query(
-                Conversation.sessionid, Conversation.from_who, Conversation.turn_number
+        rollup = AppStatRollup()
+        if first_time:
+            rollup = CostService._merge_rollups(
+                app_id, "release", first_time.date(), date.today()
             )
-            .filter(Conversation.app_id == app_id)
-            .all()
-        )
-
-        # 4. 累计会话数
-        sessionid_set = set()
-        # 5. 用户统计
-        user_set = set()
-        guest_set = set()
-        # 6. 互动数统计
-        # sessionid -> 最大turn_number（只统计from_who为lazyllm的）
-        session_turn_max = {}
-
-        for sessionid, from_who, turn_number in conversations:
-            if sessionid:
-                sessionid_set.add(sessionid)
-            if from_who and from_who != "lazyllm":
-                if from_who in all_user_ids:
-                    user_set.add(from_who)
-                else:
-                    guest_set.add(from_who)
-            if from_who == "lazyllm" and sessionid:
-                if sessionid not in session_turn_max or (
-                    turn_number is not None
-                    and turn_number > session_turn_max[sessionid]
-                ):
-                    session_turn_max[sessionid] = turn_number or 0
-
-        session_count = len(sessionid_set)
-        user_count = len(user_set)
-        guest_count = len(guest_set)
-        interaction_count = sum(session_turn_max.values())
 
+        fields = rollup.to_stat_fields()
         result = {
             "app_id": app_id,
-            "token_sum": int(token_sum),
-            "user_count": user_count,
-            "guest_count": guest_count,
-            "session_count": session_count,
-            "interaction_count": int(interaction_count),
+            "token_sum": int(rollup.token_sum),
+            "user_count": fields["system_user_count"],
+            "guest_count": fields["web_user_count"],
+            "session_count": fields["system_user_session_count"]
+            + fields["web_user_session_count"],
+            "interaction_count": fields["system_user_interaction_count"]
+            + fields["web_user_interaction_count"],
         }
 
         # 缓存到redis
@@ -226,53 +197,43 @@ class CostService:
         return result
 
     @staticmethod
-    def calc_and_save_app_statistics(
-        app_id,
-        call_type="release",
-        stat_date=None,
-        stat_date_start=None,
-        stat_date_end=None,
-        need_save_db=False,
-    ):
-        """统计指定app_id下的各类指标，并存入AppStatistics表。
+    def _filter_system_user_ids(user_ids):
+        """从用户标识中筛选出系统用户。
 
         Args:
-            app_id (str): 应用ID。
-            call_type (str, optional): 调用类型，默认为"release"。
-            stat_date (date, optional): 统计日期。如果指定，则统计该日期的数据。
-            stat_date_start (date, optional): 统计开始日期。与stat_date_end配合使用。
-            stat_date_end (date, optional): 统计结束日期。与stat_date_start配合使用。
-            need_save_db (bool, optional): 是否需要保存到数据库，默认为False。
+            user_ids (Iterable[str]): 待判断的用户标识。
 
         Returns:
-            dict: 包含统计结果的字典，包括系统用户数、Web用户数、会话数、
-                  Token消耗、互动数、响应时间等指标。
-
-        Raises:
-            CommonError: 当指定的app_id不存在时抛出异常。
-            ValueError: 当stat_date和stat_date_start/stat_date_end都未指定时抛出异常。
+            set: 属于系统账号的用户标识。
         """
-        # 校验app_id是否存在
-        app = App.query.filter_by(id=app_id).first()
-        if not app:
-            raise CommonError("指定的app_id不存在")
+        candidates = []
+        for user_id in user_ids:
+            try:
+                if str(uuid.UUID(user_id)) == user_id:
+                    candidates.append(user_id)
+            except (TypeError, ValueError):
+                continue
 
-        # 1. 统计时间区间
-        if stat_date:
-            start_time = datetime.combine(stat_date, datetime.min.time())
-            end_time = datetime.combine(stat_date, datetime.max.time())
-        else:
-            if not stat_date_start or not stat_date_end:
-                raise ValueError("必须指定stat_date或stat_date_start和stat_date_end")
-            start_time = datetime.combine(stat_date_start, datetime.min.time())
-            end_time = datetime.combine(stat_date_end, datetime.max.time())
+        system_user_ids = set()
+        for i in range(0, len(candidates), SYSTEM_USER_QUERY_BATCH):
+            batch = candidates[i : i + SYSTEM_USER_QUERY_BATCH]
+            rows = db.session.query(Account.id).filter(Account.id.in_(batch)).all()
+            system_user_ids.update(str(row.id) for row in rows)
+        return system_user_ids
 
-        # 2. 获取所有系统用户id集合
-        all_user_ids = set(
-            str(acc.id) for acc in Account.query.with_entities(Account.id).all()
-        )
+    @staticmethod
+    def _build_rollup(app_id, call_type, start_time, end_time):
+        """扫描指定时间区间的原始记录，生成可合并的统计状态。
 
-        # 3. 查询app下所有会话
+        Args:
+            app_id (str): 应用ID。
+            call_type (str): 调用类型。
+            start_time (datetime): 开始时间（包含）。
+            end_time (datetime): 结束时间（包含）。
+
+        Returns:
+            AppStatRollup: 该区间的统计状态。
+        """
         conversations = (
             db.session.query(
                 Conversation.sessionid, Conversation.from_who, Conversation.turn_number
@@ -285,63 +246,32 @@ class CostService:
             )
             .all()
         )
+        system_user_ids = CostService._filter_system_user_ids(
+            {from_who for _, from_who, _ in conversations if from_who}
+        )
 
-        # 4. sessionid归类
-        sessionid_to_user_type = {}
-        sessionid_set = set()
-        system_user_set = set()
-        web_user_set = set()
-        system_user_session_set = set()
-        web_user_session_set = set()
-        system_user_interaction = {}
-        web_user_interaction = {}
-
+        rollup = AppStatRollup()
+        session_turns = {}  # sessionid -> [用户类型, 最小轮次, 最大轮次]
         for sessionid, from_who, turn_number in conversations:
-            if not sessionid:
+            if not sessionid or not from_who:
                 continue
-            sessionid_set.add(sessionid)
-            is_system_user = (
-                from_who and from_who != "lazyllm" and from_who in all_user_ids
+            if from_who in system_user_ids:
+                user_type = AppStatRollup.SYSTEM
+            else:
+                user_type = AppStatRollup.WEB
+            rollup.add_user(user_type, from_who)
+            turn_number = turn_number or 0
+            entry = session_turns.get(sessionid)
+            if entry is None:
+                session_turns[sessionid] = [user_type, turn_number, turn_number]
+            else:
+                entry[1] = min(entry[1], turn_number)
+                entry[2] = max(entry[2], turn_number)
+        for sessionid, (user_type, first_turn, last_turn) in session_turns.items():
+            rollup.add_session(
+                sessionid, user_type, AppStatRollup.turn_count(first_turn, last_turn)
             )
-            if is_system_user:
-                system_user_set.add(from_who)
-                system_user_session_set.add(sessionid)
-            elif from_who and from_who != "lazyllm":
-                web_user_set.add(from_who)
-                web_user_session_set.add(sessionid)
-            # 记录sessionid属于哪类用户
-            if (
-                sessionid not in sessionid_to_user_type
-                and from_who
-                and from_who != "lazyllm"
-            ):
-                sessionid_to_user_type[sessionid] = (
-                    "system" if is_system_user else "web"
-                )
-            # 统计互动数
-            # if from_who == "lazyllm":
-            if sessionid in sessionid_to_user_type:
-                if sessionid_to_user_type[sessionid] == "system":
-                    if sessionid not in system_user_interaction or (
-                        turn_number and turn_number > system_user_interaction[sessionid]
-                    ):
-                        system_user_interaction[sessionid] = turn_number or 0
-                elif sessionid_to_user_type[sessionid] == "web":
-                    if sessionid not in web_user_interaction or (
-                        turn_number and turn_number > web_user_interaction[sessionid]
-                    ):
-                        web_user_interaction[sessionid] = turn_number or 0
-
-        # 5. token消费统计
-        # 先查出所有session_id属于哪类
-        system_sessionids = set(
-            [sid for sid, typ in sessionid_to_user_type.items() if typ == "system"]
-        )
-        web_sessionids = set(
-            [sid for sid, typ in sessionid_to_user_type.items() if typ == "web"]
-        )
 
-        # CostAudit token统计
         cost_audits = (
             db.session.query(
                 CostAudit.session_id, CostAudit.token_num, CostAudit.cost_time
@@ -354,68 +284,217 @@ class CostService:
             )
             .all()
         )
-
-        system_user_token_sum = 0
-        web_user_token_sum = 0
-        cost_times = []
         for session_id, token_num, cost_time in cost_audits:
-            if session_id in system_sessionids:
-                system_user_token_sum += token_num or 0
-            elif session_id in web_sessionids:
-                web_user_token_sum += token_num or 0
+            rollup.token_sum += token_num or 0
+            entry = session_turns.get(session_id)
+            if entry and entry[0] == AppStatRollup.SYSTEM:
+                rollup.system_user_token_sum += token_num or 0
+            elif entry:
+                rollup.web_user_token_sum += token_num or 0
             if cost_time is not None:
-                cost_times.append(float(cost_time))
-
-        # 6. 响应耗时P50/P99
-        cost_times_sorted = sorted(cost_times)
-        n = len(cost_times_sorted)
-        cost_time_p50 = cost_times_sorted[int(n * 0.5)] if n > 0 else 0
-        cost_time_p99 = cost_times_sorted[int(n * 0.99)] if n > 0 else 0
-
-        # 7. 互动数
-        system_user_interaction_count = sum(system_user_interaction.values())
-        web_user_interaction_count = sum(web_user_interaction.values())
-
-        # 8. WEB用户人均互动数
-        web_user_count = len(web_user_set)
-        web_user_avg_interaction = (
-            (web_user_interaction_count / web_user_count) if web_user_count > 0 else 0
-        )
+                rollup.latency.add(float(cost_time))
+        return rollup
+
+    @staticmethod
+    def _merge_rollups(app_id, call_type, start_date, end_date, saved_stats=None):
+        """合并指定日期区间的统计状态。
+
+        已保存中间状态的日期直接合并，其余日期（当天、旧版本记录、未汇总日期）
+        按连续区间扫描原始记录补齐。
+
+        Args:
+            app_id (str): 应用ID。
+            call_type (str): 调用类型。
+            start_date (date): 开始日期（包含）。
+            end_date (date): 结束日期（包含）。
+            saved_stats (list, optional): 已查出的AppStatistics记录，
+                未传入时按区间查询。
+
+        Returns:
+            AppStatRollup: 合并后的统计状态。
+        """
+        if saved_stats is None:
+            saved_stats = AppStatistics.query.filter(
+                AppStatistics.app_id == app_id,
+                AppStatistics.call_type == call_type,
+                AppStatistics.stat_date >= start_date,
+                AppStatistics.stat_date <= end_date,
+            ).all()
+        today = date.today()
+        saved = {
+            stat.stat_date: stat
+            for stat in saved_stats
+            if stat.stat_date < today and AppStatRollup.has_state(stat)
+        }
+
+        rollup = AppStatRollup()
+        gap_start = None
+        day = start_date
+        while day <= end_date + timedelta(days=1):
+            if day <= end_date and day not in saved:
+                gap_start = gap_start or day
+            else:
+                if gap_start:
+                    rollup.merge(
+                        CostService._build_rollup(
+                            app_id,
+                            call_type,
+                            datetime.combine(gap_start, datetime.min.time()),
+                            datetime.combine(
+                                day - timedelta(days=1), datetime.max.time()
+                            ),
+                        )
+                    )
+                    gap_start = None
+                if day in saved:
+                    rollup.merge(AppStatRollup.from_model(saved[day]))
+            day += timedelta(days=1)
+        return rollup
+
+    @staticmethod
+    def calc_and_save_app_statistics(
+        app_id,
+        call_type="release",
+        stat_date=None,
+        stat_date_start=None,
+        stat_date_end=None,
+        need_save_db=False,
+    ):
+        """统计指定app_id下的各类指标，并存入AppStatistics表。
+
+        单日统计扫描当天的原始记录；区间统计合并每日已保存的中间状态，
+        只对缺少中间状态的日期扫描原始记录。
+
+        Args:
+            app_id (str): 应用ID。
+            call_type (str, optional): 调用类型，默认为"release"。
+            stat_date (date, optional): 统计日期。如果指定，则统计该日期的数据。
+            stat_date_start (date, optional): 统计开始日期。与stat_date_end配合使用。
+            stat_date_end (date, optional): 统计结束日期。与stat_date_start配合使用。
+            need_save_db (bool, optional): 是否需要保存到数据库，默认为False。
+                只支持单日统计，区间统计由每日记录合并得到，不单独保存。
+
+        Returns:
+            dict: 包含统计结果的字典，包括系统用户数、Web用户数、会话数、
+                  Token消耗、互动数、响应时间等指标。
+
+        Raises:
+            CommonError: 当指定的app_id不存在时抛出异常。
+            ValueError: 当stat_date和stat_date_start/stat_date_end都未指定，
+                或要求保存区间统计时抛出异常。
+        """
+        # 校验app_id是否存在
+        app = App.query.filter_by(id=app_id).first()
+        if not app:
+            raise CommonError("指定的app_id不存在")
+        # 区间统计保存到起始日会使之后的合并重复计算整个区间
+        if need_save_db and not stat_date:
+            raise ValueError("只能保存单日统计，区间统计请勿指定need_save_db")
+
+        if stat_date:
+            rollup = CostService._build_rollup(
+                app_id,
+                call_type,
+                datetime.combine(stat_date, datetime.min.time()),
+                datetime.combine(stat_date, datetime.max.time()),
+            )
+        else:
+            if not stat_date_start or not stat_date_end:
+                raise ValueError("必须指定stat_date或stat_date_start和stat_date_end")
+            rollup = CostService._merge_rollups(
+                app_id, call_type, stat_date_start, stat_date_end
+            )
 
-        # 9. 存入统计表
         stat = AppStatistics(
             app_id=app_id,
             call_type=call_type,
             stat_date=stat_date or stat_date_start,
-            system_user_count=len(system_user_set),
-            web_user_count=web_user_count,
-            system_user_session_count=len(system_user_session_set),
-            web_user_session_count=len(web_user_session_set),
-            system_user_token_sum=system_user_token_sum,
-            web_user_token_sum=web_user_token_sum,
-            system_user_interaction_count=system_user_interaction_count,
-            web_user_interaction_count=web_user_interaction_count,
-            cost_time_p50=cost_time_p50,
-            cost_time_p99=cost_time_p99,
-            web_user_avg_interaction=web_user_avg_interaction,
         )
+        rollup.apply_to(stat)
         if need_save_db:
-            # 如果需要保存到数据库
-            # 检查是否已存在相同日期和应用的统计记录
-            existing_stat = AppStatistics.query.filter_by(
-                app_id=app_id,
-                call_type=call_type,
-                stat_date=stat_date or stat_date_start,
-            ).first()
-            if not existing_stat:
-                db.session.add(stat)
-                db.session.commit()
+            CostService._save_rollup(app_id, call_type, stat.stat_date, rollup)
 
         return stat.to_dict()
 
+    @staticmethod
+    def _save_rollup(app_id, call_type, stat_date, rollup):
+        """保存某天的统计状态，已有记录时覆盖。
+
+        Args:
+            app_id (str): 应用ID。
+            call_type (str): 调用类型。
+            stat_date (date): 统计日期。
+            rollup (AppStatRollup): 统计状态。
+        """
+        stat = AppStatistics.query.filter_by(
+            app_id=app_id, call_type=call_type, stat_date=stat_date
+        ).first()
+        if not stat:
+            stat = AppStatistics(app_id=app_id, call_type=call_type, stat_date=stat_date)
+            db.session.add(stat)
+        rollup.apply_to(stat)
+        db.session.commit()
+
+    @staticmethod
+    def get_stat_app_ids():
+        """获取需要统计的应用ID（Conversation中出现过的app_id）。
+
+        Returns:
+            list: 应用ID列表。
+        """
+        app_ids = db.session.query(Conversation.app_id).distinct()
+        return [row.app_id for row in app_ids if row.app_id]
+
+    @staticmethod
+    def get_active_app_ids(stat_date: date):
+        """获取指定日期有会话记录的应用ID。
+
+        Args:
+            stat_date (date): 统计日期。
+
+        Returns:
+            set: 当天活跃的应用ID集合。
+        """
+        rows = (
+            db.session.query(Conversation.app_id)
+            .filter(
+                Conversation.created_at
+                >= datetime.combine(stat_date, datetime.min.time()),
+                Conversation.created_at
+                <= datetime.combine(stat_date, datetime.max.time()),
+            )
+            .distinct()
+        )
+        return {row.app_id for row in rows if row.app_id}
+
+    @staticmethod
+    def save_daily_app_statistics(app_id, stat_date: date, active=True):
+        """统计单个应用某天的数据并存入AppStatistics表。
+
+        Args:
+            app_id (str): 应用ID。
+            stat_date (date): 统计日期。
+            active (bool, optional): 当天是否有会话，无会话时直接写入空统计。
+        """
+        if active:
+            rollup = CostService._build_rollup(
+                app_id,
+                "release",
+                datetime.combine(stat_date, datetime.min.time()),
+                datetime.combine(stat_date, datetime.max.time()),
+            )
+        else:
+            rollup = AppStatRollup()
+        CostService._save_rollup(app_id, "release", stat_date, rollup)
+        # 累计统计随之变化，清除缓存
+        redis_client.delete(f"app_stats:{app_id}")
+
     @staticmethod
     def daily_app_statistics(stat_date: date):
-        """遍历Conversation中的所有app_id，统计指定日期的数据并存入AppStatistics表。
+        """统计指定日期各应用的数据并存入AppStatistics表。
+
+        只扫描当天的原始记录；当天没有会话的应用直接写入空统计，
+        无需再查询。
 
         Args:
             stat_date (date): 统计日期。
@@ -426,21 +505,52 @@ class CostService:
         Raises:
             Exception: 当数据库操作失败时抛出异常。
         """
-        # 计算昨天日期
-        # yesterday = date.today() - timedelta(days=1)
+        active_app_ids = CostService.get_active_app_ids(stat_date)
+        for app_id in CostService.get_stat_app_ids():
+            CostService.save_daily_app_statistics(
+                app_id, stat_date, active=app_id in active_app_ids
+            )
 
-        # 查询所有app_id（去重）
-        app_ids = db.session.query(Conversation.app_id).distinct()
-        for app_id_row in app_ids:
-            app_id = app_id_row.app_id
-            if not app_id:
-                continue
-            # 先缓存统计（可选，便于后续接口快速访问）
-            CostService.get_app_statistics(app_id)
-            # 统计并存入数据库
-            CostService.calc_and_save_app_statistics(
-                app_id=app_id, stat_date=stat_date, need_save_db=True
+    @staticmethod
+    def cache_app_period_statistics(app_id, stat_date: date):
+        """统计单个应用近7日、近30日的数据并缓存到redis。
+
+        只查询一次近30日的每日统计记录，近7日和近30日均由其合并得到。
+
+        Args:
+            app_id (str): 应用ID。
+            stat_date (date): 统计基准日期。
+        """
+        stat_date_start_30 = stat_date - timedelta(days=29)
+        periods = [
+            (stat_date - timedelta(days=6), stat_date),
+            (stat_date_start_30, stat_date),
+        ]
+        saved_stats = AppStatistics.query.filter(
+            AppStatistics.app_id == app_id,
+            AppStatistics.call_type == "release",
+            AppStatistics.stat_date >= stat_date_start_30,
+            AppStatistics.stat_date <= stat_date,
+        ).all()
+        for start_date, end_date in periods:
+            rollup = CostService._merge_rollups(
+                app_id,
+                "release",
+                start_date,
+                end_date,
+                saved_stats=[s for s in saved_stats if s.stat_date >= start_date],
             )
+            stat = AppStatistics(
+                app_id=app_id, call_type="release", stat_date=start_date
+            )
+            rollup.apply_to(stat)
+            cache_key = (
+                f"app_stats:{app_id}:"
+                f"{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
+            )
+            redis_client.setex(
+                cache_key, 3600 * 23, json.dumps(stat.to_dict())
+            )  # 缓存23小时
 
     @staticmethod
     def cache_app_statistics_for_periods(stat_date: date):
@@ -455,69 +565,8 @@ class CostService:
         Raises:
             Exception: 当Redis操作失败时抛出异常。
         """
-        # today = date.today()
-        # 近7天区间
-        stat_date_start_7 = stat_date - timedelta(days=6)
-        stat_date_end_7 = stat_date
-        # 近30天区间
-        stat_date_start_30 = stat_date - timedelta(days=29)
-        stat_date_end_30 = stat_date
-
-        # 格式化日期字符串
-        start_7_str = stat_date_start_7.strftime("%Y%m%d")
-        end_7_str = stat_date_end_7.strftime("%Y%m%d")
-        start_30_str = stat_date_start_30.strftime("%Y%m%d")
-        end_30_str = stat_date_end_30.strftime("%Y%m%d")
-        # 查询所有app_id（去重）
-        app_ids = db.session.query(Conversation.app_id).distinct()
-        for app_id_row in app_ids:
-            app_id = app_id_row.app_id
-            if not app_id:
-                continue
-
-            # 近7天统计
-            cache_key_7 = f"app_stats:{app_id}:{start_7_str}_{end_7_str}"
-            cached_7 = redis_client.get(cache_key_7)
-            if cached_7:
-                try:
-                    result_7 = json.loads(cached_7)
-                except Exception:
-                    result_7 = None
-            else:
-                result_7 = None
-
-            if not result_7:
-                result_7 = CostService.calc_and_save_app_statistics(
-                    app_id=app_id,
-                    stat_date_start=stat_date_start_7,
-                    stat_date_end=stat_date_end_7,
-                    need_save_db=False,
-                )
-                redis_client.setex(
-                    cache_key_7, 3600 * 23, json.dumps(result_7)
-                )  # 缓存23小时
-
-            # 近30天统计
-            cache_key_30 = f"app_stats:{app_id}:{start_30_str}_{end_30_str}"
-            cached_30 = redis_client.get(cache_key_30)
-            if cached_30:
-                try:
-                    result_30 = json.loads(cached_30)
-                except Exception:
-                    result_30 = None
-            else:
-                result_30 = None
-
-            if not result_30:
-                result_30 = CostService.calc_and_save_app_statistics(
-                    app_id=app_id,
-                    stat_date_start=stat_date_start_30,
-                    stat_date_end=stat_date_end_30,
-                    need_save_db=False,
-                )
-                redis_client.setex(
-                    cache_key_30, 3600 * 23, json.dumps(result_30)
-                )  # 缓存23小时
+        for app_id in CostService.get_stat_app_ids():
+            CostService.cache_app_period_statistics(app_id, stat_date)
 
     @staticmethod
     def get_app_statistics_by_period(app_id, start_date: date, end_date: date):
@@ -19,7 +19,6 @@ import mimetypes
 import os
 import tarfile
 import time
-import urllib.parse
 import zipfile
 from threading import Thread
 
@@ -33,6 +32,7 @@ from libs.feature_gate import require_internet_feature
 from libs.filetools import FileTools
 from libs.json_utils import ensure_list_from_json
 from libs.login import login_required
+from libs.zipstream import zip_stream_response
 from parts.logs import Action, LogService, Module
 from parts.urls import api
 from utils.util_database import db
@@ -1345,24 +1345,15 @@ class DataSetVersionExport(Resource):
         try:
             if len(data_set_version_ids) == 1:
                 # 如果只有一个数据集 ID，直接返回该数据集的压缩包
-                zip_filename = service.create_individual_zip(data_set_version_ids[0])
-                encoded_filename = urllib.parse.quote(zip_filename)
-                response = send_file(
-                    zip_filename, as_attachment=True, download_name=encoded_filename
+                zip_filename, chunks = service.stream_individual_zip(
+                    data_set_version_ids[0]
                 )
-                os.remove(zip_filename)
             else:
                 # 如果有多个数据集 ID，创建一个总的压缩包
-                combined_zip_filename = service.create_combined_zip(
+                zip_filename, chunks = service.stream_combined_zip(
                     data_set_version_ids
                 )
-                encoded_filename = urllib.parse.quote(combined_zip_filename)
-                response = send_file(
-                    combined_zip_filename,
-                    as_attachment=True,
-                    download_name=encoded_filename,
-                )
-                os.remove(combined_zip_filename)
+            response = zip_stream_response(zip_filename, chunks)
             data_set_instance, version_type, version_list = (
                 service.get_data_set_info_by_version_ids(data_set_version_ids)
             )
@@ -15,13 +15,13 @@
 
 import mimetypes
 import os
-import urllib.parse
 
 from flask import jsonify, request, send_file
 from flask_login import current_user
 from flask_restful import Resource, marshal, reqparse
 
 from libs.login import login_required
+from libs.zipstream import zip_stream_response
 from parts.urls import api
 
 from . import fields
@@ -335,15 +335,10 @@ class RefluxDataSetVersionExport(Resource):
             raise ValueError("输入的参数有误")
         service = DataRefluxService(current_user)
         try:
-            combined_zip_filename = service.create_combined_zip(data_set_version_ids)
-            encoded_filename = urllib.parse.quote(combined_zip_filename)
-            response = send_file(
-                combined_zip_filename,
-                as_attachment=True,
-                download_name=encoded_filename,
+            combined_zip_filename, chunks = service.stream_combined_zip(
+                data_set_version_ids
             )
-            os.remove(combined_zip_filename)
-            return response
+            return zip_stream_response(combined_zip_filename, chunks)
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
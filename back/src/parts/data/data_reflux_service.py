@@ -15,20 +15,31 @@
 
 import json
 import logging
-import os
-import zipfile
 from datetime import datetime
 
 from flask_login import current_user
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, func, insert, literal, select
 
 from libs.timetools import TimeTools
+from libs.zipstream import ZipStreamWriter
 from models.model_account import Account
 from parts.data.data_service import DataService
 from parts.data.model import (DataSet, DataSetFileStatus, DataSetRefluxData,
                               DataSetVersion, DataSetVersionStatus)
 from parts.logs import Action, LogService, Module
 from utils.util_database import db
+from utils.util_redis import redis_client
+
+# 回流事件队列，运行路径只负责入队，由后台任务批量写库
+REFLUX_QUEUE_KEY = "data_reflux:queue"
+REFLUX_FLUSH_LOCK_KEY = "data_reflux:flush_lock"
+REFLUX_FLUSH_LOCK_TIMEOUT = 60
+# 每批从队列取出并写库的事件数量
+REFLUX_BATCH_SIZE = 200
+# 逐条重试后仍无法写库的事件，保留原始内容供排查和人工重放
+REFLUX_DEAD_LETTER_KEY = "data_reflux:dead_letter"
+# 队列中用户反馈事件的标记，其余事件为新增回流记录
+REFLUX_FEEDBACK_EVENT = "feedback"
 
 
 class DataRefluxService:
@@ -427,16 +438,45 @@ class DataRefluxService:
             user_feedback=data.get("user_feedback"),  # 用户反馈
             status=DataSetFileStatus.file_done.value,
             finished_at=now_str,
+            json_data=DataRefluxService.build_reflux_json_data(data),
         )
         db.session.add(data_set_reflux_data)
         db.session.commit()
-        json_data = DataRefluxService.get_reflux_data_by_id(data_set_reflux_data.id)
-        if json_data:
-            # json_data 字段是 JSON 对象，直接存储
-            data_set_reflux_data.json_data = json_data
-        db.session.commit()
         return data_set_reflux_data
 
+    @staticmethod
+    def build_reflux_json_data(data):
+        """根据回流事件构造 json_data 字段内容。
+
+        结构与 get_reflux_data_by_id 的返回一致，写入时直接生成，无需写库后回读。
+
+        Args:
+            data (dict): 回流数据。
+
+        Returns:
+            dict: 回流数据详情。
+        """
+        output_time = data.get("output_time")
+        if isinstance(output_time, datetime):
+            output_time = output_time.strftime("%Y-%m-%d %H:%M:%S")
+        turn_number = data.get("turn_number")
+        return {
+            "app_name": data.get("app_name"),
+            "module_info": {
+                "module_name": data.get("module_name"),
+                "module_type": data.get("module_type"),
+                "output_time": output_time,
+                "module_input": data.get("module_input"),
+                "module_output": data.get("module_output"),
+            },
+            "conversation_info": {
+                "conversation_id": data.get("conversation_id"),
+                "turn_number": int(turn_number) if turn_number else None,
+                "is_satisfied": None,
+                "user_feedback": data.get("user_feedback"),
+            },
+        }
+
     def publish_data_set_version(self, data_set_version_id):
         """发布回流数据集版本。
 
@@ -476,34 +516,45 @@ class DataRefluxService:
             None: 无返回值。
         """
         try:
-            old_data_list = DataSetRefluxData.query.filter_by(
-                data_set_version_id=old_data_set_version_id
-            ).all()
-            print(old_data_list)
-            for reflux_data in old_data_list:
-                now_str = TimeTools.get_china_now()
-                new_reflux_data = DataSetRefluxData(
-                    data_set_id=reflux_data.data_set_id,
-                    data_set_version_id=new_data_set_version_id,
-                    user_id=reflux_data.user_id,
-                    created_at=now_str,
-                    updated_at=now_str,
-                    app_id=reflux_data.app_id,
-                    app_name=reflux_data.app_name,
-                    module_id=reflux_data.module_id,
-                    module_name=reflux_data.module_name,
-                    module_type=reflux_data.module_type,
-                    output_time=reflux_data.output_time,
-                    module_input=reflux_data.module_input,
-                    module_output=reflux_data.module_output,
-                    conversation_id=reflux_data.conversation_id,  # 会话id
-                    turn_number=reflux_data.turn_number,  # 会话轮次
-                    is_satisfied=reflux_data.is_satisfied,  # 是否满意，为空时未反馈
-                    user_feedback=reflux_data.user_feedback,  # 用户反馈
-                    status=DataSetFileStatus.file_done.value,
-                    finished_at=now_str,
+            now = TimeTools.get_china_now(output="datetime").replace(tzinfo=None)
+            copied_columns = [
+                "data_set_id",
+                "user_id",
+                "app_id",
+                "app_name",
+                "module_id",
+                "module_name",
+                "module_type",
+                "output_time",
+                "module_input",
+                "module_output",
+                "conversation_id",
+                "turn_number",
+                "is_satisfied",
+                "user_feedback",
+            ]
+            db.session.execute(
+                insert(DataSetRefluxData).from_select(
+                    copied_columns
+                    + [
+                        "data_set_version_id",
+                        "status",
+                        "created_at",
+                        "updated_at",
+                        "finished_at",
+                    ],
+                    select(
+                        *[getattr(DataSetRefluxData, name) for name in copied_columns],
+                        literal(new_data_set_version_id),
+                        literal(DataSetFileStatus.file_done.value),
+                        literal(now, db.DateTime),
+                        literal(now, db.DateTime),
+                        literal(now, db.DateTime),
+                    ).filter(
+                        DataSetRefluxData.data_set_version_id == old_data_set_version_id
+                    ),
                 )
-                db.session.add(new_reflux_data)
+            )
             db.session.commit()
         except Exception as e:
             print(f"Error copying data_set_file: {str(e)}")
@@ -597,87 +648,96 @@ class DataRefluxService:
             },
         }
 
-    def create_single_txt(self, data_set_version_id):
-        """为数据集版本创建单个TXT文件。
-
-        Args:
-            data_set_version_id (int): 数据集版本ID。
-
-        Returns:
-            str: 生成的TXT文件名。
+    @staticmethod
+    def _iter_single_txt(data_set_version_instance, data_set_instance):
+        yield f"数据集名称: {data_set_version_instance.name}\n"
+        yield f"数据集版本号: {data_set_version_instance.version}\n"
+        yield f"数据集描述: {data_set_instance.description}\n"
+        yield f"数据集标签: {data_set_instance.label}\n"
+        columns = [
+            DataSetRefluxData.app_name,
+            DataSetRefluxData.app_id,
+            DataSetRefluxData.module_name,
+            DataSetRefluxData.module_type,
+            DataSetRefluxData.output_time,
+            DataSetRefluxData.module_input,
+            DataSetRefluxData.module_output,
+            DataSetRefluxData.conversation_id,
+            DataSetRefluxData.turn_number,
+            DataSetRefluxData.is_satisfied,
+            DataSetRefluxData.user_feedback,
+        ]
+        has_rows = False
+        for reflux_data in DataService.iter_reflux_data_rows(
+            data_set_version_instance.id, columns
+        ):
+            if not has_rows:
+                has_rows = True
+                yield "List:\n"
+            item_dict = {
+                "app_name": reflux_data.app_name,
+                "app_id": reflux_data.app_id,
+                "module_info": {
+                    "module_name": reflux_data.module_name,
+                    "module_type": reflux_data.module_type,
+                    "output_time": (
+                        reflux_data.output_time.strftime("%Y-%m-%d %H:%M:%S")
+                        if reflux_data.output_time
+                        else None
+                    ),
+                    "module_input": reflux_data.module_input,
+                    "module_output": reflux_data.module_output,
+                },
+                "conversation_info": {
+                    "conversation_id": reflux_data.conversation_id,
+                    "turn_number": reflux_data.turn_number,
+                    "is_satisfied": reflux_data.is_satisfied,
+                    "user_feedback": reflux_data.user_feedback,
+                },
+            }
+            yield f"{json.dumps(item_dict, ensure_ascii=False)}\n"
 
-        Raises:
-            ValueError: 当数据集版本未找到时抛出异常。
-        """
-        data_set_version_instance = DataSetVersion.query.get(data_set_version_id)
-        if not data_set_version_instance:
-            raise ValueError("数据集版本未找到")
-        data_set_instance = DataSet.query.get(data_set_version_instance.data_set_id)
+    def stream_combined_zip(self, data_set_version_ids):
+        """流式导出多个数据集版本的回流数据。
 
-        now_str = datetime.now().strftime("%Y%m%d%H%M%S")
-        txt_filename = f"{data_set_version_instance.name}_{data_set_version_instance.version}_{now_str}.txt"
-        # 获取数据集版本对应的回流数据
-        reflux_list = DataSetRefluxData.query.filter_by(
-            data_set_version_id=data_set_version_id
-        ).all()
-        with open(txt_filename, "w") as info_file:
-            info_file.write(f"数据集名称: {data_set_version_instance.name}\n")
-            info_file.write(f"数据集版本号: {data_set_version_instance.version}\n")
-            info_file.write(f"数据集描述: {data_set_instance.description}\n")
-            info_file.write(f"数据集标签: {data_set_instance.label}\n")
-            if reflux_list:
-                info_file.write("List:\n")
-                for reflux_data in reflux_list:
-                    item_dict = {
-                        "app_name": reflux_data.app_name,
-                        "app_id": reflux_data.app_id,
-                        "module_info": {
-                            "module_name": reflux_data.module_name,
-                            "module_type": reflux_data.module_type,
-                            "output_time": (
-                                reflux_data.output_time.strftime("%Y-%m-%d %H:%M:%S")
-                                if reflux_data.output_time
-                                else None
-                            ),
-                            "module_input": reflux_data.module_input,
-                            "module_output": reflux_data.module_output,
-                        },
-                        "conversation_info": {
-                            "conversation_id": reflux_data.conversation_id,
-                            "turn_number": reflux_data.turn_number,
-                            "is_satisfied": reflux_data.is_satisfied,
-                            "user_feedback": reflux_data.user_feedback,
-                        },
-                    }
-
-                    json_str = json.dumps(
-                        item_dict, ensure_ascii=False
-                    )  # 转换为 JSON 字符串
-                    info_file.write(f"{json_str}\n")  # 写入 JSON 字符串
-
-        return txt_filename
-
-    def create_combined_zip(self, data_set_version_ids):
-        """为多个数据集版本创建组合ZIP文件。
+        每个数据集版本对应压缩包中的一个 TXT 条目，回流数据分页读取并边读边压缩，
+        不生成临时文件。
 
         Args:
             data_set_version_ids (list): 数据集版本ID列表。
 
         Returns:
-            str: 生成的ZIP文件名。
+            tuple: (ZIP文件名, 压缩包数据块生成器)。
+
+        Raises:
+            ValueError: 当任一数据集版本未找到时抛出异常。
         """
-        combined_zip_filename = (
-            f"export_datasets_{datetime.now().strftime('%Y%m%d%H%M%S')}.zip"
-        )
-        with zipfile.ZipFile(combined_zip_filename, "w") as combined_zip:
-            for data_set_version_id in data_set_version_ids:
-                single_txt_filename = self.create_single_txt(data_set_version_id)
-                combined_zip.write(
-                    single_txt_filename, os.path.basename(single_txt_filename)
+        now_str = datetime.now().strftime("%Y%m%d%H%M%S")
+        versions = []
+        for data_set_version_id in data_set_version_ids:
+            data_set_version_instance = DataSetVersion.query.get(data_set_version_id)
+            if not data_set_version_instance:
+                raise ValueError("数据集版本未找到")
+            data_set_instance = DataSet.query.get(
+                data_set_version_instance.data_set_id
+            )
+            versions.append((data_set_version_instance, data_set_instance))
+        combined_zip_filename = f"export_datasets_{now_str}.zip"
+
+        def generate():
+            writer = ZipStreamWriter()
+            for data_set_version_instance, data_set_instance in versions:
+                txt_filename = (
+                    f"{data_set_version_instance.name}_"
+                    f"{data_set_version_instance.version}_{now_str}.txt"
+                )
+                yield from writer.add_stream(
+                    txt_filename,
+                    self._iter_single_txt(data_set_version_instance, data_set_instance),
                 )
-                os.remove(single_txt_filename)  # 删除临时文件
+            yield from writer.finish()
 
-        return combined_zip_filename
+        return combined_zip_filename, generate()
 
 
 def create_reflux_data(data: dict):
@@ -733,6 +793,175 @@ def create_reflux_data(data: dict):
     return DataRefluxService.create_single_reflux_data(latest_version, data)
 
 
+def enqueue_reflux_data(data: dict):
+    """将回流事件写入队列，由后台任务批量落库。
+
+    运行路径只做一次 Redis 写入，不再等待数据集查询和写库。
+    队列不可用时退回同步写入，保证回流数据不丢失。
+
+    Args:
+        data (dict): 回流数据，字段同 create_reflux_data。
+    """
+    try:
+        redis_client.rpush(
+            REFLUX_QUEUE_KEY, json.dumps(data, ensure_ascii=False, default=str)
+        )
+    except Exception as e:
+        logging.warning(f"回流事件入队失败，改为同步写入: {e}")
+        create_reflux_data(data)
+
+
+def _reflux_dataset_key(data: dict):
+    module_type = data.get("module_type")
+    node_id = data.get("module_id") if module_type == "node" else None
+    return data.get("app_id"), module_type, node_id
+
+
+def _resolve_reflux_versions(events: list):
+    """批量解析回流事件对应的数据集及其最新分支版本。
+
+    Args:
+        events (list): 回流事件列表。
+
+    Returns:
+        dict: (app_id, module_type, node_id) 到 (data_set_id, data_set_version_id) 的映射。
+    """
+    app_ids = {data.get("app_id") for data in events}
+    datasets = {}
+    for dataset in DataSet.query.filter(DataSet.app_id.in_(app_ids)).order_by(
+        DataSet.id
+    ):
+        node_id = dataset.node_id if dataset.reflux_type == "node" else None
+        datasets.setdefault((dataset.app_id, dataset.reflux_type, node_id), dataset.id)
+    if not datasets:
+        return {}
+
+    latest_versions = dict(
+        db.session.query(DataSetVersion.data_set_id, func.max(DataSetVersion.id))
+        .filter(
+            DataSetVersion.data_set_id.in_(set(datasets.values())),
+            DataSetVersion.version_type == "branch",
+        )
+        .group_by(DataSetVersion.data_set_id)
+        .all()
+    )
+    return {
+        key: (data_set_id, latest_versions[data_set_id])
+        for key, data_set_id in datasets.items()
+        if data_set_id in latest_versions
+    }
+
+
+def save_reflux_batch(events: list):
+    """批量保存回流事件。
+
+    每批只查询一次数据集和最新版本，所有记录在一次提交中写入。
+    找不到数据集或版本的事件会被记录并丢弃。
+    用户反馈事件在本批记录写入后再更新，找不到回流记录时丢弃。
+
+    Args:
+        events (list): 回流事件列表。
+
+    Returns:
+        int: 写入或更新的记录数。
+    """
+    if not events:
+        return 0
+    feedbacks = [d for d in events if d.get("event") == REFLUX_FEEDBACK_EVENT]
+    events = [d for d in events if d.get("event") != REFLUX_FEEDBACK_EVENT]
+    versions = _resolve_reflux_versions(events) if events else {}
+    now = TimeTools.get_china_now(output="datetime").replace(tzinfo=None)
+    records = []
+    for data in events:
+        version = versions.get(_reflux_dataset_key(data))
+        if not version:
+            logging.warning(
+                f"回流数据集未创建或无分支版本，丢弃事件: app_id={data.get('app_id')}, "
+                f"module_id={data.get('module_id')}"
+            )
+            continue
+        output_time = data.get("output_time")
+        records.append(
+            DataSetRefluxData(
+                data_set_id=version[0],
+                data_set_version_id=version[1],
+                user_id="",
+                created_at=now,
+                updated_at=now,
+                app_id=data.get("app_id"),
+                app_name=data.get("app_name"),
+                module_id=data.get("module_id"),
+                module_name=data.get("module_name"),
+                module_type=data.get("module_type"),
+                output_time=(
+                    datetime.fromisoformat(output_time) if output_time else None
+                ),
+                module_input=data.get("module_input"),
+                module_output=data.get("module_output"),
+                conversation_id=data.get("conversation_id"),
+                turn_number=data.get("turn_number"),
+                is_satisfied=None,
+                user_feedback=data.get("user_feedback"),
+                status=DataSetFileStatus.file_done.value,
+                finished_at=now,
+                json_data=DataRefluxService.build_reflux_json_data(data),
+            )
+        )
+    if records:
+        db.session.add_all(records)
+    updated = 0
+    for data in feedbacks:
+        if _apply_reflux_feedback(data):
+            updated += 1
+        else:
+            logging.warning(
+                f"回流反馈未找到对应记录，已丢弃: app_id={data.get('app_id')}, "
+                f"conversation_id={data.get('conversation_id')}"
+            )
+    if records or updated:
+        db.session.commit()
+    return len(records) + updated
+
+
+def flush_reflux_queue(batch_size: int = REFLUX_BATCH_SIZE):
+    """从队列取出一批回流事件并写库。
+
+    整批写库失败时逐条重试，仍然失败的事件移入死信队列，
+    避免个别异常事件阻塞整个队列。处理完成后才从队列中移除这批事件，
+    死信队列不可用时这批事件保留在队列中等待下次重试。
+    调用方需保证同一时间只有一个消费者。
+
+    Args:
+        batch_size (int): 每批处理的事件数量。
+
+    Returns:
+        int: 本次从队列中取出的事件数量。
+    """
+    raw_events = redis_client.lrange(REFLUX_QUEUE_KEY, 0, batch_size - 1)
+    if not raw_events:
+        return 0
+    events = []
+    for raw in raw_events:
+        try:
+            events.append((raw, json.loads(raw)))
+        except ValueError:
+            logging.warning(f"回流事件格式错误，已丢弃: {raw!r}")
+    try:
+        save_reflux_batch([data for _, data in events])
+    except Exception as e:
+        db.session.rollback()
+        logging.warning(f"回流事件批量写库失败，改为逐条写入: {e}")
+        for raw, data in events:
+            try:
+                save_reflux_batch([data])
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"回流事件写库失败，已移入死信队列: {e}")
+                redis_client.rpush(REFLUX_DEAD_LETTER_KEY, raw)
+    redis_client.ltrim(REFLUX_QUEUE_KEY, len(raw_events), -1)
+    return len(raw_events)
+
+
 def update_reflux_data(reflux_data_id, content: dict):
     """更新回流数据。
 
@@ -770,9 +999,32 @@ def update_reflux_data(reflux_data_id, content: dict):
     return reflux_data
 
 
+def _apply_reflux_feedback(data: dict):
+    """把用户反馈写入对应的回流记录，不提交。
+
+    Returns:
+        bool: 是否找到了回流记录。
+    """
+    data_set_reflux = DataSetRefluxData.query.filter_by(
+        app_id=data.get("app_id"),
+        module_id=data.get("module_id"),
+        conversation_id=data.get("conversation_id"),
+        turn_number=data.get("turn_number"),
+    ).first()
+    if not data_set_reflux:
+        return False
+    data_set_reflux.is_satisfied = data.get("is_satisfied")
+    data_set_reflux.user_feedback = data.get("user_feedback")
+    data_set_reflux.update_time = TimeTools.get_china_now()
+    return True
+
+
 def update_reflux_data_feedback(data: dict):
     """根据app_id、module_id、conversation_id、turn_number确认回流记录并更新用户反馈。
 
+    回流记录由后台任务批量写库，反馈到达时记录可能还在队列中。
+    此时反馈写入同一队列，排在回流记录之后，由后台任务在记录写入后更新。
+
     Args:
         data (dict): 反馈数据，包含以下字段：
             - app_id (str): 应用ID
@@ -786,20 +1038,20 @@ def update_reflux_data_feedback(data: dict):
         None: 无返回值。
 
     Raises:
-        ValueError: 当未找到对应的回流数据时抛出异常。
+        ValueError: 当未找到对应的回流数据且无法写入队列时抛出异常。
     """
-    # if not data.get('is_satisfied'):
-    #     raise ValueError('用户反馈是否满意为空')
-    data_set_reflux = DataSetRefluxData.query.filter_by(
-        app_id=data.get("app_id"),
-        module_id=data.get("module_id"),
-        conversation_id=data.get("conversation_id"),
-        turn_number=data.get("turn_number"),
-    ).first()
-    if not data_set_reflux:
-        raise ValueError("未找到此回流数据")
-    now_str = TimeTools.get_china_now()
-    data_set_reflux.is_satisfied = data.get("is_satisfied")
-    data_set_reflux.user_feedback = data.get("user_feedback")
-    data_set_reflux.update_time = now_str
-    db.session.commit()
+    if _apply_reflux_feedback(data):
+        db.session.commit()
+        return
+    try:
+        redis_client.rpush(
+            REFLUX_QUEUE_KEY,
+            json.dumps(
+                {**data, "event": REFLUX_FEEDBACK_EVENT},
+                ensure_ascii=False,
+                default=str,
+            ),
+        )
+    except Exception as e:
+        logging.warning(f"回流反馈入队失败: {e}")
+        raise ValueError("未找到此回流数据") from None
@@ -27,11 +27,12 @@ from concurrent.futures import ThreadPoolExecutor
 
 import requests
 from flask import current_app
-from sqlalchemy import and_, desc, or_, select
+from sqlalchemy import and_, desc, func, insert, literal, or_, select
 
 from libs.filetools import FileTools
 from libs.json_utils import ensure_list_from_json
 from libs.timetools import TimeTools
+from libs.zipstream import ZipStreamWriter
 from models.model_account import Account, Tenant
 from parts.finetune.model import FinetuneTask
 from parts.finetune.model import TaskStatus as FinetuneTaskStatus
@@ -48,6 +49,8 @@ from .transform_json_tool import TransformJsonTool
 
 # 全局线程池
 executor = ThreadPoolExecutor(max_workers=20)  # 可以根据需要调整线程数
+# 导出时每次查询的回流数据行数
+EXPORT_PAGE_SIZE = 500
 
 
 class DataService:
@@ -97,10 +100,9 @@ class DataService:
         filters = []
 
         if data.get("search_tags"):
-            target_ids = Tag.get_target_ids_by_names(
-                Tag.Types.DATASET, data["search_tags"]
+            filters.append(
+                Tag.target_filter(Tag.Types.DATASET, data["search_tags"], DataSet.id)
             )
-            filters.append(DataSet.id.in_(target_ids))
 
         if data.get("name") or data.get("search_name"):
             search_name = data.get("name") or data.get("search_name")
@@ -1143,34 +1145,88 @@ class DataService:
             Exception: 当复制失败时抛出异常。
         """
         try:
-            old_data_file_list = DataSetFile.query.filter_by(
-                data_set_version_id=old_data_set_version_id
+            old_paths = db.session.scalars(
+                select(DataSetFile.path)
+                .filter(
+                    DataSetFile.data_set_version_id == old_data_set_version_id,
+                    DataSetFile.path.isnot(None),
+                    DataSetFile.path != "",
+                )
+                .distinct()
             ).all()
-            print(old_data_file_list)
-            for data_file in old_data_file_list:
-                now_str = TimeTools.get_china_now()
-                path = ""
-                if data_file.path:
-                    old_path = data_file.path
-                    path = os.path.join(new_version_path, os.path.basename(old_path))
-                    os.makedirs(os.path.dirname(path), exist_ok=True)
-                    shutil.copy(old_path, path)
-
-                new_data_set_file_obj = DataSetFile(
-                    name=data_file.name,
-                    path=path,
-                    download_url=data_file.download_url,
-                    data_set_id=data_file.data_set_id,
-                    data_set_version_id=new_data_set_version_id,
-                    user_id=data_file.user_id,
-                    file_type=data_file.file_type,
-                    status=DataSetFileStatus.file_done.value,
-                    operation="upload",
-                    created_at=now_str,
-                    updated_at=now_str,
-                    finished_at=now_str,
+            # 文件内容按目录批量复制，数据库记录由 INSERT ... SELECT 直接生成，
+            # 新路径为新版本目录加原文件名，与逐条复制时一致
+            old_dirs = set()
+            if old_paths:
+                os.makedirs(new_version_path, exist_ok=True)
+            for old_path in old_paths:
+                old_dirs.add(os.path.dirname(old_path))
+                shutil.copyfile(
+                    old_path, os.path.join(new_version_path, os.path.basename(old_path))
+                )
+
+            now = TimeTools.get_china_now(output="datetime").replace(tzinfo=None)
+            conditions = [
+                (
+                    or_(DataSetFile.path.is_(None), DataSetFile.path == ""),
+                    literal(""),
+                )
+            ]
+            for old_dir in old_dirs:
+                prefix_length = len(os.path.join(old_dir, ""))
+                conditions.append(
+                    (
+                        and_(
+                            DataSetFile.path.startswith(
+                                os.path.join(old_dir, ""), autoescape=True
+                            ),
+                            func.instr(
+                                func.substr(DataSetFile.path, prefix_length + 1),
+                                "/",
+                            )
+                            == 0,
+                        ),
+                        literal(os.path.join(new_version_path, ""))
+                        + func.substr(DataSetFile.path, prefix_length + 1),
+                    )
+                )
+            columns = [
+                "name",
+                "path",
+                "download_url",
+                "data_set_id",
+                "data_set_version_id",
+                "user_id",
+                "file_type",
+                "status",
+                "operation",
+                "created_at",
+                "updated_at",
+                "finished_at",
+            ]
+            for condition, path in conditions:
+                db.session.execute(
+                    insert(DataSetFile).from_select(
+                        columns,
+                        select(
+                            DataSetFile.name,
+                            path,
+                            DataSetFile.download_url,
+                            DataSetFile.data_set_id,
+                            literal(new_data_set_version_id),
+                            DataSetFile.user_id,
+                            DataSetFile.file_type,
+                            literal(DataSetFileStatus.file_done.value),
+                            literal("upload"),
+                            literal(now, db.DateTime),
+                            literal(now, db.DateTime),
+                            literal(now, db.DateTime),
+                        ).filter(
+                            DataSetFile.data_set_version_id == old_data_set_version_id,
+                            condition,
+                        ),
+                    )
                 )
-                db.session.add(new_data_set_file_obj)
             db.session.commit()
         except Exception as e:
             print(f"Error copying data_set_file: {str(e)}")
@@ -1632,73 +1688,102 @@ class DataService:
         return data_set_version_obj
 
     @staticmethod
-    def create_individual_zip(data_set_version_id):
-        """创建单个数据集版本的压缩包。
+    def iter_reflux_data_rows(data_set_version_id, columns, page_size=EXPORT_PAGE_SIZE):
+        """按主键分页读取数据集版本的回流数据。
 
-        Args:
-            data_set_version_id (str): 数据集版本ID。
+        只查询指定列，不创建 ORM 对象，导出大版本时内存占用保持恒定。
 
-        Returns:
-            str: 压缩包文件路径。
+        Args:
+            data_set_version_id (int): 数据集版本ID。
+            columns (list): 需要查询的列，会自动附加主键列。
+            page_size (int, optional): 每页行数。
 
-        Raises:
-            Exception: 当压缩包创建失败时抛出异常。
+        Yields:
+            Row: 查询结果行，可按列名访问。
         """
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                select(DataSetRefluxData.id, *columns)
+                .filter(
+                    DataSetRefluxData.data_set_version_id == data_set_version_id,
+                    DataSetRefluxData.id > last_id,
+                )
+                .order_by(DataSetRefluxData.id)
+                .limit(page_size)
+            ).all()
+            yield from rows
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1].id
+
+    @staticmethod
+    def _get_export_version(data_set_version_id):
         data_set_version_instance = DataSetVersion.query.get(data_set_version_id)
+        if not data_set_version_instance:
+            raise ValueError("数据集版本未找到")
         data_set_instance = DataSet.query.get(data_set_version_instance.data_set_id)
-        # 压缩一个数据集
-        now_str = TimeTools.get_china_now()
-        zip_filename = f"{data_set_version_instance.name}_{data_set_version_instance.version}_{now_str}.zip"
-        with zipfile.ZipFile(zip_filename, "w") as zf:
-            if data_set_instance.from_type == "upload":
-                if os.path.exists(data_set_version_instance.version_path):
-                    for root, _, files in os.walk(
-                        data_set_version_instance.version_path
-                    ):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            zf.write(
-                                file_path,
-                                os.path.relpath(
-                                    file_path, data_set_version_instance.version_path
-                                ),
-                            )
-
-            elif data_set_instance.from_type == "return":
-                # 新的返回数据逻辑
-                # 假设我们有一个函数来获取相关的 A 表数据
-                reflux_list = DataSetRefluxData.query.filter_by(
-                    data_set_version_id=data_set_version_id
-                ).all()
+        zip_filename = (
+            f"{data_set_version_instance.name}_{data_set_version_instance.version}_"
+            f"{TimeTools.get_china_now()}.zip"
+        )
+        return data_set_version_instance, data_set_instance, zip_filename
 
-                for item in reflux_list:
-                    # 为每个项创建一个 JSON 文件
-                    json_filename = f"{item.id}.json"
-                    with open(json_filename, "w") as json_file:
-                        json.dump(
-                            item.json_data, json_file, ensure_ascii=False, indent=4
+    @staticmethod
+    def _iter_individual_zip(data_set_version_instance, data_set_instance):
+        writer = ZipStreamWriter()
+        if data_set_instance.from_type == "upload":
+            version_path = data_set_version_instance.version_path
+            if os.path.exists(version_path):
+                for root, _, files in os.walk(version_path):
+                    for file in files:
+                        file_path = os.path.join(root, file)
+                        yield from writer.add_file(
+                            file_path, os.path.relpath(file_path, version_path)
                         )
 
-                    # 将 JSON 文件添加到 zip
-                    zf.write(json_filename, json_filename)
+        elif data_set_instance.from_type == "return":
+            # 每条回流数据一个 JSON 文件
+            for row in DataService.iter_reflux_data_rows(
+                data_set_version_instance.id, [DataSetRefluxData.json_data]
+            ):
+                yield from writer.add_bytes(
+                    f"{row.id}.json",
+                    json.dumps(row.json_data, ensure_ascii=False, indent=4),
+                )
 
-                    # 删除临时 JSON 文件
-                    os.remove(json_filename)
+        # 信息文件
+        yield from writer.add_bytes(
+            f"info_{data_set_version_instance.name}.txt",
+            f"数据集名称: {data_set_version_instance.name}\n"
+            f"数据集版本号: {data_set_version_instance.version}\n"
+            f"数据集描述: {data_set_instance.description}\n"
+            f"数据集标签: {data_set_instance.label}\n"
+            f"数据集类型: {data_set_instance.from_type}\n",
+        )
+        yield from writer.finish()
 
-            # 创建信息文件
-            info_filename = f"info_{data_set_version_instance.name}.txt"
-            with open(info_filename, "w") as info_file:
-                info_file.write(f"数据集名称: {data_set_version_instance.name}\n")
-                info_file.write(f"数据集版本号: {data_set_version_instance.version}\n")
-                info_file.write(f"数据集描述: {data_set_instance.description}\n")
-                info_file.write(f"数据集标签: {data_set_instance.label}\n")
-                info_file.write(f"数据集类型: {data_set_instance.from_type}\n")
+    @staticmethod
+    def stream_individual_zip(data_set_version_id):
+        """流式导出单个数据集版本的压缩包。
 
-            # 将信息文件添加到压缩包
-            zf.write(info_filename, os.path.basename(info_filename))
-            os.remove(info_filename)  # 删除临时信息文件
+        数据集版本在调用时校验，压缩包内容在迭代时逐块生成。
 
-        return zip_filename
+        Args:
+            data_set_version_id (str): 数据集版本ID。
+
+        Returns:
+            tuple: (压缩包文件名, 压缩包数据块生成器)。
+
+        Raises:
+            ValueError: 当数据集版本未找到时抛出异常。
+        """
+        data_set_version_instance, data_set_instance, zip_filename = (
+            DataService._get_export_version(data_set_version_id)
+        )
+        return zip_filename, DataService._iter_individual_zip(
+            data_set_version_instance, data_set_instance
+        )
 
     @staticmethod
     def create_individual_zip_ft(data_set_version_id):
@@ -1733,30 +1818,38 @@ class DataService:
                 # os.remove(json_filename)
         return dataset_files, data_set_instance.from_type
 
-    def create_combined_zip(self, data_set_version_ids):
-        """创建多个数据集版本的组合压缩包。
+    def stream_combined_zip(self, data_set_version_ids):
+        """流式导出多个数据集版本的组合压缩包。
+
+        每个数据集版本的压缩包作为一个条目嵌套写入，不落地临时文件。
 
         Args:
             data_set_version_ids (list): 数据集版本ID列表。
 
         Returns:
-            str: 组合压缩包文件路径。
+            tuple: (组合压缩包文件名, 压缩包数据块生成器)。
 
         Raises:
-            Exception: 当压缩包创建失败时抛出异常。
+            ValueError: 当任一数据集版本未找到时抛出异常。
         """
+        versions = [
+            self._get_export_version(data_set_version_id)
+            for data_set_version_id in data_set_version_ids
+        ]
         combined_zip_filename = f"多个数据集_{TimeTools.get_china_now()}.zip"
-        with zipfile.ZipFile(combined_zip_filename, "w") as combined_zip:
-            for data_set_version_id in data_set_version_ids:
-                individual_zip_filename = self.create_individual_zip(
-                    data_set_version_id
-                )
-                combined_zip.write(
-                    individual_zip_filename, os.path.basename(individual_zip_filename)
+
+        def generate():
+            writer = ZipStreamWriter()
+            for data_set_version_instance, data_set_instance, zip_filename in versions:
+                yield from writer.add_stream(
+                    zip_filename,
+                    self._iter_individual_zip(
+                        data_set_version_instance, data_set_instance
+                    ),
                 )
-                os.remove(individual_zip_filename)  # 删除临时压缩包
+            yield from writer.finish()
 
-        return combined_zip_filename
+        return combined_zip_filename, generate()
 
     def _prepare_script_instance(self, script_agent, script_id, script_type):
         """准备脚本实例。
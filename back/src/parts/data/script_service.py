@@ -112,10 +112,9 @@ class ScriptService:
             filters.append(Script.script_type.in_(data.get("script_type")))
 
         if data.get("search_tags"):  # 需求上暂时没有要求, 不过不影响先加上这个搜索逻辑
-            target_ids = Tag.get_target_ids_by_names(
-                Tag.Types.SCRIPT, data["search_tags"]
+            filters.append(
+                Tag.target_filter(Tag.Types.SCRIPT, data["search_tags"], Script.id)
             )
-            filters.append(Script.id.in_(target_ids))
 
         if data.get("name") or data.get("search_name"):
             search_name = data.get("name") or data.get("search_name")
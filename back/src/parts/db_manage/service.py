@@ -15,7 +15,10 @@
 
 import ast
 import decimal
+import functools
 import hashlib
+import json
+import logging
 import re
 import traceback
 from datetime import datetime
@@ -26,6 +29,7 @@ from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from configs import lazy_config
 from models.model_account import Account, Tenant
 from utils.util_database import db
+from utils.util_redis import redis_client
 
 from .db_manager import DbManager
 from .model import DataBaseInfo, TableInfo
@@ -93,6 +97,66 @@ def truncate_from_last_slash(text: str) -> str:
     return text[: last_slash_index + 1]  # 包含最后一个 '/'
 
 
+class DatabaseSchemaCache:
+    """内置数据库连接信息和表结构的缓存。
+
+    每个数据库在Redis中维护一个版本号，缓存键包含版本号；
+    数据库或表定义变化时递增版本号，旧缓存随之失效并自然过期。
+    连接信息只缓存数据库名，账号密码仍从配置读取，不写入Redis。
+    """
+
+    VERSION_PREFIX = "db_manage:version"
+    DATABASE_NAME_PREFIX = "db_manage:database_name"
+    TABLE_STRUCTURE_PREFIX = "db_manage:table_structure"
+    EXPIRE_SECONDS = 24 * 3600
+
+    @classmethod
+    def _get_version(cls, database_id) -> str:
+        version = redis_client.get(f"{cls.VERSION_PREFIX}:{database_id}")
+        return version.decode("utf-8") if version else "0"
+
+    @classmethod
+    def get_or_load(cls, prefix, database_id, name, loader):
+        """读取缓存，未命中时调用 loader 并写入缓存。
+
+        Redis 不可用或结果无法序列化时直接返回 loader 的结果。
+
+        Args:
+            prefix (str): 缓存类型前缀。
+            database_id: 数据库ID。
+            name (str): 缓存项名称，如表ID。
+            loader (Callable): 未命中时加载数据的函数。
+
+        Returns:
+            Any: 缓存或加载的数据。
+        """
+        try:
+            key = f"{prefix}:{database_id}:{cls._get_version(database_id)}:{name}"
+            cached = redis_client.get(key)
+            if cached is not None:
+                return json.loads(cached)
+        except Exception as e:
+            logging.warning(f"Failed to read database schema cache: {e}")
+            return loader()
+
+        value = loader()
+        try:
+            redis_client.setex(key, cls.EXPIRE_SECONDS, json.dumps(value))
+        except (TypeError, ValueError):
+            pass
+        except Exception as e:
+            logging.warning(f"Failed to write database schema cache: {e}")
+        return value
+
+    @classmethod
+    def invalidate(cls, database_id):
+        """数据库或表定义变化后调用，使该数据库的所有缓存失效。"""
+        try:
+            redis_client.incr(f"{cls.VERSION_PREFIX}:{database_id}")
+        except Exception as e:
+            logging.warning(f"Failed to invalidate database schema cache: {e}")
+
+
 class DBManageService:
     def __init__(self, account):
         """初始化数据库管理服务。
@@ -114,7 +178,12 @@ class DBManageService:
         Returns:
             dict: 包含数据库连接信息的字典
         """
-        database_info = DataBaseInfo.query.get(database_id)
+        database_name = DatabaseSchemaCache.get_or_load(
+            DatabaseSchemaCache.DATABASE_NAME_PREFIX,
+            database_id,
+            "",
+            lambda: DataBaseInfo.query.get(database_id).database_name,
+        )
         return {
             # "db_type": "PostgreSQL",  # PostgreSQL配置
             "db_type": "MySQL",  # MySQL配置
@@ -122,7 +191,7 @@ class DBManageService:
             "password": lazy_config.DB_PASSWORD,
             "host": lazy_config.DB_HOST,
             "port": lazy_config.DB_PORT,
-            "db_name": database_info.database_name,
+            "db_name": database_name,
             "options_str": lazy_config.DB_EXTRAS,
         }
 
@@ -224,6 +293,7 @@ class DBManageService:
                 database_info.database_name = name
                 database_info.name = db_name
                 db.session.commit()
+                DatabaseSchemaCache.invalidate(database_id)
                 info = database_info.to_dict()
                 info.pop("url")
                 res["data"] = info
@@ -248,18 +318,29 @@ class DBManageService:
         Returns:
             dict: 包含表结构信息的字典
         """
-        database_info = db.session.get(DataBaseInfo, database_id)
-        if table_id is None:
-            table_info = (
-                db.session.query(TableInfo).where(TableInfo.name == table_name).first()
+
+        def load():
+            database_info = db.session.get(DataBaseInfo, database_id)
+            if table_id is None:
+                table_info = (
+                    db.session.query(TableInfo)
+                    .where(TableInfo.name == table_name)
+                    .first()
+                )
+            else:
+                table_info = db.session.get(TableInfo, table_id)
+            config = self.build_config(database_info)
+            manager = DbManager(config)
+            res = manager.get_table_structure(
+                database_info.database_name, table_info.name
             )
-        else:
-            table_info = db.session.get(TableInfo, table_id)
-        config = self.build_config(database_info)
-        manager = DbManager(config)
-        res = manager.get_table_structure(database_info.database_name, table_info.name)
-        res["table_id"] = table_info.id
-        return res
+            res["table_id"] = table_info.id
+            return res
+
+        name = f"id_{table_id}" if table_id is not None else f"name_{table_name}"
+        return DatabaseSchemaCache.get_or_load(
+            DatabaseSchemaCache.TABLE_STRUCTURE_PREFIX, database_id, name, load
+        )
 
     def get_database_info_by_id(self, id):
         """根据ID获取数据库信息。
@@ -305,6 +386,7 @@ class DBManageService:
         if res:
             db.session.delete(table_info)
             db.session.commit()
+            DatabaseSchemaCache.invalidate(database_id)
         return res, message
 
     def delete_db(self, database_id):
@@ -328,6 +410,7 @@ class DBManageService:
         if result:
             db.session.delete(database_info)
             db.session.commit()
+            DatabaseSchemaCache.invalidate(database_id)
         return result, message
 
     def get_all_table(self, database_id, args):
@@ -395,6 +478,7 @@ class DBManageService:
             table_info.tenant_id = self.account.current_tenant_id
             db.session.add(table_info)
             db.session.commit()
+            DatabaseSchemaCache.invalidate(database_id)
         # 检查database_name下的表是否和table_info里一致，有不一致的要在database_name里删除
         tables = manager.get_all_tables(database_info.database_name)
         table_infos = (
@@ -443,6 +527,7 @@ class DBManageService:
                 table_info.name = (table_name,)
                 table_info.comment = comment
                 db.session.commit()
+                DatabaseSchemaCache.invalidate(database_id)
             return res, message
 
     def get_all_databases(self, args):
@@ -875,10 +960,12 @@ class DBManageService:
             return False, error_rows, str(e)
 
     @staticmethod
+    @functools.cache
     def get_model_columns_info(model_class):
         """获取数据库模型的列信息。
 
         获取SQLAlchemy模型类的所有列信息，包括列名、数据类型、注释和主键信息。
+        模型定义在进程内不会变化，结果按模型类缓存，调用方不应修改返回的列表。
 
         Args:
             model_class: SQLAlchemy模型类
@@ -15,7 +15,9 @@
 
 import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import timedelta
 
 import requests
@@ -77,6 +79,109 @@ def get_service_info(service_id):
     return get_service_info_res
 
 
+# 列表页未能及时获取到 AMS 状态的服务展示的状态
+STATUS_UNKNOWN = "Unknown"
+
+
+class AmsStatusCache:
+    """AMS 推理服务状态缓存。
+
+    列表页的状态查询并发执行，每次调用有独立超时。缓存超过 FRESH_SECONDS 的条目
+    仍会立即返回并标记为过期，同时在后台刷新；没有缓存的条目并发拉取，
+    最多等待 WAIT_TIMEOUT 秒，超时未返回的条目返回 UNKNOWN 并标记为过期。
+
+    Attributes:
+        FRESH_SECONDS (int): 状态被视为最新的秒数。
+        EXPIRE_SECONDS (int): 条目被丢弃的秒数。
+        CALL_TIMEOUT (int): 单次 AMS 请求的超时时间。
+        WAIT_TIMEOUT (int): 列表页等待未缓存条目的最长时间。
+        UNKNOWN (tuple): 未能及时获取状态时的结果，成功标记为 None，
+            与 AMS 返回失败的 False 区分。
+    """
+
+    FRESH_SECONDS = 10
+    EXPIRE_SECONDS = 10 * 60
+    CALL_TIMEOUT = 5
+    WAIT_TIMEOUT = 6
+    UNKNOWN = (None, "", "")
+
+    def __init__(self, max_workers=16):
+        self._entries = {}  # gid -> (fetched_at, (result, status, endpoint))
+        self._pending = {}  # gid -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ams-status"
+        )
+
+    def _fetch(self, gid):
+        value = InferService().ams_get_service_status(gid, timeout=self.CALL_TIMEOUT)
+        with self._lock:
+            self._entries[gid] = (time.monotonic(), value)
+            self._pending.pop(gid, None)
+        return value
+
+    def _submit(self, gid):
+        with self._lock:
+            future = self._pending.get(gid)
+            if future is None:
+                future = self._executor.submit(self._fetch, gid)
+                self._pending[gid] = future
+                future.add_done_callback(lambda _f, g=gid: self._discard(g, _f))
+            return future
+
+    def _discard(self, gid, future):
+        with self._lock:
+            if self._pending.get(gid) is future:
+                self._pending.pop(gid, None)
+
+    def get_many(self, gids):
+        """批量获取服务状态。
+
+        Args:
+            gids (list): AMS 服务名称列表。
+
+        Returns:
+            dict: gid 到 ((是否成功, 状态, 端点), 是否过期) 的映射。
+        """
+        now = time.monotonic()
+        result = {}
+        missing = []
+        stale = []
+        with self._lock:
+            for gid in set(gids):
+                entry = self._entries.get(gid)
+                if entry is None or now - entry[0] > self.EXPIRE_SECONDS:
+                    missing.append(gid)
+                elif now - entry[0] > self.FRESH_SECONDS:
+                    result[gid] = (entry[1], True)
+                    stale.append(gid)
+                else:
+                    result[gid] = (entry[1], False)
+
+        futures = {gid: self._submit(gid) for gid in missing}
+        if futures:
+            wait(futures.values(), timeout=self.WAIT_TIMEOUT)
+        for gid, future in futures.items():
+            if future.done() and future.exception() is None:
+                result[gid] = (future.result(), False)
+            else:
+                result[gid] = (self.UNKNOWN, True)
+
+        # 过期条目先返回旧值，后台刷新
+        for gid in stale:
+            self._submit(gid)
+        return result
+
+    def invalidate(self, gid):
+        """服务启动或停止后丢弃缓存的状态。
+
+        Args:
+            gid (str): AMS 服务名称。
+        """
+        with self._lock:
+            self._entries.pop(gid, None)
+
+
 class InferService:
     """推理服务类，负责管理模型推理服务。
 
@@ -129,11 +234,12 @@ class InferService:
                 f"仅剩{remaining}张可用，不足{required_gpus}张。"
             )
 
-    def ams_get_service_status(self, lws_release_name):
+    def ams_get_service_status(self, lws_release_name, timeout=5):
         """获取AMS服务状态。
 
         Args:
             lws_release_name (str): LWS发布名称。
+            timeout (float, optional): 请求超时时间，单位秒。默认 5 秒。
 
         Returns:
             tuple: (bool, str, str) 获取结果元组，包含：
@@ -149,7 +255,7 @@ class InferService:
         )
         logging.info(f"ams_get_url: {ams_get_url}")
         try:
-            response = requests.get(ams_get_url, timeout=5)
+            response = requests.get(ams_get_url, timeout=timeout)
             try:
                 response_data = response.json()
             except ValueError:
@@ -262,24 +368,46 @@ class InferService:
     def _get_ams_service_status(self, infer_model_service_groups):
         """获取AMS服务状态。
 
+        所有服务的状态通过 ams_status_cache 并发获取。
+
         Args:
             infer_model_service_groups (list): 推理模型服务组列表。
 
         Returns:
-            tuple: (ams_service_status, ams_service_endpoint) 状态和端点字典。
+            tuple: (ams_service_status, ams_service_endpoint, stale_gids)
+                状态字典、端点字典和状态已过期的服务名称集合。
         """
         ams_service_status = {}
         ams_service_endpoint = {}
+        stale_gids = set()
+        gids = [
+            service.gid
+            for infer_model_service_group in infer_model_service_groups
+            for service in infer_model_service_group.services
+            if service.gid
+        ]
+        fetched = ams_status_cache.get_many(gids)
+
         for infer_model_service_group in infer_model_service_groups:
             ams_model_name = infer_model_service_group.model_name
             services = infer_model_service_group.services
             for service in services:
                 if service.gid:
                     (
-                        ams_get_service_status_result,
-                        ams_get_service_status_return,
-                        ams_get_service_status_endpoint,
-                    ) = self.ams_get_service_status(service.gid)
+                        (
+                            ams_get_service_status_result,
+                            ams_get_service_status_return,
+                            ams_get_service_status_endpoint,
+                        ),
+                        is_stale,
+                    ) = fetched[service.gid]
+                    if is_stale:
+                        stale_gids.add(str(service.gid))
+                    if ams_get_service_status_result is None:
+                        # 状态尚未获取到，不能当作已停止
+                        ams_service_status[str(service.gid)] = STATUS_UNKNOWN
+                        ams_service_endpoint[str(service.gid)] = ""
+                        continue
                     if not ams_get_service_status_result:
                         logging.info(
                             f"获取AMS推理任务状态失败： " f"{str(service.gid)}"
@@ -320,7 +448,7 @@ class InferService:
                                     + local_ams_model["endpoint"]
                                 )
                             ams_service_endpoint[str(service.gid)] = endpoint_url
-        return ams_service_status, ams_service_endpoint
+        return ams_service_status, ams_service_endpoint, stale_gids
 
     def _process_status_filter(self, status):
         """处理状态过滤器。
@@ -339,8 +467,29 @@ class InferService:
                 status.update(["InQueue", "Running", "Pending"])
         return status
 
+    @staticmethod
+    def _match_status_filter(service_status, status):
+        """判断服务状态是否满足状态过滤器。
+
+        状态未知的服务无法判断是否满足过滤条件，始终保留，避免被误删或误归类。
+
+        Args:
+            service_status (str): 服务状态。
+            status (set): 状态过滤器，为空时不过滤。
+
+        Returns:
+            bool: 满足过滤条件返回 True。
+        """
+        return not status or service_status == STATUS_UNKNOWN or service_status in status
+
     def _build_service_info(
-        self, services, ams_service_status, ams_service_endpoint, status, user_id
+        self,
+        services,
+        ams_service_status,
+        ams_service_endpoint,
+        status,
+        user_id,
+        stale_gids=None,
     ):
         """构建服务信息列表。
 
@@ -350,6 +499,7 @@ class InferService:
             ams_service_endpoint (dict): AMS服务端点。
             status (set): 状态过滤器。
             user_id (list): 用户ID列表。
+            stale_gids (set, optional): 状态已过期的服务名称集合。
 
         Returns:
             list: 服务信息列表。
@@ -361,7 +511,7 @@ class InferService:
                 if service.gid
                 else "Cancelled"
             )
-            if status and service_status not in status:
+            if not self._match_status_filter(service_status, status):
                 continue
 
             service_info.append(
@@ -373,6 +523,7 @@ class InferService:
                     "url": ams_service_endpoint.get(service.gid, ""),
                     "name": service.name,
                     "status": service_status,
+                    "status_stale": bool(stale_gids and service.gid in stale_gids),
                     "job_id": ams_service_endpoint.get(service.gid, ""),
                     "token": service.tenant_id,
                     "logs": service.logs,
@@ -396,7 +547,7 @@ class InferService:
         if status:
             service_info = [
                 info for info in service_info
-                if info.get("status") in status
+                if self._match_status_filter(info.get("status"), status)
             ]
             
         return service_info
@@ -446,9 +597,11 @@ class InferService:
             )
             infer_model_service_groups = query.all()
 
-            ams_service_status, ams_service_endpoint = self._get_ams_service_status(
-                infer_model_service_groups
-            )
+            (
+                ams_service_status,
+                ams_service_endpoint,
+                stale_gids,
+            ) = self._get_ams_service_status(infer_model_service_groups)
             status = self._process_status_filter(status)
 
             # 生成 result 列表
@@ -474,6 +627,7 @@ class InferService:
                     ams_service_endpoint,
                     status,
                     user_id,
+                    stale_gids,
                 )
 
                 if not service_info:
@@ -879,6 +1033,7 @@ class InferService:
         )
         logging.info(f"ams_delete_url: {ams_delete_url}")
         response = requests.delete(ams_delete_url)
+        ams_status_cache.invalidate(lws_release_name)
         status_code = response.status_code
         try:
             response_data = response.json()
@@ -979,6 +1134,7 @@ class InferService:
                 f"ams_start_service failed: {response_data.get('code')}, {response_data.get('message')}"
             )
             return False, ""
+        ams_status_cache.invalidate(response_data.get("lwsName"))
         return True, response_data.get("lwsName")
 
     def is_cloud_service_available(self, timeout: float = 2.0):
@@ -1190,3 +1346,6 @@ class InferService:
             ]
         except Exception as e:
             raise ValueError("本地模型列表获取失败") from e
+
+
+ams_status_cache = AmsStatusCache()
@@ -50,6 +50,7 @@ class KnowledgeBaseListApi(Resource):
         parser = reqparse.RequestParser()
         parser.add_argument("page", type=int, default=1, location="json")
         parser.add_argument("page_size", type=int, default=20, location="json")
+        parser.add_argument("cursor", type=str, location="json", required=False)
         parser.add_argument(
             "qtype", type=str, location="json", required=False, default="already"
         )
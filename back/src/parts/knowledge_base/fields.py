@@ -35,6 +35,7 @@ knowledge_pagination_fields = {
     "page_size": fields.Integer(attribute="per_page"),
     "total": fields.Integer,
     "has_more": fields.Boolean(attribute="has_next"),
+    "next_cursor": fields.String,
     "data": fields.List(fields.Nested(knowledge_base_fields), attribute="items"),
 }
 
@@ -16,6 +16,7 @@
 from sqlalchemy import and_, or_
 
 from libs.filetools import FileTools
+from libs.pagination import keyset_paginate
 from libs.timetools import TimeTools
 from models.model_account import Account
 from parts.app.model import App, WorkflowRefer
@@ -49,14 +50,13 @@ class KnowledgeBaseService:
             data (dict): 查询参数，包含 page、page_size、search_tags、user_id、search_name、qtype 等
 
         Returns:
-            Pagination: 分页对象，包含知识库列表和分页信息
+            KeysetPage: 分页对象，包含知识库列表和分页信息
         """
         filters = []
         if data.get("search_tags"):
-            target_ids = Tag.get_target_ids_by_names(
-                Tag.Types.KNOWLEDGE, data["search_tags"]
+            filters.append(
+                Tag.target_filter(Tag.Types.KNOWLEDGE, data["search_tags"], kb.id)
             )
-            filters.append(kb.id.in_(target_ids))
 
         if data.get("user_id"):
             filters.append(kb.user_id.in_(data["user_id"]))
@@ -86,11 +86,12 @@ class KnowledgeBaseService:
                     kb.user_id == Account.get_administrator_id(),
                 )
             )
-        pagination = db.paginate(
-            db.select(kb).where(*filters).order_by(kb.created_at.desc()),
+        pagination = keyset_paginate(
+            kb.query.filter(*filters),
+            [kb.created_at, kb.id],
             page=data["page"],
             per_page=data["page_size"],
-            error_out=False,
+            cursor=data.get("cursor"),
         )
 
         kb_ids = [str(tool.id) for tool in pagination.items]
@@ -83,9 +83,9 @@ class McpServerService:
         if data.get("enable") is not None:
             query = query.filter(McpServer.enable == data.get("enable"))
         if data.get("search_tags"):
-            target_ids = Tag.get_target_ids_by_names(Tag.Types.MCP, data["search_tags"])
-            target_ids = [int(k) for k in target_ids]
-            query = query.filter(McpServer.id.in_(target_ids))
+            query = query.filter(
+                Tag.target_filter(Tag.Types.MCP, data["search_tags"], McpServer.id)
+            )
         if data.get("search_name"):
             search_name = data["search_name"]
             filters.append(
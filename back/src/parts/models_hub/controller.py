@@ -62,6 +62,7 @@ class modelHubListApi(Resource):
         parser.add_argument("model_type", type=str, default="", location="json")
         parser.add_argument("page", type=int, default=1, location="json")
         parser.add_argument("page_size", type=int, default=20, location="json")
+        parser.add_argument("cursor", type=str, location="json", required=False)
         parser.add_argument(
             "qtype", type=str, location="json", required=False, default="already"
         )
@@ -82,6 +82,7 @@ model_pagination_fields = {
     "page_size": fields.Integer(attribute="per_page"),
     "total": fields.Integer,
     "has_more": fields.Boolean(attribute="has_next"),
+    "next_cursor": fields.String,
     "data": fields.List(fields.Nested(model_fields), attribute="items"),
 }
 
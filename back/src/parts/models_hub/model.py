@@ -241,6 +241,9 @@ class Lazymodel(db.Model):
             str: API密钥，如果不存在则返回空字符串。
         """
         if self.model_type == "online":
+            if "_prefetched_config_info" in self.__dict__:
+                config_info = self._prefetched_config_info
+                return config_info.api_key if config_info else ""
             if g.current_user:
                 config_info = (
                     db.session.query(LazyModelConfigInfo)
@@ -330,48 +333,126 @@ class Lazymodel(db.Model):
             list: 在线模型列表，如果不是在线模型则返回None。
         """
         if self.model_type == "online":
-            filters = [
-                LazymodelOnlineModels.model_id == self.id,
-                LazymodelOnlineModels.deleted_flag == 0,
-            ]
-
-            # 添加微调能力过滤
-            if can_finetune is not None:
-                filters.append(LazymodelOnlineModels.can_finetune == (1 if can_finetune else 0))
-
-            if "qtype" in g and g.qtype and "current_user" in g and g.current_user:
-                if g.qtype == "mine":  # 我的
-                    filters.append(LazymodelOnlineModels.user_id == g.current_user.id)
-                    filters.append(
+            filters = [LazymodelOnlineModels.model_id == self.id]
+            filters.extend(self._online_model_filters(can_finetune))
+            models = db.session.query(LazymodelOnlineModels).filter(*filters).all()
+            return models
+        else:
+            return None
+
+    @staticmethod
+    def _online_model_filters(can_finetune=None):
+        """构造在线模型列表的公共过滤条件。
+
+        Args:
+            can_finetune (bool, optional): 是否可微调过滤。
+
+        Returns:
+            list: 过滤条件列表，不包含模型ID条件。
+        """
+        filters = [LazymodelOnlineModels.deleted_flag == 0]
+
+        # 添加微调能力过滤
+        if can_finetune is not None:
+            filters.append(LazymodelOnlineModels.can_finetune == (1 if can_finetune else 0))
+
+        if "qtype" in g and g.qtype and "current_user" in g and g.current_user:
+            if g.qtype == "mine":  # 我的
+                filters.append(LazymodelOnlineModels.user_id == g.current_user.id)
+                filters.append(
+                    LazymodelOnlineModels.tenant_id
+                    == g.current_user.current_tenant_id
+                )
+            if g.qtype == "mine_builtin":  # 我的
+                filters.append(
+                    or_(
                         LazymodelOnlineModels.tenant_id
-                        == g.current_user.current_tenant_id
-                    )
-                if g.qtype == "mine_builtin":  # 我的
-                    filters.append(
-                        or_(
-                            LazymodelOnlineModels.tenant_id
-                            == g.current_user.current_tenant_id,
-                            LazymodelOnlineModels.builtin_flag.is_(True),
-                        )
+                        == g.current_user.current_tenant_id,
+                        LazymodelOnlineModels.builtin_flag.is_(True),
                     )
-                elif g.qtype == "group":  # 同组
-                    filters.append(LazymodelOnlineModels.user_id != g.current_user.id)
-                    filters.append(
+                )
+            elif g.qtype == "group":  # 同组
+                filters.append(LazymodelOnlineModels.user_id != g.current_user.id)
+                filters.append(
+                    LazymodelOnlineModels.tenant_id
+                    == g.current_user.current_tenant_id
+                )
+            elif g.qtype == "already":  # 所有
+                filters.append(
+                    or_(
                         LazymodelOnlineModels.tenant_id
-                        == g.current_user.current_tenant_id
+                        == g.current_user.current_tenant_id,
+                        LazymodelOnlineModels.builtin_flag.is_(True),
                     )
-                elif g.qtype == "already":  # 所有
-                    filters.append(
-                        or_(
+                )
+        return filters
+
+    @classmethod
+    def get_online_model_lists(cls, model_ids, can_finetune=None):
+        """批量获取多个在线模型的子模型列表。
+
+        与 _get_online_model_list 的过滤条件一致，但只发起一次查询。
+
+        Args:
+            model_ids (list): 在线模型ID列表。
+            can_finetune (bool, optional): 是否可微调过滤。
+
+        Returns:
+            dict: 模型ID到在线模型列表的映射，没有子模型的ID映射为空列表。
+        """
+        result = {model_id: [] for model_id in model_ids}
+        if not result:
+            return result
+
+        filters = [LazymodelOnlineModels.model_id.in_(list(result))]
+        filters.extend(cls._online_model_filters(can_finetune))
+        for item in db.session.query(LazymodelOnlineModels).filter(*filters).all():
+            result[item.model_id].append(item)
+        return result
+
+    @staticmethod
+    def _model_list_filters():
+        """构造列表展示的在线子模型过滤条件，不包含模型ID条件。
+
+        Returns:
+            list: 过滤条件列表。
+        """
+        filters = [LazymodelOnlineModels.deleted_flag == 0]
+        if "qtype" in g and g.qtype and "current_user" in g and g.current_user:
+            if g.qtype == "mine":  # 我的
+                filters.append(LazymodelOnlineModels.user_id == g.current_user.id)
+                filters.append(
+                    LazymodelOnlineModels.tenant_id
+                    == g.current_user.current_tenant_id
+                )
+            if g.qtype == "mine_builtin":  # 我的+内置
+                filters.append(
+                    or_(
+                        and_(
+                            LazymodelOnlineModels.user_id == g.current_user.id,
                             LazymodelOnlineModels.tenant_id
                             == g.current_user.current_tenant_id,
-                            LazymodelOnlineModels.builtin_flag.is_(True),
-                        )
+                        ),
+                        LazymodelOnlineModels.builtin_flag.is_(True),
                     )
-            models = db.session.query(LazymodelOnlineModels).filter(*filters).all()
-            return models
-        else:
-            return None
+                )
+            elif g.qtype == "group":  # 同组
+                filters.append(LazymodelOnlineModels.user_id != g.current_user.id)
+                filters.append(
+                    LazymodelOnlineModels.tenant_id
+                    == g.current_user.current_tenant_id
+                )
+            elif g.qtype == "builtin":  # 内置
+                filters.append(LazymodelOnlineModels.builtin_flag.is_(True))
+            elif g.qtype == "already":  # 混合了前3者的数据
+                filters.append(
+                    or_(
+                        LazymodelOnlineModels.tenant_id
+                        == g.current_user.current_tenant_id,
+                        LazymodelOnlineModels.builtin_flag.is_(True),
+                    )
+                )
+        return filters
 
     @property
     def model_list(self):
@@ -382,48 +463,17 @@ class Lazymodel(db.Model):
         Returns:
             list: 模型列表。
         """
+        if "_prefetched_model_list" in self.__dict__:
+            return self._prefetched_model_list
         if self.model_type == "online":
-            filters = [
-                LazymodelOnlineModels.model_id == self.id,
-                LazymodelOnlineModels.deleted_flag == 0,
-            ]
-            if "qtype" in g and g.qtype and "current_user" in g and g.current_user:
-                if g.qtype == "mine":  # 我的
-                    filters.append(LazymodelOnlineModels.user_id == g.current_user.id)
-                    filters.append(
-                        LazymodelOnlineModels.tenant_id
-                        == g.current_user.current_tenant_id
-                    )
-                if g.qtype == "mine_builtin":  # 我的+内置
-                    filters.append(
-                        or_(
-                            and_(
-                                LazymodelOnlineModels.user_id == g.current_user.id,
-                                LazymodelOnlineModels.tenant_id
-                                == g.current_user.current_tenant_id,
-                            ),
-                            LazymodelOnlineModels.builtin_flag.is_(True),
-                        )
-                    )
-                elif g.qtype == "group":  # 同组
-                    filters.append(LazymodelOnlineModels.user_id != g.current_user.id)
-                    filters.append(
-                        LazymodelOnlineModels.tenant_id
-                        == g.current_user.current_tenant_id
-                    )
-                elif g.qtype == "builtin":  # 内置
-                    filters.append(LazymodelOnlineModels.builtin_flag.is_(True))
-                elif g.qtype == "already":  # 混合了前3者的数据
-                    filters.append(
-                        or_(
-                            LazymodelOnlineModels.tenant_id
-                            == self.account.current_tenant_id,
-                            LazymodelOnlineModels.builtin_flag.is_(True),
-                        )
-                    )
-
-            models = db.session.query(LazymodelOnlineModels).filter(*filters).all()
-            return models
+            return (
+                db.session.query(LazymodelOnlineModels)
+                .filter(
+                    LazymodelOnlineModels.model_id == self.id,
+                    *self._model_list_filters(),
+                )
+                .all()
+            )
         else:
             models = (
                 db.session.query(Lazymodel)
@@ -434,6 +484,50 @@ class Lazymodel(db.Model):
             )
             return models
 
+    @classmethod
+    def prefetch_list_fields(cls, items):
+        """为一页模型批量加载列表展示需要的子模型、标签和 API 密钥。
+
+        每类数据只查询一次，结果挂在实例上，marshal 时不再逐条查询。
+
+        Args:
+            items (list): 模型实例列表。
+        """
+        if not items:
+            return
+        online_ids = [item.id for item in items if item.model_type == "online"]
+        local_ids = [item.id for item in items if item.model_type != "online"]
+        model_lists = {item.id: [] for item in items}
+        if online_ids:
+            for model in db.session.query(LazymodelOnlineModels).filter(
+                LazymodelOnlineModels.model_id.in_(online_ids),
+                *cls._model_list_filters(),
+            ):
+                model_lists[model.model_id].append(model)
+        if local_ids:
+            for model in db.session.query(Lazymodel).filter(
+                Lazymodel.parent_model_id.in_(local_ids), Lazymodel.deleted_flag == 0
+            ):
+                model_lists[model.parent_model_id].append(model)
+
+        config_infos = {}
+        current_user = g.get("current_user")
+        if online_ids and current_user:
+            config_infos = {
+                config_info.model_id: config_info
+                for config_info in db.session.query(LazyModelConfigInfo).filter(
+                    LazyModelConfigInfo.model_id.in_(online_ids),
+                    LazyModelConfigInfo.tenant_id == current_user.current_tenant_id,
+                )
+            }
+
+        tags = Tag.get_names_by_target_ids(Tag.Types.MODEL, [item.id for item in items])
+        for item in items:
+            item._prefetched_model_list = model_lists[item.id]
+            item._prefetched_tags = tags.get(str(item.id), [])
+            if current_user:
+                item._prefetched_config_info = config_infos.get(item.id)
+
     @property
     def can_finetune(self):
         """检查模型是否可以微调。
@@ -486,6 +580,8 @@ class Lazymodel(db.Model):
         Returns:
             list: 标签名称列表。
         """
+        if "_prefetched_tags" in self.__dict__:
+            return self._prefetched_tags
         return Tag.get_names_by_target_id(Tag.Types.MODEL, self.id)
 
 
@@ -24,7 +24,7 @@ import requests
 from flask_restful import marshal
 from scoamp.globals import set_auth_info, set_endpoint, set_path_prefix
 from scoamp.toolkit import create_and_upload_model, snapshot_download
-from sqlalchemy import and_, asc, desc, exists, or_
+from sqlalchemy import and_, asc, case, exists, or_
 from flask_login import current_user
 from core.account_manager import AccountService
 from lazyllm.components import ModelManager
@@ -32,6 +32,7 @@ from lazyllm.engine import LightEngine
 import lazyllm
 from core.account_manager import CommonError
 from libs.filetools import FileTools
+from libs.pagination import keyset_paginate
 from libs.timetools import TimeTools
 from models.model_account import Account, Tenant
 from parts.knowledge_base.model import FileRecord
@@ -253,11 +254,9 @@ class ModelService:
         ).filter(Lazymodel.deleted_flag == 0)
 
         if data.get("search_tags"):
-            target_ids = Tag.get_target_ids_by_names(
-                Tag.Types.MODEL, data["search_tags"]
+            query = query.filter(
+                Tag.target_filter(Tag.Types.MODEL, data["search_tags"], Lazymodel.id)
             )
-            target_ids = [int(k) for k in target_ids]
-            query = query.filter(Lazymodel.id.in_(target_ids))
 
         if data.get("search_name"):
             search_name = data["search_name"]
@@ -360,30 +359,45 @@ class ModelService:
                     )
                 )
         query = query.filter(*filters)
-        query = query.order_by(
-            desc(
+        # 可用模型排在前面；用 case 取 0/1，避免 NULL 参与游标比较
+        available_rank = case(
+            (
                 or_(
                     Lazymodel.model_status == ModelStatus.SUCCESS.value,
                     LazyModelConfigInfo.api_key.isnot(None),
-                )
+                ),
+                1,
             ),
-            desc(Lazymodel.id),
+            else_=0,
         )
-        pagination = query.paginate(
+        pagination = keyset_paginate(
+            query,
+            [available_rank, Lazymodel.id],
             page=data["page"],
             per_page=data["page_size"],
-            error_out=False,
+            cursor=data.get("cursor"),
         )
         if search_online_llm:
             # 获取支持的品牌列表
             queryset = ChoiceTag.query.filter_by(type="llm").all()
             supported_brands = [m.name for m in queryset]
 
+        Lazymodel.prefetch_list_fields(pagination.items)
+        # 一次查询取出本页全部创建者的名称
+        user_ids = {i.user_id for i in pagination.items if i.user_id}
+        user_names = {}
+        if user_ids:
+            user_names = dict(
+                db.session.query(Account.id, Account.name)
+                .filter(Account.id.in_(user_ids))
+                .all()
+            )
+
         for i in pagination.items:
             if i.user_id and i.user_id == Account.get_administrator_id():
                 i.user_name = "Lazy LLM官方"
             else:
-                i.user_name = getattr(db.session.get(Account, i.user_id), "name", "")
+                i.user_name = user_names.get(i.user_id, "")
             if search_online_llm:
                 if i.api_key is None or i.api_key == "":
                     i.model_status = ModelStatus.START.value
@@ -1610,13 +1624,16 @@ class ModelService:
         success, ft_model_list = get_finetune_model_list(only_model_key=True)
         return set(ft_model_list) if success else set()
 
-    def _filter_by_can_finetune(self, model_records, finetune_model_names, can_finetune):
+    def _filter_by_can_finetune(
+        self, model_records, finetune_model_names, can_finetune, online_models_map
+    ):
         """根据微调能力过滤模型列表。
 
         Args:
             model_records (list): 模型记录列表。
             finetune_model_names (set): 微调模型名称集合。
             can_finetune (bool): 微调能力过滤条件。
+            online_models_map (dict): 在线模型ID到子模型列表的映射。
 
         Returns:
             list: 过滤后的模型记录列表。
@@ -1638,7 +1655,7 @@ class ModelService:
                     filtered_records.append(model)
             elif model.model_type == "online" and model.model_kind == "OnlineLLM":
                 # 在线模型：检查是否有符合条件的子模型
-                online_models = model._get_online_model_list(can_finetune=can_finetune)
+                online_models = online_models_map.get(model.id)
                 if online_models:  # 如果有符合条件的子模型，则添加父模型
                     filtered_records.append(model)
         return filtered_records
@@ -1729,21 +1746,48 @@ class ModelService:
         if len(model_kinds) > 0:
             query = query.filter(Lazymodel.model_kind.in_(model_kinds))
         model_records = query.all()
-        
+
+        # 一次查询取出全部在线模型的子模型列表
+        online_models_map = Lazymodel.get_online_model_lists(
+            [m.id for m in model_records if m.model_type == "online"],
+            can_finetune=can_finetune,
+        )
+
         # 使用优化的过滤逻辑
         if can_finetune is not None:
-            finetune_model_names = set()
             finetune_model_names = self._get_finetune_model_names()
-            model_records = self._filter_by_can_finetune(model_records, finetune_model_names, can_finetune)
-        
+            model_records = self._filter_by_can_finetune(
+                model_records, finetune_model_names, can_finetune, online_models_map
+            )
+
+        return self._build_model_tree(model_records, online_models_map)
+
+    def _build_model_tree(self, model_records, online_models_map):
+        """组装模型选择树。
+
+        微调模型按父模型ID建立索引，整体复杂度与模型数量成线性关系。
+
+        Args:
+            model_records (list): 模型记录列表。
+            online_models_map (dict): 在线模型ID到子模型列表的映射。
+
+        Returns:
+            list: 模型树结构数据。
+        """
+        p_list = []
+        finetune_children = {}
+        for i in model_records:
+            if i.is_finetune_model:
+                finetune_children.setdefault(i.parent_model_id, []).append(i)
+            else:
+                p_list.append(i)
+
         records = []
-        p_list = [i for i in model_records if not i.is_finetune_model]
-        f_list = [i for i in model_records if i.is_finetune_model]
         for m in p_list:
             if m.model_type == "local":
                 m_dict = marshal(m, fields.model_select_fields)
                 m_dict["can_select"] = True
-                child = [i for i in f_list if i.parent_model_id == m.id]
+                child = finetune_children.get(m.id, [])
                 if len(child) > 0:
                     m_dict["child"] = marshal(child, fields.model_select_fields)
                     m_dict["child"].append(marshal(m, fields.model_select_fields))
@@ -1757,18 +1801,23 @@ class ModelService:
                 m_dict["can_select"] = True
                 if m.model_type == "online":
                     m_dict["can_select"] = False
-                    # 使用新的方法进行微调能力过滤
+                    # 子模型列表已按微调能力过滤:
                     # can_finetune=None: 返回全部模型
                     # can_finetune=True: 只返回能微调的模型
                     # can_finetune=False: 只返回不能微调的模型
-                    models = m._get_online_model_list(can_finetune=can_finetune)
-                    o_p_list = [i for i in models if not i.is_finetune_model]
-                    o_f_list = [i for i in models if i.is_finetune_model]
+                    models = online_models_map.get(m.id, [])
+                    o_p_list = []
+                    o_children = {}
+                    for i in models:
+                        if i.is_finetune_model:
+                            o_children.setdefault(i.parent_id, []).append(i)
+                        else:
+                            o_p_list.append(i)
                     m_dict["child"] = []
                     for op in o_p_list:
                         o_dict = marshal(op, fields.model_select_fields)
                         o_dict["can_select"] = True
-                        child = [i for i in o_f_list if i.parent_id == op.id]
+                        child = o_children.get(op.id, [])
                         if len(child) > 0:
                             m_dict["can_select"] = False
                             o_dict["can_select"] = False
@@ -1781,11 +1830,8 @@ class ModelService:
                             del o_dict["id"]
                             for x in o_dict["child"]:
                                 x["id"] = m.id
-                            m_dict["child"].append(o_dict)
-                        else:
-                            m_dict["child"].append(o_dict)
-                        for x in m_dict["child"]:
-                            x["id"] = m.id
+                        o_dict["id"] = m.id
+                        m_dict["child"].append(o_dict)
                 records.append(m_dict)
         return records
 
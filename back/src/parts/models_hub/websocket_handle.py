@@ -13,22 +13,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import logging
-import uuid
 from typing import Any
 
 from flask_sock import Sock
 from simple_websocket import ConnectionClosed
 
-task_connections: dict[str, Any] = {}
+from utils.util_websocket import WebSocketHub
+
+# 下载进度是快照消息，慢客户端只需收到最新一条
+task_progress_hub = WebSocketHub("ws:model_hub_tasks", queue_size=1)
 websocket_handler = None
 
 
 def send_ms(task_id: str, msg: dict[str, Any]):
     """发送消息到指定任务的WebSocket连接。
 
-    向指定任务ID的所有WebSocket连接发送消息。
+    向指定任务ID的所有WebSocket连接发送消息，连接可以在任意工作进程中。
+    消息只进入各连接的发送队列，不会阻塞调用方。
 
     Args:
         task_id (str): 任务ID。
@@ -40,13 +42,10 @@ def send_ms(task_id: str, msg: dict[str, Any]):
     Raises:
         Exception: 当发送消息失败时抛出异常。
     """
-    if task_id in task_connections:
-        websockets = task_connections[task_id]
-        for websocket in websockets:
-            try:
-                websockets[websocket].send(json.dumps(msg))
-            except Exception as e:
-                print(f"Error sending message to task: {task_id}: {str(e)}")
+    try:
+        task_progress_hub.publish(task_id, msg)
+    except Exception as e:
+        print(f"Error sending message to task: {task_id}: {str(e)}")
 
 
 def setup_websocket(app):
@@ -65,8 +64,7 @@ def setup_websocket(app):
 
     @sock.route("/model_hub/ws/<task_id>")
     def handle_model_hub_websocket(ws, task_id):
-        uuid_str = str(uuid.uuid4())
-        task_connections.setdefault(task_id, {})[uuid_str] = ws
+        conn_id = task_progress_hub.register(task_id, ws)
         try:
             while True:
                 try:
@@ -83,10 +81,7 @@ def setup_websocket(app):
         except Exception as e:
             logging.error(f"Error in WebSocket connection for task {task_id}: {str(e)}")
         finally:
-            if uuid_str in task_connections[task_id]:
-                del task_connections[task_id][uuid_str]
-            if not task_connections[task_id]:
-                del task_connections[task_id]
+            task_progress_hub.unregister(task_id, conn_id)
             logging.info(
                 f"WebSocket connection for task {task_id} ended and cleaned up."
             )
@@ -223,9 +223,10 @@ class ListPrompts(Resource):
         search_tags = data.get("search_tags", [])  # 默认空字符串
         search_name = data.get("search_name", "")  # 默认空字符串
         user_id = data.get("user_id", [])
+        cursor = data.get("cursor")
 
         prompts, pagination_info = self.prompt_service.list_prompt(
-            page, per_page, qtype, search_tags, search_name, user_id
+            page, per_page, qtype, search_tags, search_name, user_id, cursor
         )
 
         return build_response(
@@ -235,6 +236,7 @@ class ListPrompts(Resource):
                 "current_page": pagination_info["current_page"],
                 "next_page": pagination_info["next_page"],
                 "prev_page": pagination_info["prev_page"],
+                "next_cursor": pagination_info["next_cursor"],
                 "prompts": prompts,
             }
         )
@@ -18,6 +18,7 @@ from flask_login import current_user
 from sqlalchemy import or_
 from sqlalchemy.exc import IntegrityError
 
+from libs.pagination import keyset_paginate
 from libs.timetools import TimeTools
 from models.model_account import Account
 from parts.logs.enums import Action, Module
@@ -149,13 +150,13 @@ class PromptService:
         return False
 
     @staticmethod
-    def list_prompt(page, per_page, qtype, search_tags, search_name, user_id):
+    def list_prompt(
+        page, per_page, qtype, search_tags, search_name, user_id, cursor=None
+    ):
         filters = []
         get_creator = False
         if search_tags:
-            target_ids = Tag.get_target_ids_by_names(Tag.Types.PROMPT, search_tags)
-            target_ids = [int(k) for k in target_ids]
-            filters.append(Prompt.id.in_(target_ids))
+            filters.append(Tag.target_filter(Tag.Types.PROMPT, search_tags, Prompt.id))
 
         if user_id:
             filters.append(Prompt.user_id.in_(user_id))
@@ -184,19 +185,26 @@ class PromptService:
                     Prompt.user_id == Account.get_administrator_id(),
                 )
             )
-        query = Prompt.query.filter(*filters).order_by(Prompt.created_at.desc())
+        query = Prompt.query.filter(*filters)
         if page is None or per_page is None:
             # 如果没有分页参数，返回所有数据
-            prompts = query.all()
+            prompts = query.order_by(Prompt.created_at.desc()).all()
             pagination_info = {
                 "total": len(prompts),
                 "pages": 1,
                 "current_page": 1,
                 "next_page": None,
                 "prev_page": None,
+                "next_cursor": None,
             }
         else:
-            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+            pagination = keyset_paginate(
+                query,
+                [Prompt.created_at, Prompt.id],
+                page=page,
+                per_page=per_page,
+                cursor=cursor,
+            )
             prompts = pagination.items
             pagination_info = {
                 "total": pagination.total,
@@ -204,6 +212,7 @@ class PromptService:
                 "current_page": pagination.page,
                 "next_page": pagination.next_num,
                 "prev_page": pagination.prev_num,
+                "next_cursor": pagination.next_cursor,
             }
         result = []
         for prompt in prompts:
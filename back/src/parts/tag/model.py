@@ -15,6 +15,7 @@
 
 import uuid
 
+from sqlalchemy import cast
 from sqlalchemy.sql import func
 
 from models import StringUUID
@@ -73,6 +74,20 @@ class Tag(db.Model):
         )
         return [k.name for k in queryset]
 
+    @classmethod
+    def get_names_by_target_ids(cls, tag_type, target_ids):
+        """批量获取多个目标的标签名，返回 target_id 到标签名列表的映射。"""
+        result = {str(target_id): [] for target_id in target_ids}
+        if not result:
+            return result
+        queryset = db.session.query(TagBinding.target_id, TagBinding.name).filter(
+            TagBinding.type == tag_type,
+            TagBinding.target_id.in_(list(result)),
+        )
+        for target_id, name in queryset:
+            result[target_id].append(name)
+        return result
+
     @classmethod
     def get_target_ids_by_name(cls, tag_type, name):
         queryset = (
@@ -97,6 +112,33 @@ class Tag(db.Model):
         )
         return [k.target_id for k in queryset]
 
+    @classmethod
+    def target_filter(cls, tag_type, names, id_column):
+        """构造按标签名过滤资源的 EXISTS 条件，直接用于资源列表查询。
+
+        Args:
+            tag_type (str): 标签类型。
+            names (str | list): 标签名或标签名列表，命中任一即可。
+            id_column: 资源表的主键列。
+
+        Returns:
+            条件表达式，可传给 filter。
+        """
+        if isinstance(names, str):
+            names = [names]
+        if isinstance(id_column.type, db.Integer):
+            # 整数主键转成字符串比较，保证 target_id 上的索引可用
+            id_column = cast(id_column, db.String(40))
+        return (
+            db.session.query(TagBinding.id)
+            .filter(
+                TagBinding.type == tag_type,
+                TagBinding.name.in_(list(names)),
+                TagBinding.target_id == id_column,
+            )
+            .exists()
+        )
+
     @classmethod
     def delete_bindings(cls, tag_type, target_id):
         db.session.query(TagBinding).filter(
@@ -112,6 +154,7 @@ class TagBinding(db.Model):
     __table_args__ = (
         db.PrimaryKeyConstraint("id", name="tag_binding_pkey"),
         db.Index("tag_bind_target_id_idx", "target_id"),
+        db.Index("tag_bind_type_name_target_idx", "type", "name", "target_id"),
     )
 
     id = db.Column(StringUUID, default=lambda: str(uuid.uuid4()))
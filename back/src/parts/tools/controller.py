@@ -64,6 +64,7 @@ class ToolListApi(Resource):
         parser = reqparse.RequestParser()
         parser.add_argument("page", type=int, default=1, location="json")
         parser.add_argument("page_size", type=int, default=20, location="json")
+        parser.add_argument("cursor", type=str, location="json", required=False)
         parser.add_argument("tool_type", type=str, default="", location="json")
         parser.add_argument("published", type=list, location="json")
         parser.add_argument("enabled", type=list, location="json")
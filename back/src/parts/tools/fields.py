@@ -51,6 +51,7 @@ tool_pagination = {
     "page_size": fields.Integer(attribute="per_page"),
     "total": fields.Integer,
     "has_more": fields.Boolean(attribute="has_next"),
+    "next_cursor": fields.String,
     "data": fields.List(fields.Nested(tool_detail), attribute="items"),
 }
 
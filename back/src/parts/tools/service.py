@@ -31,6 +31,7 @@ from lazyllm.tools.tools import HttpTool
 
 from libs.helper import clone_model
 from libs.json_utils import ensure_list_from_json
+from libs.pagination import keyset_paginate
 from libs.timetools import TimeTools
 from models.model_account import Account
 from parts.app.model import App, WorkflowRefer
@@ -67,11 +68,9 @@ class ToolService:
         if data.get("enabled"):
             query = query.filter(Tool.enable == True)
         if data.get("search_tags"):
-            target_ids = Tag.get_target_ids_by_names(
-                Tag.Types.TOOL, data["search_tags"]
+            query = query.filter(
+                Tag.target_filter(Tag.Types.TOOL, data["search_tags"], Tool.id)
             )
-            target_ids = [int(k) for k in target_ids]
-            query = query.filter(Tool.id.in_(target_ids))
         if data.get("search_name"):
             search_name = data["search_name"]
             filters.append(
@@ -105,11 +104,12 @@ class ToolService:
                 )
             )
         query = query.filter(*filters)
-        query = query.order_by(Tool.created_at.desc())
-        paginate = query.paginate(
+        paginate = keyset_paginate(
+            query,
+            [Tool.created_at, Tool.id],
             page=data["page"],
             per_page=data["page_size"],
-            error_out=False,
+            cursor=data.get("cursor"),
         )
 
         tool_ids = [str(tool.id) for tool in paginate.items]
@@ -17,20 +17,46 @@ import json
 import logging
 import threading
 import time
+from collections import deque
 from datetime import datetime
 from typing import Any
 
 from flask_sock import Sock
 from simple_websocket import ConnectionClosed
 
-user_connections: dict[str, Any] = {}
+from configs import lazy_config
+from utils.util_redis import redis_client
+from utils.util_websocket import WebSocketHub
+
+tool_log_hub = WebSocketHub("ws:tool_logs")
 websocket_handler = None
 
+# 工具日志记录器的名称前缀，只有这类记录器会推送日志和保留历史
+TOOL_LOGGER_PREFIX = "logger_"
+# 每个记录器保留的日志条数
+LOG_HISTORY_SIZE = 500
+# 写入Redis的日志历史的过期时间（秒）
+LOG_HISTORY_EXPIRE_SECONDS = 24 * 3600
+# 记录器空闲超过该时间（秒）后从进程中移除
+LOGGER_IDLE_SECONDS = 30 * 60
+
+
+def _get_log_history_key(id: str):
+    return f"tool_log_history:{id}"
+
 
 class RealtimeMyLogger(logging.Logger):
     def __init__(self, name: str, level: int = logging.NOTSET):
         super().__init__(name, level)
-        self.log_history = []
+        self.log_history = deque(maxlen=LOG_HISTORY_SIZE)
+        self.last_active = time.monotonic()
+
+    @property
+    def tool_id(self):
+        """工具日志记录器对应的ID，其他记录器返回None。"""
+        if not self.name.startswith(TOOL_LOGGER_PREFIX):
+            return None
+        return self.name.split("_")[-1]
 
     def _log(
         self,
@@ -49,28 +75,57 @@ class RealtimeMyLogger(logging.Logger):
 
         super()._log(level, formatted_msg, (), exc_info, extra, stack_info, stacklevel)
 
+        id = self.tool_id
+        if id is None:
+            return
+
         log_entry = {
             "level": logging.getLevelName(level),
             "msg": formatted_msg,
             "timestamp": datetime.now().isoformat(),
         }
 
+        self.last_active = time.monotonic()
         self.log_history.append(log_entry)
-
-        id = self.name.split("_")[-1]
+        if lazy_config.TOOL_LOG_REDIS_SPILL:
+            _spill_log_entry(id, log_entry)
         send_log(id, log_entry)
 
     def get_log_history(self):
-        return self.log_history
+        """获取最近的日志。
+
+        开启 TOOL_LOG_REDIS_SPILL 时从Redis读取，其他工作进程产生的日志也能取到。
+
+        Returns:
+            list: 最近 LOG_HISTORY_SIZE 条日志。
+        """
+        id = self.tool_id
+        if id is not None and lazy_config.TOOL_LOG_REDIS_SPILL:
+            try:
+                entries = redis_client.lrange(_get_log_history_key(id), 0, -1)
+                return [json.loads(entry) for entry in entries]
+            except Exception as e:
+                logging.warning(f"Failed to read log history of tool {id}: {e}")
+        return list(self.log_history)
+
+
+def _spill_log_entry(id: str, log_entry: dict[str, Any]):
+    key = _get_log_history_key(id)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.rpush(key, json.dumps(log_entry))
+        pipe.ltrim(key, -LOG_HISTORY_SIZE, -1)
+        pipe.expire(key, LOG_HISTORY_EXPIRE_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        logging.warning(f"Failed to save log history of tool {id}: {e}")
 
 
 def send_log(user_id: str, log_entry: dict[str, Any]):
-    if user_id in user_connections:
-        websocket = user_connections[user_id]
-        try:
-            websocket.send(json.dumps(log_entry))
-        except Exception as e:
-            print(f"Error sending log to user {user_id}: {str(e)}")
+    try:
+        tool_log_hub.publish(user_id, log_entry)
+    except Exception as e:
+        logging.warning(f"Failed to send log to user {user_id}: {e}")
 
 
 def get_tool_logger(id: str) -> RealtimeMyLogger:
@@ -78,20 +133,43 @@ def get_tool_logger(id: str) -> RealtimeMyLogger:
     tool_logger = logging.getLogger(logger_name)
     if not isinstance(tool_logger, RealtimeMyLogger):
         raise TypeError("Expected RealtimeMyLogger instance")
+    tool_logger.last_active = time.monotonic()
     return tool_logger
 
 
 def clean_connections():
-    for id, ws in list(user_connections.items()):
-        if ws.closed:
-            del user_connections[id]
-            logger = get_tool_logger(id)
-            logger.info(f"Cleaned up closed connection for user {id}")
+    for id in tool_log_hub.clean_closed():
+        logging.info(f"Cleaned up closed connection for user {id}")
+
+
+def evict_idle_loggers(idle_seconds: int = LOGGER_IDLE_SECONDS):
+    """从 logging 的记录器表中移除长时间空闲的工具日志记录器。
+
+    Args:
+        idle_seconds (int): 空闲多久后移除。
+
+    Returns:
+        list: 被移除的记录器名称。
+    """
+    deadline = time.monotonic() - idle_seconds
+    evicted = []
+    with logging._lock:
+        logger_dict = logging.Logger.manager.loggerDict
+        for name, logger in list(logger_dict.items()):
+            if (
+                isinstance(logger, RealtimeMyLogger)
+                and logger.tool_id is not None
+                and logger.last_active < deadline
+            ):
+                del logger_dict[name]
+                evicted.append(name)
+    return evicted
 
 
 def connection_cleaner():
     while True:
         clean_connections()
+        evict_idle_loggers()
         time.sleep(300)  # 每5分钟清理一次
 
 
@@ -101,7 +179,7 @@ def setup_websocket(app):
 
     @sock.route("/ws/<id>")
     def handle_websocket(ws, id):
-        user_connections[id] = ws
+        conn_id = tool_log_hub.register(id, ws)
 
         try:
             while True:
@@ -121,8 +199,7 @@ def setup_websocket(app):
         except Exception as e:
             logging.error(f"Error in WebSocket connection for user {id}: {str(e)}")
         finally:
-            if id in user_connections:
-                del user_connections[id]
+            tool_log_hub.unregister(id, conn_id)
             logging.info(f"WebSocket connection for user {id} ended and cleaned up.")
 
     websocket_handler = sock
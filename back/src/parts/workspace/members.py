@@ -19,7 +19,7 @@ from flask import request
 from flask_login import current_user
 from flask_restful import marshal, reqparse
 
-from core.account_manager import QuotaService, TenantService
+from core.account_manager import PrincipalCache, QuotaService, TenantService
 from core.asset_manager import AssetManager
 from core.cooperation_service import CooperationService
 from core.restful import ForbiddenError, Resource
@@ -186,7 +186,7 @@ class AccountTenantListApi(Resource):
             tenant_id_list, account.id
         )  # 是否有资产
         for item in tenants:
-            item["has_assets"] = t_map_a.get(item["id"], 0) > 0  # 是否有资产
+            item["has_assets"] = t_map_a.get(item["id"], False)  # 是否有资产
         return {"tenants": tenants}
 
 
@@ -315,7 +315,7 @@ class DetailTenantApi(Resource):
             account_id_list, tenant.id
         )  # 是否有资产
         for item in accounts:
-            item["has_assets"] = a_map_t.get(item["id"], 0) > 0  # 是否有资产
+            item["has_assets"] = a_map_t.get(item["id"], False)  # 是否有资产
 
         result["accounts"] = accounts
         return result
@@ -504,6 +504,12 @@ class DeleteTenantApi(Resource):
         AssetManager(current_user).move_tenant_assets(tenant)
 
         # 删除数据
+        member_ids = [
+            row[0]
+            for row in db.session.query(TenantAccountJoin.account_id)
+            .filter_by(tenant_id=tenant.id)
+            .all()
+        ]
         try:
             db.session.query(TenantAccountJoin).filter_by(tenant_id=tenant.id).delete()
             db.session.query(AITools).filter_by(tenant_id=tenant.id).delete()
@@ -513,6 +519,7 @@ class DeleteTenantApi(Resource):
         except Exception as e:
             db.session.rollback()
             raise ValueError(f"删除租户失败: {str(e)}")
+        PrincipalCache.invalidate(*member_ids)
 
         LogService().add(
             Module.USER_MANAGEMENT, Action.DELETE_GROUP, tenant=tenant.name
@@ -542,6 +549,7 @@ class ExitTenantApi(Resource):
             tenant_id=tenant.id, account_id=current_user.id
         ).delete()
         db.session.commit()
+        PrincipalCache.invalidate(current_user.id)
         return {"result": "success"}
 
 
@@ -581,6 +589,7 @@ class DeleteRoleApi(Resource):
             tenant_id=tenant.id, account_id=account_id
         ).delete()
         db.session.commit()
+        PrincipalCache.invalidate(account_id)
 
         LogService().add(
             Module.USER_MANAGEMENT,
@@ -638,6 +647,7 @@ class DeleteAccountApi(Resource):
 
         db.session.query(TenantAccountJoin).filter_by(account_id=account_id).delete()
         db.session.commit()
+        PrincipalCache.invalidate(account_id)
 
         LogService().add(
             Module.USER_MANAGEMENT, Action.DELETE_USER, name=account.name
@@ -0,0 +1,45 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from datetime import datetime
+
+from celery import shared_task
+
+from models.model_account import Account
+from utils.util_database import db
+
+
+@shared_task
+def update_account_last_active_task(account_id: str, active_at: str):
+    """更新账户最后活动时间任务。
+
+    由请求认证路径按活动时间间隔合并触发，只在新时间更晚时写库，
+    避免乱序执行覆盖较新的活动时间。
+
+    Args:
+        account_id (str): 账户ID。
+        active_at (str): ISO 格式的活动时间。
+    """
+    active_time = datetime.fromisoformat(active_at)
+    try:
+        Account.query.filter(
+            Account.id == account_id,
+            Account.last_active_at < active_time,
+        ).update({"last_active_at": active_time}, synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logging.exception(f"更新账户 {account_id} 最后活动时间失败: {e}")
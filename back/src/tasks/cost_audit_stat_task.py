@@ -13,11 +13,33 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
 from datetime import date, timedelta
 
 from celery import shared_task
 
 from parts.cost_audit.service import CostService
+from utils.util_database import db
+from utils.util_redis import redis_client
+
+# 每个子任务处理的应用数量
+APPS_PER_SHARD = 20
+# 子任务失败后的重试间隔（秒）和最大重试次数
+SHARD_RETRY_COUNTDOWN = 300
+SHARD_MAX_RETRIES = 3
+# 已完成应用记录的保留时间，覆盖任务的过期时间和全部重试
+CHECKPOINT_EXPIRE_SECONDS = 2 * 24 * 3600
+
+
+def _get_checkpoint_key(stat_date: str):
+    return f"cost_audit_stat:{stat_date}:done"
+
+
+def _get_done_app_ids(stat_date: str):
+    return {
+        app_id.decode() if isinstance(app_id, bytes) else app_id
+        for app_id in redis_client.smembers(_get_checkpoint_key(stat_date))
+    }
 
 
 @shared_task
@@ -25,14 +47,75 @@ def daily_cost_audit_stat():
     """每日成本审计统计任务。
 
     这是一个 Celery 定时任务，用于执行每日的成本审计统计。
-    计算前一天的应用使用成本统计，并缓存各时间段的统计数据。
+    将前一天需要统计的应用按批拆分为子任务并行执行，
+    已完成的应用记录在 Redis 中，任务重复执行时只处理未完成的应用。
 
     任务执行流程：
-    1. 计算昨天的应用统计数据
-    2. 缓存各时间段的统计数据用于快速查询
+    1. 查询需要统计的应用和当天活跃的应用
+    2. 跳过已完成的应用，其余按批分发给 cost_audit_stat_shard
     """
-    print("Starting daily cost audit statistics task")
-    yesterday = date.today() - timedelta(days=1)
-    CostService.daily_app_statistics(yesterday)
-    CostService.cache_app_statistics_for_periods(yesterday)
-    print(f"Completed daily cost audit statistics for {yesterday}")
+    stat_date = date.today() - timedelta(days=1)
+    stat_date_str = stat_date.isoformat()
+    done_app_ids = _get_done_app_ids(stat_date_str)
+    active_app_ids = CostService.get_active_app_ids(stat_date)
+    pending_app_ids = [
+        app_id
+        for app_id in CostService.get_stat_app_ids()
+        if app_id not in done_app_ids
+    ]
+
+    for i in range(0, len(pending_app_ids), APPS_PER_SHARD):
+        shard = pending_app_ids[i : i + APPS_PER_SHARD]
+        cost_audit_stat_shard.delay(
+            stat_date_str,
+            shard,
+            [app_id for app_id in shard if app_id in active_app_ids],
+        )
+    logging.info(
+        f"Dispatched cost audit statistics for {stat_date_str}: "
+        f"{len(pending_app_ids)} apps pending, {len(done_app_ids)} already done"
+    )
+
+
+@shared_task(bind=True, max_retries=SHARD_MAX_RETRIES)
+def cost_audit_stat_shard(self, stat_date: str, app_ids: list, active_app_ids: list):
+    """统计一批应用的每日数据并缓存各时间段的统计。
+
+    每个应用完成后写入检查点；部分应用失败时，只针对失败的应用重试。
+
+    Args:
+        stat_date (str): ISO 格式的统计日期。
+        app_ids (list): 本批次的应用ID。
+        active_app_ids (list): 本批次中当天有会话的应用ID。
+    """
+    day = date.fromisoformat(stat_date)
+    checkpoint_key = _get_checkpoint_key(stat_date)
+    done_app_ids = _get_done_app_ids(stat_date)
+    active_app_ids = set(active_app_ids)
+
+    failed_app_ids = []
+    for app_id in app_ids:
+        if app_id in done_app_ids:
+            continue
+        try:
+            CostService.save_daily_app_statistics(
+                app_id, day, active=app_id in active_app_ids
+            )
+            CostService.cache_app_period_statistics(app_id, day)
+        except Exception as e:
+            db.session.rollback()
+            logging.exception(f"应用 {app_id} 的 {stat_date} 统计失败: {e}")
+            failed_app_ids.append(app_id)
+            continue
+        redis_client.sadd(checkpoint_key, app_id)
+        redis_client.expire(checkpoint_key, CHECKPOINT_EXPIRE_SECONDS)
+
+    if failed_app_ids:
+        raise self.retry(
+            args=(
+                stat_date,
+                failed_app_ids,
+                [app_id for app_id in failed_app_ids if app_id in active_app_ids],
+            ),
+            countdown=SHARD_RETRY_COUNTDOWN,
+        )
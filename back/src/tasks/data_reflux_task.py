@@ -0,0 +1,55 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from celery import shared_task
+
+from parts.data.data_reflux_service import (
+    REFLUX_BATCH_SIZE,
+    REFLUX_FLUSH_LOCK_KEY,
+    REFLUX_FLUSH_LOCK_TIMEOUT,
+    flush_reflux_queue,
+)
+from utils.util_redis import redis_client
+
+# 单次任务最多处理的批数，避免队列积压时任务长时间占用 worker
+MAX_BATCHES_PER_RUN = 50
+
+
+@shared_task
+def flush_reflux_data():
+    """回流数据批量写库任务。
+
+    这是一个 Celery 定时任务，持有分布式锁后循环从回流队列取出事件批量写库，
+    直到队列取空或达到单次处理上限。未获取到锁时说明已有任务在处理，直接返回。
+    """
+    lock = redis_client.lock(
+        name=REFLUX_FLUSH_LOCK_KEY, timeout=REFLUX_FLUSH_LOCK_TIMEOUT
+    )
+    if not lock.acquire(blocking=False):
+        return
+    try:
+        for _ in range(MAX_BATCHES_PER_RUN):
+            if flush_reflux_queue(REFLUX_BATCH_SIZE) < REFLUX_BATCH_SIZE:
+                break
+            lock.extend(REFLUX_FLUSH_LOCK_TIMEOUT, replace_ttl=True)
+    except Exception as e:
+        logging.exception(f"回流数据批量写库失败: {e}")
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            pass
@@ -0,0 +1,209 @@
+"""工作流热点路径的性能基准。
+
+依赖 pytest-benchmark（dev 依赖组），未安装时全部跳过。数据规模由环境变量
+BENCH_SCALE 控制（默认 1），数据库使用 sqlite 内存库，Redis 使用进程内的替身。
+
+示例:
+    BENCH_SCALE=4 pytest tests/benchmarks --benchmark-json=bench.json
+    pytest tests/benchmarks --benchmark-autosave --benchmark-compare
+"""
+
+import fnmatch
+import json
+import os
+import uuid
+
+import pytest
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.ext.compiler import compiles
+
+from utils.util_database import db
+
+BENCH_SCALE = max(int(os.getenv("BENCH_SCALE", "1")), 1)
+
+
+@compiles(MEDIUMTEXT, "sqlite")
+def _mediumtext_sqlite(element, compiler, **kw):
+    """测试使用的 sqlite 不支持 MEDIUMTEXT"""
+    return "TEXT"
+
+
+def _to_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return command
+
+    def execute(self):
+        return [
+            getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+class FakeRedis:
+    """进程内的 Redis 替身，只实现基准用到的字符串和列表命令"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = _to_bytes(value)
+        return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = _to_bytes(value)
+        return value
+
+    def keys(self, pattern="*"):
+        return [key for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+    def rpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        items.extend(_to_bytes(v) for v in values)
+        return len(items)
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+    def lrange(self, key, start, end):
+        items = self.data.get(key, [])
+        end = len(items) if end == -1 else end + 1
+        return items[start:end]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def scale():
+    return BENCH_SCALE
+
+
+@pytest.fixture
+def tables(app):
+    """按需创建表，用法: tables(Model, ...)"""
+    created = []
+
+    def create(*models):
+        model_tables = [m.__table__ for m in models]
+        db.metadata.create_all(db.engine, tables=model_tables)
+        created.extend(model_tables)
+
+    yield create
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=created)
+
+
+def make_node(node_id, kind, **data):
+    """前端画布中的一个节点"""
+    return {
+        "id": node_id,
+        "type": "custom",
+        "data": {
+            "payload__kind": kind,
+            "title": node_id,
+            "config__input_ports": [{"id": "target"}],
+            "config__output_ports": [{"id": "source"}],
+            **data,
+        },
+    }
+
+
+def make_chain_graph(node_count, prefix="code"):
+    """生成 __start__ -> 代码节点链 -> __end__ 的画布
+
+    Args:
+        node_count (int): 代码节点数量。
+        prefix (str, optional): 节点ID前缀。
+
+    Returns:
+        dict: 前端画布数据。
+    """
+    nodes = [make_node("__start__", "__start__"), make_node("__end__", "__end__")]
+    ids = ["__start__"]
+    for i in range(node_count):
+        node_id = f"{prefix}-{i}"
+        nodes.append(
+            make_node(
+                node_id,
+                "Code",
+                payload__code="def main(x):\n    return x + 1",
+                payload__code_language="python3",
+            )
+        )
+        ids.append(node_id)
+    ids.append("__end__")
+    edges = [
+        {
+            "id": f"{prefix}-edge-{i}",
+            "source": source,
+            "target": target,
+            "sourceHandle": "source",
+            "targetHandle": "target",
+        }
+        for i, (source, target) in enumerate(zip(ids, ids[1:]))
+    ]
+    return {"nodes": nodes, "edges": edges, "resources": []}
+
+
+def make_detail(node_id, turn_number=1):
+    """引擎回调产生的一条逐步调试记录"""
+    return {
+        "node_id": node_id,
+        "node_type": "Code",
+        "title": node_id,
+        "inputs": json.dumps({"x": 1}),
+        "outputs": json.dumps({"x": 2}),
+        "status": "succeeded",
+        "elapsed_time": 0.01,
+        "prompt_tokens": 10,
+        "completion_tokens": 5,
+        "sessionid": str(uuid.uuid4()),
+        "turn_number": turn_number,
+    }
+
+
+@pytest.fixture
+def chain_graph():
+    return make_chain_graph
+
+
+@pytest.fixture
+def detail():
+    return make_detail
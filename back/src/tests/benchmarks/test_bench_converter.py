@@ -0,0 +1,15 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from parts.app.node_run.lazy_converter import LazyConverter
+
+
+@pytest.mark.parametrize("node_count", [20, 200])
+def test_convert_workflow_to_lazy(benchmark, chain_graph, scale, node_count):
+    graph = chain_graph(node_count * scale)
+
+    result = benchmark(LazyConverter.convert_workflow_to_lazy, graph, "app-1")
+
+    assert len(result["nodes"]) == node_count * scale
+    assert len(result["edges"]) == node_count * scale + 1
@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from parts.data.data_service import DataService
+from parts.data.model import DataSetFile, DataSetRefluxData
+from utils.util_database import db
+
+VERSION_ID = 1
+
+
+@pytest.fixture
+def row_count(scale):
+    return 2000 * scale
+
+
+@pytest.fixture
+def dataset(tables, row_count):
+    tables(DataSetFile, DataSetRefluxData)
+    db.session.bulk_insert_mappings(
+        DataSetFile,
+        [
+            {
+                "name": f"file-{i}.json",
+                "path": f"/data/file-{i}.json",
+                "data_set_id": 1,
+                "data_set_version_id": VERSION_ID,
+                "user_id": "u",
+                "status": "file_done",
+                "file_type": "json",
+            }
+            for i in range(row_count)
+        ],
+    )
+    db.session.bulk_insert_mappings(
+        DataSetRefluxData,
+        [
+            {
+                "data_set_id": 1,
+                "data_set_version_id": VERSION_ID,
+                "app_id": "app1",
+                "module_input": f"input-{i}",
+                "module_output": f"output-{i}",
+                "turn_number": 1,
+                "is_satisfied": True,
+                "status": "file_done",
+            }
+            for i in range(row_count)
+        ],
+    )
+    db.session.commit()
+
+
+@pytest.mark.parametrize("page", [1, 50])
+def test_get_data_set_file_page(benchmark, dataset, row_count, page):
+    query = {"data_set_version_id": VERSION_ID, "page": page, "page_size": 20}
+
+    result = benchmark(DataService.get_data_set_file_by_id, query)
+
+    assert result.total == row_count
+    assert len(result.items) == 20
+
+
+def test_iter_reflux_data_rows(benchmark, dataset, row_count):
+    columns = [DataSetRefluxData.module_input, DataSetRefluxData.module_output]
+
+    def scan():
+        return sum(1 for _ in DataService.iter_reflux_data_rows(VERSION_ID, columns))
+
+    assert benchmark(scan) == row_count
@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+pytest.importorskip("pytest_benchmark")
+app_api = pytest.importorskip("parts.app.app_api", exc_type=ImportError)
+engine_manager = pytest.importorskip(
+    "parts.app.node_run.engine_manager", exc_type=ImportError
+)
+
+from parts.app.node_run.lazy_converter import LazyConverter
+
+APP_ID = "11111111-1111-1111-1111-111111111111"
+
+
+@pytest.fixture
+def report_app(fake_redis, chain_graph, scale):
+    graph = chain_graph(50 * scale)
+    with patch.object(engine_manager, "redis_client", fake_redis), patch.object(
+        app_api, "CostService"
+    ):
+        engine_manager.RedisStateManager(APP_ID, "draft").save_graph_data(
+            LazyConverter.convert_workflow_to_lazy(graph, APP_ID), graph
+        )
+        yield Flask(__name__)
+
+
+def test_report_ingestion(benchmark, report_app, fake_redis, scale):
+    """引擎逐节点回调的处理耗时，调试记录写满一轮后清空"""
+    node_count = 50 * scale
+    state_manager = engine_manager.RedisStateManager(APP_ID, "draft")
+    counter = iter(range(10**9))
+
+    def report():
+        index = next(counter) % node_count
+        if index == 0:
+            state_manager.set_detail(None, 1)
+        payload = {
+            "id": f"code-{index}",
+            "sessionid": f"{APP_ID}:draft:user:x:track:1",
+            "timecost": 0.01,
+            "prompt_tokens": 10,
+            "completion_tokens": 5,
+            "input": "1",
+            "output": "2",
+        }
+        with report_app.test_request_context(json=payload):
+            app_api.AppReportApi().post()
+
+    benchmark(report)
+
+    assert state_manager.get_detail_length(1) > 0
@@ -0,0 +1,56 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+engine_manager = pytest.importorskip(
+    "parts.app.node_run.engine_manager", exc_type=ImportError
+)
+
+from parts.app.node_run.lazy_converter import LazyConverter
+
+APP_ID = "11111111-1111-1111-1111-111111111111"
+
+
+@pytest.fixture
+def state_manager(fake_redis, chain_graph, scale):
+    graph = chain_graph(50 * scale)
+    with patch.object(engine_manager, "redis_client", fake_redis):
+        manager = engine_manager.RedisStateManager(APP_ID, "draft")
+        manager.save_graph_data(
+            LazyConverter.convert_workflow_to_lazy(graph, APP_ID), graph
+        )
+        yield manager
+
+
+@pytest.fixture
+def node_ids(scale):
+    return [f"code-{i}" for i in reversed(range(50 * scale))]
+
+
+def test_set_detail(benchmark, state_manager, fake_redis, detail, node_ids):
+    """已有 N-1 条记录时写入第 N 条，每轮重新准备数据保证规模一致"""
+    detail_key = state_manager._get_detail_key_with_turn(1)
+    existing = [detail(node_id) for node_id in node_ids[:-1]]
+
+    def setup():
+        fake_redis.delete(detail_key)
+        for item in existing:
+            fake_redis.rpush(detail_key, json.dumps(item))
+        return (detail(node_ids[-1]), 1), {}
+
+    benchmark.pedantic(state_manager.set_detail, setup=setup, rounds=50)
+
+    assert fake_redis.llen(detail_key) == len(node_ids)
+
+
+def test_get_detail(benchmark, state_manager, detail, node_ids):
+    for node_id in node_ids:
+        state_manager.set_detail(detail(node_id), 1)
+
+    result = benchmark(state_manager.get_detail, 1)
+
+    assert [item["node_id"] for item in result] == sorted(
+        node_ids, key=lambda n: int(n.split("-")[1])
+    )
@@ -0,0 +1,60 @@
+import json
+import uuid
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from parts.app.model import Workflow, WorkflowRefer
+from utils.util_database import db
+
+TENANT_ID = "11111111-1111-1111-1111-111111111111"
+ACCOUNT_ID = "22222222-2222-2222-2222-222222222222"
+
+
+def _add_workflow(app_id, graph):
+    db.session.add(
+        Workflow(
+            tenant_id=TENANT_ID,
+            app_id=app_id,
+            type="workflow",
+            version="draft",
+            graph=json.dumps(graph),
+            created_by=ACCOUNT_ID,
+        )
+    )
+
+
+@pytest.fixture
+def main_app_id(tables, chain_graph, scale):
+    """主画布引用 5*scale 个子画布，每个子画布各有 20 个节点"""
+    tables(Workflow, WorkflowRefer)
+    main_graph = chain_graph(5, prefix="main")
+    for i in range(5 * scale):
+        sub_id = str(uuid.uuid4())
+        _add_workflow(sub_id, chain_graph(20, prefix=f"sub{i}"))
+        main_graph["nodes"].append(
+            {
+                "id": f"subgraph-{i}",
+                "data": {"payload__kind": "SubGraph", "payload__patent_id": sub_id},
+            }
+        )
+    app_id = str(uuid.uuid4())
+    _add_workflow(app_id, main_graph)
+    db.session.commit()
+    return app_id
+
+
+def test_nested_graph_dict(benchmark, main_app_id, scale):
+    def resolve():
+        # 每轮重新读取，避免命中实例上的缓存
+        db.session.expire_all()
+        return Workflow.default_getone(main_app_id, "draft").nested_graph_dict
+
+    result = benchmark(resolve)
+
+    subgraphs = [
+        n for n in result["nodes"] if n["data"]["payload__kind"] == "SubGraph"
+    ]
+    assert len(subgraphs) == 5 * scale
+    assert all(n["data"]["config__patent_graph"]["nodes"] for n in subgraphs)
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pytest
+from flask_restful import marshal
+from sqlalchemy import event
+
+from models.model_account import Account, Tenant
+from parts.app import fields
+from parts.app.model import App
+from parts.data.model import DataSet
+from parts.tag.model import Tag, TagBinding
+from utils.util_database import db
+
+TENANT_ID = "11111111-1111-1111-1111-111111111111"
+ACCOUNT_IDS = [
+    "22222222-2222-2222-2222-222222222222",
+    "33333333-3333-3333-3333-333333333333",
+]
+
+
+@pytest.fixture
+def apps(app):
+    tables = [
+        App.__table__,
+        Account.__table__,
+        Tenant.__table__,
+        TagBinding.__table__,
+    ]
+    db.metadata.create_all(db.engine, tables=tables)
+    now = datetime.now()
+    db.session.add(Tenant(id=TENANT_ID, name="组", created_at=now, updated_at=now))
+    for i, account_id in enumerate(ACCOUNT_IDS):
+        db.session.add(
+            Account(
+                id=account_id,
+                name=f"user{i}",
+                email=f"user{i}@example.com",
+                created_at=now,
+                updated_at=now,
+            )
+        )
+    items = []
+    for i in range(6):
+        item = App(
+            tenant_id=TENANT_ID,
+            name=f"app{i}",
+            description="",
+            created_by=ACCOUNT_IDS[i % 2],
+            created_at=now,
+            updated_at=now,
+        )
+        db.session.add(item)
+        db.session.flush()
+        db.session.add(
+            TagBinding(
+                tenant_id=TENANT_ID,
+                type="app",
+                name=f"tag{i}",
+                target_id=item.id,
+            )
+        )
+        items.append(item)
+    db.session.commit()
+    yield [item.id for item in items]
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=tables)
+
+
+def test_marshal_prefetched_page_without_per_item_queries(apps):
+    db.session.expunge_all()
+    items = App.query.order_by(App.name).all()
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        App.prefetch_list_fields(items)
+        assert len(statements) == 3
+        data = marshal(items, fields.app_detail_fields)
+        tenants = [item.tenant.name for item in items]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    assert len(statements) == 3
+    assert [d["tags"] for d in data] == [[f"tag{i}"] for i in range(6)]
+    assert [d["created_by_account"]["name"] for d in data] == ["user0", "user1"] * 3
+    assert tenants == ["组"] * 6
+
+
+def test_tag_filter_uses_exists_subquery(apps):
+    query = App.query.filter(Tag.target_filter(Tag.Types.APP, ["tag1", "tag4"], App.id))
+    assert "EXISTS" in str(query.statement)
+    assert sorted(item.name for item in query) == ["app1", "app4"]
+    assert App.query.filter(Tag.target_filter(Tag.Types.APP, "tag2", App.id)).count() == 1
+
+
+def test_tag_filter_matches_integer_ids(app):
+    db.metadata.create_all(db.engine, tables=[DataSet.__table__, TagBinding.__table__])
+    try:
+        for name in ("a", "b"):
+            db.session.add(
+                DataSet(
+                    name=name,
+                    data_type="doc",
+                    upload_type="local",
+                    from_type="upload",
+                    user_id="u",
+                    user_name="u",
+                )
+            )
+        db.session.flush()
+        target = DataSet.query.filter_by(name="b").one()
+        db.session.add(
+            TagBinding(
+                tenant_id=TENANT_ID, type="dataset", name="t", target_id=str(target.id)
+            )
+        )
+        db.session.commit()
+        query = DataSet.query.filter(
+            Tag.target_filter(Tag.Types.DATASET, ["t"], DataSet.id)
+        )
+        assert [item.name for item in query] == ["b"]
+    finally:
+        db.session.remove()
+        db.metadata.drop_all(
+            db.engine, tables=[DataSet.__table__, TagBinding.__table__]
+        )
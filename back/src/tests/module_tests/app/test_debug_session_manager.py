@@ -0,0 +1,43 @@
+from unittest.mock import MagicMock, patch
+
+from parts.app.node_run.debug_session_manager import SESSION_EXPIRE_SECONDS, DebugSessionManager
+
+
+@patch("parts.app.node_run.debug_session_manager.redis_client")
+def test_next_turn_number_in_one_pipeline(mock_redis):
+    pipe = MagicMock()
+    pipe.execute.return_value = [3, True, True]
+    mock_redis.pipeline.return_value = pipe
+    manager = DebugSessionManager("app", "user")
+
+    assert manager.get_next_turn_number() == 3
+
+    mock_redis.pipeline.assert_called_once_with(transaction=True)
+    pipe.incr.assert_called_once_with("debug_turn:draft:app:user")
+    pipe.expire.assert_called_once_with(
+        "debug_turn:draft:app:user", SESSION_EXPIRE_SECONDS
+    )
+    assert pipe.setex.call_args[0][:2] == (
+        "debug_session:draft:app:user",
+        SESSION_EXPIRE_SECONDS,
+    )
+    pipe.execute.assert_called_once()
+    mock_redis.get.assert_not_called()
+    mock_redis.setex.assert_not_called()
+
+
+@patch("parts.app.node_run.debug_session_manager.redis_client")
+def test_next_turn_number_falls_back_when_redis_fails(mock_redis):
+    mock_redis.pipeline.return_value.execute.side_effect = ConnectionError()
+    manager = DebugSessionManager("app", "user")
+
+    assert 1 <= manager.get_next_turn_number() <= 10000
+
+
+@patch("parts.app.node_run.debug_session_manager.redis_client")
+def test_reset_session_deletes_both_keys(mock_redis):
+    DebugSessionManager("app", "user").reset_session()
+
+    mock_redis.delete.assert_called_once_with(
+        "debug_turn:draft:app:user", "debug_session:draft:app:user"
+    )
@@ -0,0 +1,128 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from parts.app.doc_progress import DocParseProgress, DocParseState, count_statuses
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.messages = []
+
+    def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self)
+
+    def get_message(self, timeout=None):
+        return self.messages.pop(0) if self.messages else None
+
+    def close(self):
+        pass
+
+
+class FakeRedis:
+    """只实现解析进度用到的命令"""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.published = []
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(
+            {k.encode(): str(v).encode() for k, v in mapping.items()}
+        )
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def expire(self, key, seconds):
+        pass
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def publish(self, channel, message):
+        self.published.append(json.loads(message))
+        for pubsub in self.subscribers.get(channel, []):
+            pubsub.messages.append({"type": "message", "data": message})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+
+@pytest.fixture
+def fake_redis():
+    fake = FakeRedis()
+    with patch("parts.app.doc_progress.redis_client", fake):
+        yield fake
+
+
+def test_count_statuses():
+    counts = count_statuses(["waiting", "working", "success", "failed", "success"])
+    assert counts == {"queued": 1, "working": 1, "done": 2, "failed": 1, "total": 5}
+
+
+def test_monitor_publishes_only_changes(fake_redis):
+    rounds = iter(
+        [
+            [],  # 文件还未登记
+            ["waiting", "waiting", "waiting"],
+            ["waiting", "waiting", "waiting"],
+            ["success", "working", "waiting"],
+            ["success", "failed", "success"],
+        ]
+    )
+    progress = DocParseProgress("app", "doc", ["/data/set"])
+    with patch("parts.app.doc_progress.time.sleep"):
+        progress.run_monitor(lambda: next(rounds), expect_files=True)
+
+    states = [
+        (m["done"], m["failed"], m["total"], m["state"]) for m in fake_redis.published
+    ]
+    assert states == [
+        (0, 0, 0, DocParseState.RUNNING),
+        (0, 0, 3, DocParseState.RUNNING),
+        (1, 0, 3, DocParseState.RUNNING),
+        (2, 1, 3, DocParseState.SUCCESS),
+    ]
+    # 结束后释放监控锁
+    assert progress.lock_key not in fake_redis.data
+
+
+def test_empty_dataset_finishes_immediately(fake_redis):
+    progress = DocParseProgress("app", "doc", "/data/empty")
+    progress.run_monitor(lambda: [], expect_files=False)
+    assert progress.snapshot()["state"] == DocParseState.SUCCESS
+
+
+def test_subscriber_receives_snapshot_then_updates(fake_redis):
+    progress = DocParseProgress("app", "doc", "/data/set")
+    progress.update(count_statuses(["waiting", "success"]))
+
+    stream = progress.subscribe(interval=0)
+    first = next(stream)
+    assert (first["done"], first["total"]) == (1, 2)
+    assert next(stream) is None
+
+    progress.fail("boom")
+    update = next(stream)
+    assert update["state"] == DocParseState.FAILED
+    assert update["error"] == "boom"
+    stream.close()
+
+
+def test_only_one_monitor_per_document(fake_redis):
+    progress = DocParseProgress("app", "doc", "/data/set")
+    with patch("parts.app.doc_progress.threading.Thread") as thread:
+        assert progress.ensure_monitor(lambda: []) is True
+        assert progress.ensure_monitor(lambda: []) is False
+    thread.return_value.start.assert_called_once()
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+engine_manager = pytest.importorskip(
+    "parts.app.node_run.engine_manager", exc_type=ImportError
+)
+GraphDataCache = engine_manager.GraphDataCache
+
+APP_ID = "11111111-1111-1111-1111-111111111111"
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value):
+        self.commands.append((key, value))
+
+    def execute(self):
+        for key, value in self.commands:
+            self.redis.set(key, value)
+
+
+class FakeRedis:
+    """只实现画布缓存用到的命令，并记录读取的键"""
+
+    def __init__(self):
+        self.data = {}
+        self.reads = []
+
+    def get(self, key):
+        self.reads.append(key)
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(values)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch.object(engine_manager, "redis_client", redis), patch.object(
+        engine_manager, "graph_data_cache", GraphDataCache()
+    ):
+        yield redis
+
+
+def _graph(name="code"):
+    return {
+        "nodes": [{"id": name, "kind": "Code", "extras-title": name}],
+        "edges": [
+            {"iid": "__start__", "oid": name},
+            {"iid": name, "oid": "__end__"},
+        ],
+    }
+
+
+def test_encode_uses_sha1_of_compressed_payload():
+    graph = _graph()
+
+    payload, version = GraphDataCache.encode(graph)
+
+    assert json.loads(zlib.decompress(payload)) == graph
+    assert version == hashlib.sha1(payload).hexdigest()
+    assert GraphDataCache.encode(_graph())[1] == version
+    assert GraphDataCache.encode(_graph("other"))[1] != version
+
+
+def test_decode_accepts_legacy_json():
+    graph = _graph()
+
+    assert GraphDataCache.decode(json.dumps(graph).encode()) == graph
+    assert GraphDataCache.decode(GraphDataCache.encode(graph)[0]) == graph
+
+
+def test_lru_evicts_least_recently_used():
+    cache = GraphDataCache()
+    for i in range(GraphDataCache.MAX_SIZE):
+        cache.put(f"v{i}", {"i": i})
+    # 访问后变为最近使用，不会被淘汰
+    assert cache.get("v0") == {"graph": {"i": 0}}
+
+    cache.put("new", {"i": "new"})
+
+    assert cache.get("v1") is None
+    assert cache.get("v0") is not None
+    assert cache.get("new") is not None
+    assert len(cache._items) == GraphDataCache.MAX_SIZE
+
+
+def test_put_existing_version_keeps_entry():
+    cache = GraphDataCache()
+    entry = cache.put("v", {"a": 1})
+    entry["nodes_map"] = {}
+
+    assert cache.put("v", {"a": 2}) is entry
+    assert entry["graph"] == {"a": 1}
+
+
+def test_version_hit_skips_graph_download(fake_redis):
+    manager = engine_manager.RedisStateManager(APP_ID, "draft")
+    manager.save_graph_data(_graph())
+    fake_redis.reads.clear()
+
+    assert manager.get_graph_data() == _graph()
+    assert fake_redis.reads == [manager._graph_version_key]
+
+
+def test_unknown_version_loads_and_caches_graph(fake_redis):
+    payload, version = GraphDataCache.encode(_graph())
+    manager = engine_manager.RedisStateManager(APP_ID, "draft")
+    fake_redis.set(manager._graph_key, payload)
+    fake_redis.set(manager._graph_version_key, version)
+
+    assert manager.get_graph_data() == _graph()
+    fake_redis.reads.clear()
+    assert manager.get_graph_data() == _graph()
+    assert fake_redis.reads == [manager._graph_version_key]
+
+
+def test_nodes_map_built_once_per_version(fake_redis):
+    manager = engine_manager.RedisStateManager(APP_ID, "draft")
+    manager.save_graph_data(_graph())
+
+    with patch.object(
+        engine_manager.RedisStateManager,
+        "_get_graph_nodes_map",
+        wraps=engine_manager.RedisStateManager._get_graph_nodes_map,
+    ) as build:
+        first = manager.get_graph_nodes_map()
+        second = engine_manager.RedisStateManager(APP_ID, "draft").get_graph_nodes_map()
+
+    assert build.call_count == 1
+    assert second is first
+    # 构建节点表不改写缓存的画布
+    assert manager.get_graph_data() == _graph()
+
+    manager.save_graph_data(_graph("other"))
+    assert set(manager.get_graph_nodes_map()) == {"other"}
+
+
+def test_sorted_nodes_reused_across_managers(fake_redis):
+    manager = engine_manager.RedisStateManager(APP_ID, "draft")
+    manager.save_graph_data(_graph(), original_graph_data=_graph())
+
+    with patch.object(
+        engine_manager.RedisStateManager,
+        "topological_sort",
+        autospec=True,
+        side_effect=lambda self, edges: ["__start__", "code", "__end__"],
+    ) as sort, patch.object(
+        engine_manager.RedisStateManager, "get_detail", return_value=[]
+    ):
+        for _ in range(2):
+            engine_manager.RedisStateManager(APP_ID, "draft").set_detail(
+                {"node_id": "code"}
+            )
+
+    assert sort.call_count == 1
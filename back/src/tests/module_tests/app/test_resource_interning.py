@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+from parts.app.node_run.node_base import BaseRunContext, DocumentNode, resource_fingerprint
+
+EMBED = {
+    "payload__model_source": "online_model",
+    "payload__source": "openai",
+    "payload__base_model": "text-embedding-3-small",
+}
+
+
+class FakeResource:
+    created = 0
+
+    def __init__(self, nodedata, context):
+        FakeResource.created += 1
+        self.nodedata = nodedata
+
+
+def test_fingerprint_ignores_key_order_and_blank_values():
+    reordered = dict(reversed(list(EMBED.items())))
+    reordered["payload__base_url"] = None
+    reordered["payload__source"] = " openai "
+    assert resource_fingerprint("Embedding", EMBED) == resource_fingerprint(
+        "Embedding", reordered
+    )
+    assert resource_fingerprint("Embedding", EMBED) != resource_fingerprint(
+        "LLM", EMBED
+    )
+
+
+def test_intern_resource_reuses_identical_configs():
+    FakeResource.created = 0
+    context = BaseRunContext()
+
+    first = context.intern_resource(FakeResource, EMBED)
+    second = context.intern_resource(FakeResource, dict(EMBED))
+    other = context.intern_resource(
+        FakeResource, {**EMBED, "payload__base_model": "bge-m3"}
+    )
+
+    assert first == second != other
+    assert FakeResource.created == 2
+    assert context.id_map_basenode[first].nodedata == {"id": first, "data": EMBED}
+
+
+def test_document_node_groups_share_embedding_resource():
+    nodedata = {
+        "id": "doc",
+        "data": {
+            "payload__kind": "Document",
+            "payload__dataset_path": ["/data/kb"],
+            "payload__activated_groups": [
+                {"name": "CoarseChunk", "embed": EMBED},
+                {"name": "MediumChunk", "embed": dict(EMBED)},
+            ],
+            "payload__node_group": [
+                {"name": "summary", "key": "g1", "embed": dict(EMBED)},
+            ],
+        },
+    }
+    context = BaseRunContext()
+    with patch("parts.app.node_run.node_infer.EmbeddingResource", FakeResource):
+        node = DocumentNode(nodedata, context)
+
+    embed_ids = {group[1] for group in node.activated_groups}
+    embed_ids.add(node.node_group[0]["embed"])
+    assert len(embed_ids) == 1
+    assert node.used_resources["embed"] == [embed_ids.pop()] * 3
@@ -0,0 +1,265 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from parts.app.model import App
+from parts.app.resource_status import ResourceStatusCache, ResourceStatusService
+from parts.knowledge_base.model import KnowledgeBase
+from parts.mcp.model import McpServer
+from parts.tools.model import Tool
+from utils.util_database import db
+
+TENANT_ID = "11111111-1111-1111-1111-111111111111"
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+
+    def setex(self, key, seconds, value):
+        self.redis.data[key] = str(value).encode()
+
+    def execute(self):
+        pass
+
+
+class FakeRedis:
+    """只实现状态缓存用到的命令"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch("parts.app.resource_status.redis_client", redis):
+        yield redis
+
+
+@pytest.fixture
+def tables(app):
+    tables = [
+        App.__table__,
+        Tool.__table__,
+        McpServer.__table__,
+        KnowledgeBase.__table__,
+    ]
+    db.metadata.create_all(db.engine, tables=tables)
+    yield
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=tables)
+
+
+def _add_app(enable_api):
+    app = App(
+        id=str(uuid.uuid4()),
+        tenant_id=TENANT_ID,
+        name="app",
+        description="",
+        enable_api=enable_api,
+    )
+    db.session.add(app)
+    return app
+
+
+def _add_tool(enable):
+    tool = Tool(
+        name="tool",
+        user_id="1",
+        tool_type="custom",
+        tool_kind="",
+        tool_mode="API",
+        enable=enable,
+    )
+    db.session.add(tool)
+    return tool
+
+
+def _add_mcp(enable):
+    server = McpServer(name="mcp", user_id="1", transport_type="SSE", enable=enable)
+    db.session.add(server)
+    return server
+
+
+def _add_kb():
+    kb = KnowledgeBase(id=str(uuid.uuid4()), user_id="1", name="kb")
+    db.session.add(kb)
+    return kb
+
+
+def _resource(kind, **data):
+    return {"id": str(uuid.uuid4()), "data": {"payload__kind": kind, **data}}
+
+
+def _count_selects():
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_execute)
+    return statements, lambda: event.remove(
+        db.engine, "before_cursor_execute", before_execute
+    )
+
+
+def _nested_graph(ids):
+    sub_graph = {
+        "nodes": [_resource("App", payload__patent_id=ids["disabled_app"])],
+        "resources": [
+            _resource("HttpTool", provider_id=str(ids["disabled_tool"])),
+            _resource("Document", payload__knowledge_id=[ids["missing_kb"]]),
+        ],
+    }
+    return {
+        "nodes": [
+            _resource("App", payload__patent_id=ids["app"]),
+            _resource("SubGraph", config__patent_graph=sub_graph),
+        ],
+        "resources": [
+            _resource("HttpTool", provider_id=str(ids["tool"])),
+            _resource("McpTool", provider_id=str(ids["mcp"])),
+            _resource("McpTool", provider_id=str(ids["disabled_mcp"])),
+            _resource("Document", payload__knowledge_id=ids["kb"]),
+        ],
+    }
+
+
+def _statuses(graph):
+    return {
+        (item["data"]["payload__kind"], ref_id): item["data"]["ref_status"]
+        for ref_id, item in _walk(graph)
+    }
+
+
+def _walk(graph):
+    for item in graph.get("nodes", []) + graph.get("resources", []):
+        data = item["data"]
+        if "ref_status" in data:
+            ref_id = (
+                data.get("payload__patent_id")
+                or data.get("provider_id")
+                or data.get("payload__knowledge_id")
+            )
+            yield (ref_id[0] if isinstance(ref_id, list) else ref_id), item
+        if "config__patent_graph" in data:
+            yield from _walk(data["config__patent_graph"])
+
+
+@pytest.fixture
+def resources(tables):
+    items = {
+        "app": _add_app(True),
+        "disabled_app": _add_app(False),
+        "tool": _add_tool(True),
+        "disabled_tool": _add_tool(False),
+        "mcp": _add_mcp(True),
+        "disabled_mcp": _add_mcp(False),
+        "kb": _add_kb(),
+    }
+    db.session.commit()
+    ids = {name: item.id for name, item in items.items()}
+    ids["missing_kb"] = str(uuid.uuid4())
+    return ids
+
+
+def test_annotate_nested_graph_in_one_query(fake_redis, resources):
+    ids = resources
+    graph = _nested_graph(ids)
+
+    statements, stop = _count_selects()
+    try:
+        ResourceStatusService.annotate_graph(graph)
+    finally:
+        stop()
+
+    assert len(statements) == 1
+    assert _statuses(graph) == {
+        ("App", ids["app"]): False,
+        ("App", ids["disabled_app"]): True,
+        ("HttpTool", str(ids["tool"])): False,
+        ("HttpTool", str(ids["disabled_tool"])): True,
+        ("McpTool", str(ids["mcp"])): False,
+        ("McpTool", str(ids["disabled_mcp"])): True,
+        ("Document", ids["kb"]): False,
+        ("Document", ids["missing_kb"]): True,
+    }
+
+
+def test_cached_statuses_skip_query(fake_redis, resources):
+    ResourceStatusService.annotate_graph(_nested_graph(resources))
+
+    graph = _nested_graph(resources)
+    statements, stop = _count_selects()
+    try:
+        ResourceStatusService.annotate_graph(graph)
+    finally:
+        stop()
+
+    assert statements == []
+    assert _statuses(graph)[("HttpTool", str(resources["tool"]))] is False
+
+
+def test_insert_resource_invalidates_cache(fake_redis, resources):
+    # 夹具提交新资源后版本号已递增
+    assert fake_redis.get(ResourceStatusCache.VERSION_KEY) == b"1"
+
+
+def test_toggle_resource_invalidates_cache(fake_redis, resources):
+    ResourceStatusService.annotate_graph(_nested_graph(resources))
+
+    tool = db.session.get(Tool, resources["tool"])
+    tool.enable = False
+    db.session.commit()
+    assert fake_redis.get(ResourceStatusCache.VERSION_KEY) == b"2"
+
+    graph = _nested_graph(resources)
+    ResourceStatusService.annotate_graph(graph)
+    assert _statuses(graph)[("HttpTool", str(resources["tool"]))] is True
+
+
+def test_unrelated_update_keeps_cache(fake_redis, resources):
+    tool = db.session.get(Tool, resources["tool"])
+    tool.name = "renamed"
+    db.session.commit()
+
+    assert fake_redis.get(ResourceStatusCache.VERSION_KEY) == b"1"
+
+
+def test_bulk_update_invalidates_cache(fake_redis, resources):
+    db.session.query(App).filter(App.id == resources["app"]).update(
+        {"enable_api": False}
+    )
+    db.session.commit()
+
+    assert fake_redis.get(ResourceStatusCache.VERSION_KEY) == b"2"
+
+
+def test_workflow_update_resource_ref_status(fake_redis, resources):
+    from parts.app.model import Workflow
+
+    resources_list = [
+        _resource("HttpTool", provider_id=str(resources["disabled_tool"])),
+        _resource("Document", payload__knowledge_id=resources["kb"]),
+    ]
+    Workflow().update_resource_ref_status(resources_list)
+
+    assert [r["data"]["ref_status"] for r in resources_list] == [True, False]
@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from libs.metrics import MetricsRegistry
+from parts.app import run_metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    run_metrics.registry.clear()
+    yield
+    run_metrics.registry.clear()
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "耗时", ("node",), buckets=(0.1, 1))
+    latency.observe("llm", value=0.05)
+    latency.observe("llm", value=0.5)
+    latency.observe("llm", value=3)
+
+    text = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{node="llm",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{node="llm",le="1"} 2' in text
+    assert 'latency_seconds_bucket{node="llm",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{node="llm"} 3.55' in text
+    assert 'latency_seconds_count{node="llm"} 3' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("reports_total", "报告数", ("app",)).inc('a"b\\c')
+
+    assert 'reports_total{app="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_register_same_name_returns_existing():
+    registry = MetricsRegistry()
+    counter = registry.counter("reports_total", "报告数")
+
+    assert registry.counter("reports_total", "报告数") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("reports_total", "报告数")
+
+
+def test_record_node_report():
+    run_metrics.record_node_report("app-1", "draft", "LLM", 0.3, 10, 5)
+    run_metrics.record_node_report("app-1", "draft", None, -1, 0, 0)
+
+    assert run_metrics.NODE_REPORTS.value("draft") == 2
+    assert run_metrics.NODE_LATENCY.count("app-1", "LLM") == 1
+    assert run_metrics.NODE_LATENCY.count("app-1", "unknown") == 1
+    assert run_metrics.NODE_TOKENS.value("app-1", "LLM", "prompt") == 10
+    assert run_metrics.NODE_TOKENS.value("app-1", "LLM", "completion") == 5
+    assert run_metrics.NODE_TOKENS.value("app-1", "unknown", "prompt") == 0
+
+
+def test_queue_depth_read_on_render():
+    redis = MagicMock()
+    redis.llen.return_value = 7
+    with patch.object(run_metrics, "redis_client", redis):
+        text = run_metrics.registry.render()
+
+    assert "lazycraft_reflux_queue_depth 7" in text
+
+
+def test_queue_depth_failure_does_not_break_render():
+    redis = MagicMock()
+    redis.llen.side_effect = ConnectionError("down")
+    with patch.object(run_metrics, "redis_client", redis):
+        text = run_metrics.registry.render()
+
+    assert "# TYPE lazycraft_node_latency_seconds histogram" in text
+
+
+@pytest.mark.parametrize(
+    "remote_addr, expected",
+    [("127.0.0.1", True), ("::1", True), ("10.0.0.2", False), (None, False)],
+)
+def test_is_local_address(remote_addr, expected):
+    assert run_metrics.is_local_address(remote_addr) is expected
@@ -0,0 +1,113 @@
+import json
+import os
+
+from parts.app.version_store import AppVersionStore, load_app_snapshot
+
+
+def _graph(prompt, sub_prompt):
+    subgraph = {
+        "nodes": [{"id": "s1", "data": {"payload__kind": "LLM", "prompt": sub_prompt}}],
+        "edges": [],
+    }
+    return {
+        "nodes": [
+            {"id": "n1", "data": {"payload__kind": "LLM", "prompt": prompt}},
+            {
+                "id": "n2",
+                "data": {"payload__kind": "SubGraph", "config__patent_graph": subgraph},
+            },
+        ],
+        "edges": [{"source": "n1", "target": "n2"}],
+    }
+
+
+def _blob_files(blob_dir):
+    return sorted(
+        name
+        for _, _, files in os.walk(blob_dir)
+        for name in files
+        if name.endswith(".json.gz")
+    )
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = AppVersionStore(str(tmp_path / "blobs"))
+    graph = _graph("你好", "sub")
+    path = store.save_snapshot({"name": "app"}, graph, str(tmp_path / "v1.json"))
+
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert len(manifest["blobs"]) == 2
+
+    restored = load_app_snapshot(path, str(tmp_path / "blobs"))
+    assert restored == {"name": "app", "graph": graph}
+
+
+def test_unchanged_subgraphs_are_stored_once(tmp_path):
+    blob_dir = str(tmp_path / "blobs")
+    store = AppVersionStore(blob_dir)
+    store.save_snapshot({}, _graph("a", "sub"), str(tmp_path / "v1.json"))
+    store.save_snapshot({}, _graph("a", "sub"), str(tmp_path / "v2.json"))
+    assert len(_blob_files(blob_dir)) == 2
+
+    # 只修改外层画布，子画布 blob 复用
+    store.save_snapshot({}, _graph("b", "sub"), str(tmp_path / "v3.json"))
+    assert len(_blob_files(blob_dir)) == 3
+
+
+def test_remove_snapshot_keeps_referenced_blobs(tmp_path):
+    blob_dir = str(tmp_path / "blobs")
+    store = AppVersionStore(blob_dir)
+    v1 = store.save_snapshot({}, _graph("a", "old"), str(tmp_path / "v1.json"))
+    v2 = store.save_snapshot({}, _graph("a", "new"), str(tmp_path / "v2.json"))
+
+    assert store.remove_snapshot(v1) == 2
+    assert not os.path.exists(v1)
+    assert len(_blob_files(blob_dir)) == 2
+    assert load_app_snapshot(v2, blob_dir)["graph"] == _graph("a", "new")
+
+
+def test_remove_snapshot_keeps_blob_reused_by_later_save(tmp_path):
+    blob_dir = str(tmp_path / "blobs")
+    store = AppVersionStore(blob_dir)
+    v1 = store.save_snapshot({}, _graph("a", "sub"), str(tmp_path / "v1.json"))
+    # 新版本复用 v1 的全部 blob，删除 v1 不能删除它们
+    v2 = store.save_snapshot({}, _graph("a", "sub"), str(tmp_path / "v2.json"))
+
+    assert store.remove_snapshot(v1) == 0
+    assert load_app_snapshot(v2, blob_dir)["graph"] == _graph("a", "sub")
+    assert store.remove_snapshot(v2) == 2
+    assert _blob_files(blob_dir) == []
+
+
+def test_remove_snapshot_does_not_scan_other_versions(tmp_path, monkeypatch):
+    blob_dir = str(tmp_path / "blobs")
+    store = AppVersionStore(blob_dir)
+    paths = [
+        store.save_snapshot({}, _graph(str(i), "sub"), str(tmp_path / f"v{i}.json"))
+        for i in range(5)
+    ]
+    monkeypatch.setattr(os, "listdir", None)
+
+    assert store.remove_snapshot(paths[0]) == 1
+
+
+def test_rebuild_ref_counts_removes_unreferenced_blobs(tmp_path):
+    blob_dir = str(tmp_path / "blobs")
+    store = AppVersionStore(blob_dir)
+    v1 = store.save_snapshot({}, _graph("a", "old"), str(tmp_path / "v1.json"))
+    v2 = store.save_snapshot({}, _graph("a", "new"), str(tmp_path / "v2.json"))
+    os.remove(store._refs_path())
+    os.remove(v1)
+
+    assert not store.has_ref_counts()
+    assert store.rebuild_ref_counts([v2]) == 2
+    assert store.remove_snapshot(v2) == 2
+    assert _blob_files(blob_dir) == []
+
+
+def test_legacy_version_file_is_loaded_as_is(tmp_path):
+    path = tmp_path / "legacy.json"
+    data = {"name": "app", "graph": _graph("a", "sub")}
+    path.write_text(json.dumps(data), encoding="utf-8")
+    assert load_app_snapshot(str(path), str(tmp_path / "blobs")) == data
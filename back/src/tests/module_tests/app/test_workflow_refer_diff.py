@@ -0,0 +1,195 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.ext.compiler import compiles
+
+from parts.app.model import Workflow, WorkflowRefer
+from utils.util_database import db
+
+TENANT_ID = "11111111-1111-1111-1111-111111111111"
+ACCOUNT_ID = "22222222-2222-2222-2222-222222222222"
+
+
+@compiles(MEDIUMTEXT, "sqlite")
+def _mediumtext_sqlite(element, compiler, **kw):
+    """测试使用的 sqlite 不支持 MEDIUMTEXT"""
+    return "TEXT"
+
+
+@pytest.fixture
+def tables(app):
+    tables = [Workflow.__table__, WorkflowRefer.__table__]
+    db.metadata.create_all(db.engine, tables=tables)
+    yield
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=tables)
+
+
+def _node(kind, **data):
+    return {"id": str(uuid.uuid4()), "data": {"payload__kind": kind, **data}}
+
+
+def _workflow(app_id, nodes, main_app_id=None, created_at=None):
+    workflow = Workflow(
+        tenant_id=TENANT_ID,
+        app_id=app_id,
+        main_app_id=main_app_id,
+        type="workflow",
+        version="draft",
+        graph=json.dumps({"nodes": nodes}),
+        created_by=ACCOUNT_ID,
+        created_at=created_at or datetime.now(),
+    )
+    db.session.add(workflow)
+    return workflow
+
+
+def _refers(app_id):
+    return {
+        (r.target_type, r.target_id)
+        for r in WorkflowRefer.query.filter_by(app_id=app_id)
+    }
+
+
+def _count_statements():
+    statements = []
+
+    def _before(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _before)
+    return statements, lambda: event.remove(
+        db.engine, "before_cursor_execute", _before
+    )
+
+
+def test_only_changed_refs_are_written(tables):
+    main_id, sub_id = str(uuid.uuid4()), str(uuid.uuid4())
+    _workflow(sub_id, [_node("HttpTool", provider_id="t1")])
+    main = _workflow(main_id, [], main_app_id=main_id)
+    db.session.commit()
+
+    graph = {
+        "nodes": [
+            _node("SubGraph", payload__patent_id=sub_id),
+            _node("Document", payload__knowledge_id=["k1", "k2"]),
+        ]
+    }
+    main.update_graph(graph)
+    db.session.commit()
+    assert _refers(main_id) == {
+        ("tool", "t1"),
+        ("document", "k1"),
+        ("document", "k2"),
+    }
+    kept_ids = {r.id for r in WorkflowRefer.query.filter_by(target_id="k1")}
+
+    # 只去掉 k2, 其余引用行保持不变
+    graph["nodes"][1]["data"]["payload__knowledge_id"] = ["k1"]
+    statements, stop = _count_statements()
+    main.update_graph(graph)
+    db.session.commit()
+    stop()
+
+    assert _refers(main_id) == {("tool", "t1"), ("document", "k1")}
+    assert {r.id for r in WorkflowRefer.query.filter_by(target_id="k1")} == kept_ids
+    assert not any(s.startswith("INSERT INTO workrefer") for s in statements)
+    assert sum(s.startswith("DELETE FROM workrefer") for s in statements) == 1
+
+
+def test_subgraph_tree_is_loaded_per_level(tables):
+    main_id = str(uuid.uuid4())
+    leaf_id = str(uuid.uuid4())
+    sub_ids = [str(uuid.uuid4()) for _ in range(3)]
+    _workflow(leaf_id, [_node("LLM")])
+    for sub_id in sub_ids:
+        _workflow(sub_id, [_node("SubGraph", payload__patent_id=leaf_id)])
+    main = _workflow(main_id, [], main_app_id=main_id)
+    db.session.commit()
+
+    statements, stop = _count_statements()
+    main.update_graph(
+        {"nodes": [_node("SubGraph", payload__patent_id=k) for k in sub_ids]}
+    )
+    stop()
+
+    # 三个子画布一次查询, 共同引用的下一层子画布再一次查询
+    selects = [s for s in statements if "newworkflows.app_id IN" in s]
+    assert len(selects) == 2
+
+
+def test_cycle_is_detected_in_memory(tables):
+    main_id, other_id = str(uuid.uuid4()), str(uuid.uuid4())
+    _workflow(other_id, [_node("App", payload__patent_id=main_id)])
+    main = _workflow(main_id, [], main_app_id=main_id)
+    # 较早的版本不应被使用
+    _workflow(other_id, [], created_at=datetime.now() - timedelta(days=1))
+    db.session.commit()
+
+    with pytest.raises(ValueError):
+        main.update_graph({"nodes": [_node("App", payload__patent_id=other_id)]})
+
+
+def test_identical_graph_is_not_rewritten(tables):
+    main_id = str(uuid.uuid4())
+    main = _workflow(main_id, [], main_app_id=main_id)
+    graph = {"nodes": [_node("HttpTool", provider_id="t1")]}
+    assert main.update_graph(graph) is True
+    db.session.commit()
+    assert main.graph_hash == Workflow.compute_graph_hash(main.flat_graph_dict)
+
+    statements, stop = _count_statements()
+    assert main.update_graph({"nodes": list(graph["nodes"])}) is False
+    stop()
+    assert not any("workrefer" in s for s in statements)
+
+
+def test_refs_are_skipped_when_only_config_changes(tables):
+    main_id, sub_id = str(uuid.uuid4()), str(uuid.uuid4())
+    _workflow(sub_id, [_node("HttpTool", provider_id="t2")])
+    main = _workflow(main_id, [], main_app_id=main_id)
+    tool_node = _node("HttpTool", provider_id="t1", prompt="a")
+    main.update_graph(
+        {"nodes": [tool_node, _node("SubGraph", payload__patent_id=sub_id)]}
+    )
+    db.session.commit()
+    assert _refers(main_id) == {("tool", "t1"), ("tool", "t2")}
+
+    # 移除子画布节点后, 子画布中的引用随之删除
+    main.update_graph({"nodes": [tool_node]})
+    db.session.commit()
+    assert _refers(main_id) == {("tool", "t1")}
+
+    # 只修改节点配置, 不再访问引用表
+    tool_node["data"]["prompt"] = "b"
+    statements, stop = _count_statements()
+    assert main.update_graph({"nodes": [tool_node]}) is True
+    db.session.commit()
+    stop()
+    assert not any("workrefer" in s for s in statements)
+    assert json.loads(main.graph)["nodes"][0]["data"]["prompt"] == "b"
+
+
+def test_subgraph_only_change_is_reaggregated(tables):
+    main_id, sub_id = str(uuid.uuid4()), str(uuid.uuid4())
+    sub = _workflow(sub_id, [_node("HttpTool", provider_id="t1")])
+    main = _workflow(main_id, [], main_app_id=main_id)
+    graph = {"nodes": [_node("SubGraph", payload__patent_id=sub_id)]}
+    main.update_graph(graph)
+    db.session.commit()
+    graph_hash = main.graph_hash
+
+    # 只修改子画布, 主画布内容不变
+    sub.graph = json.dumps({"nodes": [_node("HttpTool", provider_id="t2")]})
+    db.session.commit()
+
+    assert main.update_graph(json.loads(json.dumps(graph))) is True
+    db.session.commit()
+    assert _refers(main_id) == {("tool", "t2")}
+    assert main.graph_hash == graph_hash
+
+    assert main.update_graph(json.loads(json.dumps(graph))) is False
@@ -0,0 +1,262 @@
+import random
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from models.model_account import Account
+from parts.app.model import App
+from parts.conversation.model import Conversation
+from parts.cost_audit.model import AppStatistics, CostAudit
+from parts.cost_audit.rollup import AppStatRollup, DistinctSketch, LatencySketch
+from parts.cost_audit.service import CostService
+from utils.util_database import db
+
+ACCOUNT_ID = "11111111-1111-1111-1111-111111111111"
+
+
+def _make_rollup(sessions, tokens=0, latencies=()):
+    rollup = AppStatRollup()
+    for sessionid, user_type, user_id, turns in sessions:
+        rollup.add_user(user_type, user_id)
+        rollup.add_session(sessionid, user_type, turns)
+    rollup.token_sum = tokens
+    for value in latencies:
+        rollup.latency.add(value)
+    return rollup
+
+
+def test_sketch_quantile_close_to_exact():
+    values = [random.uniform(0.05, 30) for _ in range(2000)]
+    left, right = LatencySketch(), LatencySketch()
+    for i, value in enumerate(values):
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.99):
+        exact = ordered[int(len(ordered) * q)]
+        assert abs(left.quantile(q) - exact) / exact < 0.02
+
+
+def test_sketch_json_round_trip():
+    sketch = LatencySketch()
+    for value in (0, 0.3, 1.2, 1.2, 8):
+        sketch.add(value)
+    restored = LatencySketch.from_json(sketch.to_json())
+    assert restored.count == 5
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+    assert LatencySketch.from_json(None).quantile(0.5) == 0
+
+
+def test_distinct_sketch_count_close_to_exact():
+    left, right = DistinctSketch(), DistinctSketch()
+    for i in range(20000):
+        (left if i % 2 else right).add(f"user-{i}")
+        # 重复元素不影响计数
+        right.add(f"user-{i // 2}")
+    left.merge(right)
+
+    assert abs(left.count() - 20000) / 20000 < 0.05
+    assert len(left.registers) == 1 << DistinctSketch.PRECISION
+
+
+def test_distinct_sketch_small_counts_and_json():
+    sketch = DistinctSketch()
+    assert sketch.count() == 0
+    for value in ("a", "b", "c", "a"):
+        sketch.add(value)
+
+    restored = DistinctSketch.from_json(sketch.to_json())
+    assert restored.count() == 3
+    assert DistinctSketch.from_json(None).count() == 0
+
+
+def test_turn_count():
+    assert AppStatRollup.turn_count(1, 4) == 4
+    # 跨天会话只计当天的轮次
+    assert AppStatRollup.turn_count(3, 4) == 2
+    assert AppStatRollup.turn_count(-1, -1) == -1
+    assert AppStatRollup.turn_count(0, 2) == 2
+
+
+def test_rollup_merge_dedups_users_and_sessions():
+    day1 = _make_rollup(
+        [("s1", "system", "u1", 2), ("s2", "web", "g1", 1)], tokens=100
+    )
+    day2 = _make_rollup(
+        [("s1", "system", "u1", 2), ("s3", "web", "g1", 3)], tokens=50
+    )
+    day1.merge(day2)
+
+    fields = day1.to_stat_fields()
+    assert day1.token_sum == 150
+    assert fields["system_user_count"] == 1
+    assert fields["web_user_count"] == 1
+    assert fields["system_user_session_count"] == 1
+    assert fields["web_user_session_count"] == 2
+    # 互动数按天累加
+    assert fields["system_user_interaction_count"] == 4
+    assert fields["web_user_avg_interaction"] == 4
+
+
+def test_rollup_model_round_trip():
+    rollup = _make_rollup([("s1", "web", "g1", 3)], tokens=7, latencies=[1.5])
+    stat = AppStatistics(app_id="app", call_type="release", stat_date=date.today())
+    rollup.apply_to(stat)
+
+    assert AppStatRollup.has_state(stat)
+    restored = AppStatRollup.from_model(stat)
+    assert restored.to_stat_fields() == rollup.to_stat_fields()
+    assert restored.token_sum == 7
+
+
+def test_merge_rollups_scans_only_missing_days():
+    end_date = date.today() - timedelta(days=1)
+    start_date = end_date - timedelta(days=6)
+
+    saved_stats = []
+    for offset in (0, 1, 4, 5):
+        stat = AppStatistics(
+            app_id="app",
+            call_type="release",
+            stat_date=start_date + timedelta(days=offset),
+        )
+        _make_rollup([(f"s{offset}", "web", "g1", 1)], tokens=10).apply_to(stat)
+        saved_stats.append(stat)
+    # 旧版本记录没有中间状态，需要重新扫描
+    saved_stats.append(
+        AppStatistics(
+            app_id="app", call_type="release", stat_date=start_date + timedelta(days=2)
+        )
+    )
+
+    with patch.object(
+        CostService, "_build_rollup", side_effect=lambda *args: AppStatRollup()
+    ) as mock_build:
+        rollup = CostService._merge_rollups(
+            "app", "release", start_date, end_date, saved_stats=saved_stats
+        )
+
+    scanned = [(args[2].date(), args[3].date()) for args, _ in mock_build.call_args_list]
+    assert scanned == [
+        (start_date + timedelta(days=2), start_date + timedelta(days=3)),
+        (end_date, end_date),
+    ]
+    assert rollup.token_sum == 40
+    assert rollup.to_stat_fields()["web_user_session_count"] == 4
+    assert rollup.to_stat_fields()["web_user_count"] == 1
+
+
+@pytest.fixture
+def tables(app):
+    tables = [
+        Account.__table__,
+        App.__table__,
+        AppStatistics.__table__,
+        Conversation.__table__,
+        CostAudit.__table__,
+    ]
+    db.metadata.create_all(db.engine, tables=tables)
+    yield
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=tables)
+
+
+def test_build_rollup_counts_turns_in_range(tables):
+    now = datetime.now()
+    db.session.add(
+        Account(
+            id=ACCOUNT_ID,
+            name="user",
+            email="user@example.com",
+            created_at=now,
+            updated_at=now,
+        )
+    )
+    rows = [
+        # 系统用户的会话前一天已有两轮
+        ("s1", ACCOUNT_ID, 3),
+        ("s1", ACCOUNT_ID, 4),
+        ("s2", "guest", 1),
+        ("s2", "guest", 2),
+        ("s2", "lazyllm", 2),
+    ]
+    for sessionid, from_who, turn_number in rows:
+        db.session.add(
+            Conversation(
+                app_id="app",
+                sessionid=sessionid,
+                from_who=from_who,
+                turn_number=turn_number,
+                created_at=now,
+            )
+        )
+    for session_id, token_num in (("s1", 10), ("s2", 5)):
+        db.session.add(
+            CostAudit(
+                app_id="app",
+                session_id=session_id,
+                call_type="release",
+                token_num=token_num,
+                cost_time=0.5,
+                created_at=now,
+            )
+        )
+    db.session.commit()
+
+    rollup = CostService._build_rollup(
+        "app", "release", now - timedelta(hours=1), now + timedelta(hours=1)
+    )
+
+    fields = rollup.to_stat_fields()
+    assert fields["system_user_count"] == 1
+    assert fields["web_user_count"] == 1
+    assert fields["system_user_session_count"] == 1
+    assert fields["system_user_interaction_count"] == 2
+    assert fields["web_user_interaction_count"] == 2
+    assert fields["system_user_token_sum"] == 10
+    assert fields["web_user_token_sum"] == 5
+
+
+def test_range_statistics_are_not_saved(tables):
+    app = App(tenant_id=ACCOUNT_ID, name="app", description="")
+    db.session.add(app)
+    db.session.flush()
+    start_date = date.today() - timedelta(days=3)
+    for offset, sessionid in enumerate(("s1", "s2", "s3")):
+        db.session.add(
+            Conversation(
+                app_id=app.id,
+                sessionid=sessionid,
+                from_who="guest",
+                turn_number=1,
+                created_at=datetime.combine(
+                    start_date + timedelta(days=offset), datetime.min.time()
+                )
+                + timedelta(hours=12),
+            )
+        )
+    db.session.commit()
+    end_date = start_date + timedelta(days=2)
+
+    with pytest.raises(ValueError):
+        CostService.calc_and_save_app_statistics(
+            app.id,
+            stat_date_start=start_date,
+            stat_date_end=end_date,
+            need_save_db=True,
+        )
+    assert AppStatistics.query.count() == 0
+
+    # 保存单日统计后重新合并区间，每天只计算一次
+    for offset in range(3):
+        CostService.calc_and_save_app_statistics(
+            app.id, stat_date=start_date + timedelta(days=offset), need_save_db=True
+        )
+    result = CostService.calc_and_save_app_statistics(
+        app.id, stat_date_start=start_date, stat_date_end=end_date
+    )
+    assert AppStatistics.query.count() == 3
+    assert result["web_user_session_count"] == 3
+    assert result["web_user_interaction_count"] == 3
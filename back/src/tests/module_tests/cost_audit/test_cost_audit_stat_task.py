@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from celery.exceptions import Retry
+
+from tasks import cost_audit_stat_task
+from tasks.cost_audit_stat_task import cost_audit_stat_shard, daily_cost_audit_stat
+
+
+class FakeRedis:
+    """只实现检查点用到的集合命令"""
+
+    def __init__(self):
+        self.sets = {}
+
+    def smembers(self, key):
+        return {v.encode() for v in self.sets.get(key, set())}
+
+    def sadd(self, key, *values):
+        self.sets.setdefault(key, set()).update(values)
+
+    def expire(self, key, seconds):
+        pass
+
+
+@pytest.fixture
+def fake_redis():
+    fake = FakeRedis()
+    with patch.object(cost_audit_stat_task, "redis_client", fake), patch.object(
+        cost_audit_stat_task, "db", MagicMock()
+    ):
+        yield fake
+
+
+def test_dispatch_skips_finished_apps_and_shards(fake_redis):
+    stat_date = (date.today() - timedelta(days=1)).isoformat()
+    fake_redis.sadd(f"cost_audit_stat:{stat_date}:done", "app-0")
+    app_ids = [f"app-{i}" for i in range(45)]
+
+    with patch.object(
+        cost_audit_stat_task.CostService, "get_stat_app_ids", return_value=app_ids
+    ), patch.object(
+        cost_audit_stat_task.CostService,
+        "get_active_app_ids",
+        return_value={"app-1", "app-30"},
+    ), patch.object(
+        cost_audit_stat_shard, "delay"
+    ) as mock_delay:
+        daily_cost_audit_stat()
+
+    shards = [call.args for call in mock_delay.call_args_list]
+    assert [len(args[1]) for args in shards] == [20, 20, 4]
+    assert "app-0" not in shards[0][1]
+    assert shards[0][2] == ["app-1"]
+    assert shards[1][2] == ["app-30"]
+
+
+def test_shard_retries_only_failed_apps(fake_redis):
+    stat_date = "2025-11-01"
+
+    def save(app_id, day, active):
+        if app_id == "app-2":
+            raise RuntimeError("db error")
+
+    with patch.object(
+        cost_audit_stat_task.CostService, "save_daily_app_statistics", side_effect=save
+    ), patch.object(
+        cost_audit_stat_task.CostService, "cache_app_period_statistics"
+    ), patch.object(
+        cost_audit_stat_shard, "retry", side_effect=Retry()
+    ) as mock_retry:
+        with pytest.raises(Retry):
+            cost_audit_stat_shard(stat_date, ["app-1", "app-2"], ["app-2"])
+
+    assert fake_redis.sets[f"cost_audit_stat:{stat_date}:done"] == {"app-1"}
+    assert mock_retry.call_args.kwargs["args"] == (stat_date, ["app-2"], ["app-2"])
+
+
+def test_shard_skips_checkpointed_apps(fake_redis):
+    stat_date = "2025-11-01"
+    fake_redis.sadd(f"cost_audit_stat:{stat_date}:done", "app-1")
+
+    with patch.object(
+        cost_audit_stat_task.CostService, "save_daily_app_statistics"
+    ) as mock_save, patch.object(
+        cost_audit_stat_task.CostService, "cache_app_period_statistics"
+    ):
+        cost_audit_stat_shard(stat_date, ["app-1", "app-2"], [])
+
+    assert [call.args[0] for call in mock_save.call_args_list] == ["app-2"]
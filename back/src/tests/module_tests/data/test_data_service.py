@@ -1,3 +1,6 @@
+import io
+import os
+import zipfile
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -206,55 +209,62 @@ def test_get_data_set_version_data_list(mock_data_set_version, data_service):
     assert result is not None
 
 
-def test_create_individual_zip(data_service):
-    with patch("parts.data.data_service.DataSetVersion") as mock_dsv_class, patch(
-        "parts.data.data_service.DataSet"
-    ) as mock_ds_class, patch("zipfile.ZipFile") as mock_zipfile, patch(
-        "os.path.exists"
-    ) as mock_exists, patch(
-        "os.walk"
-    ) as mock_walk, patch(
-        "os.remove"
-    ) as mock_remove:
-
+def _mock_export_version(mock_dsv_class, mock_ds_class, version_path, count=1):
+    versions = []
+    for i in range(count):
         mock_dsv = MagicMock()
-        mock_dsv.name = "test_version"
+        mock_dsv.name = "test_version" if i == 0 else f"test_version{i}"
         mock_dsv.version = "v1.0"
-        mock_dsv.version_path = "/path/to/version"
-        mock_dsv_class.query.get.return_value = mock_dsv
+        mock_dsv.version_path = version_path
+        versions.append(mock_dsv)
+    mock_dsv_class.query.get.side_effect = versions
 
-        mock_ds = MagicMock()
-        mock_ds.description = "Test description"
-        mock_ds.label = "Test label"
-        mock_ds_class.query.get.return_value = mock_ds
-
-        mock_exists.return_value = True
-        mock_walk.return_value = [("/path/to/version", [], ["file1.txt", "file2.txt"])]
-
-        result = DataService.create_individual_zip(1)
+    mock_ds = MagicMock()
+    mock_ds.description = "Test description"
+    mock_ds.label = "Test label"
+    mock_ds.from_type = "upload"
+    mock_ds_class.query.get.return_value = mock_ds
 
-        assert "test_version_v1.0" in result
-        assert result.endswith(".zip")
-        mock_zipfile.assert_called_once()
-        mock_remove.assert_called_once()
 
+def test_stream_individual_zip(data_service, tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "file1.txt").write_text("hello")
+    (tmp_path / "sub" / "file2.txt").write_text("world" * 1000)
+    with patch("parts.data.data_service.DataSetVersion") as mock_dsv_class, patch(
+        "parts.data.data_service.DataSet"
+    ) as mock_ds_class:
+        _mock_export_version(mock_dsv_class, mock_ds_class, str(tmp_path))
 
-def test_create_combined_zip(data_service):
-    with patch(
-        "parts.data.data_service.DataService.create_individual_zip"
-    ) as mock_create_individual, patch("zipfile.ZipFile") as mock_zipfile, patch(
-        "os.remove"
-    ) as mock_remove:
+        filename, chunks = DataService.stream_individual_zip(1)
+        content = b"".join(chunks)
 
-        mock_create_individual.side_effect = ["zip1.zip", "zip2.zip"]
+    assert "test_version_v1.0" in filename
+    assert filename.endswith(".zip")
+    with zipfile.ZipFile(io.BytesIO(content)) as zf:
+        assert zf.read("file1.txt") == b"hello"
+        assert zf.read(os.path.join("sub", "file2.txt")) == b"world" * 1000
+        assert "数据集描述: Test description" in zf.read(
+            "info_test_version.txt"
+        ).decode()
 
-        result = data_service.create_combined_zip([1, 2])
 
-        assert "多个数据集" in result
-        assert result.endswith(".zip")
-        assert mock_create_individual.call_count == 2
-        mock_zipfile.assert_called_once()
-        assert mock_remove.call_count == 2
+def test_stream_combined_zip(data_service, tmp_path):
+    (tmp_path / "file1.txt").write_text("hello")
+    with patch("parts.data.data_service.DataSetVersion") as mock_dsv_class, patch(
+        "parts.data.data_service.DataSet"
+    ) as mock_ds_class:
+        _mock_export_version(mock_dsv_class, mock_ds_class, str(tmp_path), count=2)
+
+        filename, chunks = data_service.stream_combined_zip([1, 2])
+        content = b"".join(chunks)
+
+    assert "多个数据集" in filename
+    with zipfile.ZipFile(io.BytesIO(content)) as combined:
+        names = combined.namelist()
+        assert len(names) == 2
+        for name in names:
+            with zipfile.ZipFile(io.BytesIO(combined.read(name))) as zf:
+                assert zf.read("file1.txt") == b"hello"
 
 
 @patch("parts.data.data_service.ScriptService.get_script_by_id")
@@ -0,0 +1,264 @@
+import io
+import json
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from parts.data import data_reflux_service as reflux
+from parts.data.model import DataSet, DataSetRefluxData, DataSetVersion
+from utils.util_database import db
+
+
+@pytest.fixture
+def tables(app):
+    """创建回流相关的表"""
+    tables = [
+        DataSet.__table__,
+        DataSetVersion.__table__,
+        DataSetRefluxData.__table__,
+    ]
+    db.metadata.create_all(db.engine, tables=tables)
+    yield
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=tables)
+
+
+class FakeRedis:
+    """只实现回流队列用到的列表命令"""
+
+    def __init__(self):
+        self.items = []
+        self.dead_letters = []
+
+    def rpush(self, key, value):
+        value = value.encode() if isinstance(value, str) else value
+        if key == reflux.REFLUX_DEAD_LETTER_KEY:
+            self.dead_letters.append(value)
+        else:
+            self.items.append(value)
+
+    def lrange(self, key, start, end):
+        return self.items[start : end + 1]
+
+    def ltrim(self, key, start, end):
+        self.items = self.items[start:]
+
+
+def _add_dataset(app_id, reflux_type, node_id=None, versions=1):
+    dataset = DataSet(
+        name=f"{app_id}-{reflux_type}",
+        data_type="doc",
+        upload_type="local",
+        from_type="return",
+        user_id="u",
+        user_name="u",
+        app_id=app_id,
+        node_id=node_id,
+        reflux_type=reflux_type,
+    )
+    db.session.add(dataset)
+    db.session.flush()
+    for i in range(versions):
+        db.session.add(
+            DataSetVersion(
+                name=f"v{i}",
+                version=f"v{i}",
+                data_set_id=dataset.id,
+                user_id="u",
+                status="done",
+                is_original=i == 0,
+                version_type="branch",
+            )
+        )
+    db.session.commit()
+    return dataset
+
+
+def _event(app_id, module_type, module_id, turn_number="1"):
+    return {
+        "app_id": app_id,
+        "app_name": "应用",
+        "module_id": module_id,
+        "module_name": "模块",
+        "module_type": module_type,
+        "output_time": "2025-11-20 10:00:00",
+        "module_input": "in",
+        "module_output": "out",
+        "conversation_id": "c1",
+        "turn_number": turn_number,
+        "is_satisfied": True,
+        "user_feedback": "",
+    }
+
+
+def test_enqueue_does_not_touch_database(tables):
+    fake_redis = FakeRedis()
+    with patch.object(reflux, "redis_client", fake_redis), patch.object(
+        db.session, "commit"
+    ) as commit:
+        reflux.enqueue_reflux_data(_event("app1", "app", "app1"))
+
+    commit.assert_not_called()
+    assert json.loads(fake_redis.items[0])["app_id"] == "app1"
+
+
+def test_flush_writes_batch_to_latest_versions(tables):
+    app_dataset = _add_dataset("app1", "app", versions=2)
+    node_dataset = _add_dataset("app1", "node", node_id="n1")
+    fake_redis = FakeRedis()
+    with patch.object(reflux, "redis_client", fake_redis):
+        reflux.enqueue_reflux_data(_event("app1", "app", "app1"))
+        reflux.enqueue_reflux_data(_event("app1", "node", "n1", "2"))
+        # 未发布的应用没有数据集，事件被丢弃
+        reflux.enqueue_reflux_data(_event("app2", "app", "app2"))
+
+        assert reflux.flush_reflux_queue(batch_size=10) == 3
+
+    assert fake_redis.items == []
+    rows = DataSetRefluxData.query.order_by(DataSetRefluxData.id).all()
+    assert [row.data_set_id for row in rows] == [app_dataset.id, node_dataset.id]
+    latest_app_version = (
+        DataSetVersion.query.filter_by(data_set_id=app_dataset.id)
+        .order_by(DataSetVersion.id.desc())
+        .first()
+    )
+    assert rows[0].data_set_version_id == latest_app_version.id
+    assert rows[1].json_data == reflux.DataRefluxService.get_reflux_data_by_id(
+        rows[1].id
+    )
+    assert rows[1].json_data["conversation_info"]["turn_number"] == 2
+
+
+def test_failed_event_moves_to_dead_letter(tables):
+    _add_dataset("app1", "app")
+    fake_redis = FakeRedis()
+    with patch.object(reflux, "redis_client", fake_redis):
+        reflux.enqueue_reflux_data(_event("app1", "app", "app1", "1"))
+        bad_event = _event("app1", "app", "app1", "2")
+        bad_event["output_time"] = "not-a-time"
+        reflux.enqueue_reflux_data(bad_event)
+        reflux.enqueue_reflux_data(_event("app1", "app", "app1", "3"))
+
+        assert reflux.flush_reflux_queue() == 3
+
+    assert fake_redis.items == []
+    assert [json.loads(raw)["turn_number"] for raw in fake_redis.dead_letters] == [
+        "2"
+    ]
+    rows = DataSetRefluxData.query.order_by(DataSetRefluxData.id).all()
+    assert [row.turn_number for row in rows] == [1, 3]
+
+
+def test_failed_batch_does_not_block_queue(tables):
+    _add_dataset("app1", "app")
+    fake_redis = FakeRedis()
+    with patch.object(reflux, "redis_client", fake_redis):
+        reflux.enqueue_reflux_data(_event("app1", "app", "app1"))
+        with patch.object(db.session, "commit", side_effect=RuntimeError("db")):
+            assert reflux.flush_reflux_queue() == 1
+
+        assert reflux.flush_reflux_queue() == 0
+    assert fake_redis.items == []
+    assert len(fake_redis.dead_letters) == 1
+    assert DataSetRefluxData.query.count() == 0
+
+
+def test_dead_letter_failure_keeps_batch_queued(tables):
+    _add_dataset("app1", "app")
+    fake_redis = FakeRedis()
+    with patch.object(reflux, "redis_client", fake_redis):
+        reflux.enqueue_reflux_data(_event("app1", "app", "app1"))
+        with patch.object(
+            db.session, "commit", side_effect=RuntimeError("db")
+        ), patch.object(fake_redis, "rpush", side_effect=ConnectionError("redis")):
+            with pytest.raises(ConnectionError):
+                reflux.flush_reflux_queue()
+        assert len(fake_redis.items) == 1
+
+        assert reflux.flush_reflux_queue() == 1
+    assert fake_redis.items == []
+    assert DataSetRefluxData.query.count() == 1
+
+
+def _feedback(turn_number="1"):
+    return {
+        "app_id": "app1",
+        "module_id": "app1",
+        "conversation_id": "c1",
+        "turn_number": turn_number,
+        "is_satisfied": False,
+        "user_feedback": "不准确",
+    }
+
+
+def test_feedback_before_flush_is_applied_after_insert(tables):
+    _add_dataset("app1", "app")
+    fake_redis = FakeRedis()
+    with patch.object(reflux, "redis_client", fake_redis):
+        reflux.enqueue_reflux_data(_event("app1", "app", "app1"))
+        # 回流记录还在队列中，反馈排在其后
+        reflux.update_reflux_data_feedback(_feedback())
+        assert DataSetRefluxData.query.count() == 0
+
+        assert reflux.flush_reflux_queue() == 2
+
+    assert fake_redis.items == []
+    row = DataSetRefluxData.query.one()
+    assert row.is_satisfied is False
+    assert row.user_feedback == "不准确"
+
+
+def test_feedback_for_saved_record_is_applied_directly(tables):
+    _add_dataset("app1", "app")
+    fake_redis = FakeRedis()
+    with patch.object(reflux, "redis_client", fake_redis):
+        reflux.enqueue_reflux_data(_event("app1", "app", "app1"))
+        reflux.flush_reflux_queue()
+
+        reflux.update_reflux_data_feedback(_feedback())
+
+    assert fake_redis.items == []
+    assert DataSetRefluxData.query.one().user_feedback == "不准确"
+
+
+def test_feedback_without_record_is_dropped(tables):
+    fake_redis = FakeRedis()
+    with patch.object(reflux, "redis_client", fake_redis):
+        reflux.update_reflux_data_feedback(_feedback("9"))
+
+        assert reflux.flush_reflux_queue() == 1
+
+    assert fake_redis.items == []
+    assert fake_redis.dead_letters == []
+
+
+def test_stream_combined_zip_pages_rows(tables):
+    dataset = _add_dataset("app1", "app")
+    version = DataSetVersion.query.filter_by(data_set_id=dataset.id).first()
+    for turn in range(5):
+        db.session.add(
+            DataSetRefluxData(
+                data_set_id=dataset.id,
+                data_set_version_id=version.id,
+                app_id="app1",
+                module_input="in",
+                turn_number=turn,
+            )
+        )
+    db.session.commit()
+
+    service = reflux.DataRefluxService.__new__(reflux.DataRefluxService)
+    with patch.object(
+        reflux.DataService.iter_reflux_data_rows, "__defaults__", (2,)
+    ), patch.object(DataSet, "label", "标签"):
+        filename, chunks = service.stream_combined_zip([version.id])
+        content = b"".join(chunks)
+
+    assert filename.endswith(".zip")
+    with zipfile.ZipFile(io.BytesIO(content)) as zf:
+        (name,) = zf.namelist()
+        lines = zf.read(name).decode().splitlines()
+    assert lines[4] == "List:"
+    turns = [json.loads(line)["conversation_info"]["turn_number"] for line in lines[5:]]
+    assert turns == [0, 1, 2, 3, 4]
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from parts.data.data_reflux_service import DataRefluxService
+from parts.data.data_service import DataService
+from parts.data.model import DataSetFile, DataSetFileStatus, DataSetRefluxData
+from utils.util_database import db
+
+
+@pytest.fixture
+def tables(app):
+    """创建数据集文件和回流数据表"""
+    tables = [DataSetFile.__table__, DataSetRefluxData.__table__]
+    db.metadata.create_all(db.engine, tables=tables)
+    yield
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=tables)
+
+
+def _add_file(path, version_id=1):
+    db.session.add(
+        DataSetFile(
+            name=os.path.basename(path) if path else "empty",
+            path=path,
+            data_set_id=1,
+            data_set_version_id=version_id,
+            user_id="u",
+            status="file_parse_fail",
+            file_type="doc",
+        )
+    )
+
+
+def test_copy_data_set_file_remaps_paths(tables, tmp_path):
+    old_dir = tmp_path / "v1_data"
+    (old_dir / "sub").mkdir(parents=True)
+    (old_dir / "a.json").write_text("[1]")
+    (old_dir / "sub" / "b.json").write_text("[2]")
+    _add_file(str(old_dir / "a.json"))
+    _add_file(str(old_dir / "sub" / "b.json"))
+    _add_file("")
+    _add_file(str(old_dir / "a.json"), version_id=9)
+    db.session.commit()
+
+    new_dir = str(tmp_path / "v2")
+    DataService.copy_data_set_file(1, 2, new_dir)
+
+    copied = DataSetFile.query.filter_by(data_set_version_id=2).all()
+    assert sorted(f.path for f in copied) == [
+        "",
+        os.path.join(new_dir, "a.json"),
+        os.path.join(new_dir, "b.json"),
+    ]
+    assert {f.status for f in copied} == {DataSetFileStatus.file_done.value}
+    assert {f.operation for f in copied} == {"upload"}
+    with open(os.path.join(new_dir, "b.json")) as f:
+        assert f.read() == "[2]"
+
+
+def test_copy_reflux_data(tables):
+    for turn in (1, 2):
+        db.session.add(
+            DataSetRefluxData(
+                data_set_id=1,
+                data_set_version_id=1,
+                app_id="app1",
+                module_input="in",
+                turn_number=turn,
+                is_satisfied=True,
+                status="file_parse_fail",
+            )
+        )
+    db.session.commit()
+
+    service = DataRefluxService.__new__(DataRefluxService)
+    service._DataRefluxService__copy_reflux_data(1, 2)
+
+    copied = DataSetRefluxData.query.filter_by(data_set_version_id=2).all()
+    assert sorted(r.turn_number for r in copied) == [1, 2]
+    assert all(r.module_input == "in" and r.is_satisfied for r in copied)
+    assert {r.status for r in copied} == {DataSetFileStatus.file_done.value}
+    assert DataSetRefluxData.query.filter_by(data_set_version_id=1).count() == 2
@@ -0,0 +1,71 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from parts.db_manage.service import DatabaseSchemaCache, DBManageService
+
+
+class FakeRedis:
+    """只实现缓存用到的命令"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, seconds, value):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+@pytest.fixture
+def fake_redis():
+    fake = FakeRedis()
+    with patch("parts.db_manage.service.redis_client", fake):
+        yield fake
+
+
+@patch("parts.db_manage.service.DataBaseInfo")
+def test_builtin_database_info_is_cached(mock_database_info, fake_redis):
+    mock_database_info.query.get.return_value = MagicMock(database_name="db_t1_abc")
+
+    first = DBManageService.get_builtin_database_info(database_id=1)
+    second = DBManageService.get_builtin_database_info(database_id=1)
+
+    assert first == second
+    assert first["db_name"] == "db_t1_abc"
+    mock_database_info.query.get.assert_called_once_with(1)
+    # 密码不写入缓存
+    assert all(b"password" not in value for value in fake_redis.data.values())
+
+
+def test_invalidate_drops_cached_schema(fake_redis):
+    loader = MagicMock(side_effect=[{"columns": ["a"]}, {"columns": ["a", "b"]}])
+    prefix = DatabaseSchemaCache.TABLE_STRUCTURE_PREFIX
+
+    assert DatabaseSchemaCache.get_or_load(prefix, 1, "id_1", loader) == {
+        "columns": ["a"]
+    }
+    assert DatabaseSchemaCache.get_or_load(prefix, 1, "id_1", loader) == {
+        "columns": ["a"]
+    }
+    DatabaseSchemaCache.invalidate(1)
+    assert DatabaseSchemaCache.get_or_load(prefix, 1, "id_1", loader) == {
+        "columns": ["a", "b"]
+    }
+    assert loader.call_count == 2
+
+
+def test_falls_back_to_loader_when_redis_fails():
+    mock_redis = MagicMock()
+    mock_redis.get.side_effect = ConnectionError("redis down")
+    with patch("parts.db_manage.service.redis_client", mock_redis):
+        value = DatabaseSchemaCache.get_or_load(
+            DatabaseSchemaCache.TABLE_STRUCTURE_PREFIX, 1, "id_1", lambda: {"a": 1}
+        )
+    assert value == {"a": 1}
@@ -0,0 +1,152 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from parts.inferservice import service
+from parts.inferservice.service import AmsStatusCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubInferService:
+    """记录调用次数的 AMS 状态查询"""
+
+    calls = []
+    release = None
+
+    def ams_get_service_status(self, gid, timeout=None):
+        if StubInferService.release is not None:
+            StubInferService.release.wait(5)
+        StubInferService.calls.append(gid)
+        return (True, f"Running-{len(StubInferService.calls)}", f"http://{gid}")
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    StubInferService.calls = []
+    StubInferService.release = None
+    with patch.object(service.time, "monotonic", fake), patch.object(
+        service, "InferService", StubInferService
+    ):
+        yield fake
+
+
+def _wait_background(cache):
+    for future in list(cache._pending.values()):
+        future.result(timeout=5)
+
+
+def test_fresh_entries_are_served_from_cache(clock):
+    cache = AmsStatusCache()
+    first = cache.get_many(["a", "b"])
+    clock.now += AmsStatusCache.FRESH_SECONDS - 1
+    second = cache.get_many(["a", "b"])
+
+    assert sorted(StubInferService.calls) == ["a", "b"]
+    assert first == second
+    assert {status_stale for _, status_stale in second.values()} == {False}
+
+
+def test_stale_entry_returns_old_value_and_refreshes(clock):
+    cache = AmsStatusCache()
+    old = cache.get_many(["a"])["a"][0]
+    clock.now += AmsStatusCache.FRESH_SECONDS + 1
+
+    value, status_stale = cache.get_many(["a"])["a"]
+    _wait_background(cache)
+
+    assert value == old
+    assert status_stale is True
+    assert StubInferService.calls == ["a", "a"]
+    # 后台刷新后的新值视为最新
+    value, status_stale = cache.get_many(["a"])["a"]
+    assert value == (True, "Running-2", "http://a")
+    assert status_stale is False
+
+
+def test_expired_entry_is_fetched_again(clock):
+    cache = AmsStatusCache()
+    cache.get_many(["a"])
+    clock.now += AmsStatusCache.EXPIRE_SECONDS + 1
+
+    value, status_stale = cache.get_many(["a"])["a"]
+
+    assert value == (True, "Running-2", "http://a")
+    assert status_stale is False
+
+
+def test_slow_fetch_is_reported_unknown_and_stale(clock):
+    cache = AmsStatusCache()
+    StubInferService.release = threading.Event()
+    with patch.object(AmsStatusCache, "WAIT_TIMEOUT", 0.05):
+        value, status_stale = cache.get_many(["slow"])["slow"]
+    StubInferService.release.set()
+    _wait_background(cache)
+
+    assert value == AmsStatusCache.UNKNOWN
+    assert status_stale is True
+    # 后台完成的结果可被下一次查询直接使用
+    assert cache.get_many(["slow"])["slow"] == (
+        (True, "Running-1", "http://slow"),
+        False,
+    )
+
+
+def test_concurrent_misses_share_one_call(clock):
+    cache = AmsStatusCache()
+    StubInferService.release = threading.Event()
+    futures = [cache._submit("a"), cache._submit("a")]
+    StubInferService.release.set()
+    _wait_background(cache)
+
+    assert futures[0] is futures[1]
+    assert StubInferService.calls == ["a"]
+
+
+def test_invalidate_forces_refetch(clock):
+    cache = AmsStatusCache()
+    cache.get_many(["a"])
+    cache.invalidate("a")
+    cache.get_many(["a"])
+
+    assert StubInferService.calls == ["a", "a"]
+
+
+def test_unknown_status_is_not_reported_as_cancelled():
+    groups = [
+        SimpleNamespace(
+            model_name="m",
+            services=[SimpleNamespace(gid="slow"), SimpleNamespace(gid="failed")],
+        )
+    ]
+    fetched = {
+        "slow": (AmsStatusCache.UNKNOWN, True),
+        "failed": ((False, "", ""), False),
+    }
+    with patch.object(service.ams_status_cache, "get_many", return_value=fetched):
+        status, endpoint, stale_gids = service.InferService()._get_ams_service_status(
+            groups
+        )
+
+    assert status == {"slow": service.STATUS_UNKNOWN, "failed": "Cancelled"}
+    assert endpoint == {"slow": "", "failed": ""}
+    assert stale_gids == {"slow"}
+
+
+def test_unknown_status_is_kept_by_status_filter():
+    match = service.InferService._match_status_filter
+
+    assert match(service.STATUS_UNKNOWN, {"Ready"})
+    assert match(service.STATUS_UNKNOWN, {"Cancelled"})
+    assert match("Ready", {"Ready"})
+    assert not match("Cancelled", {"Ready"})
+    assert match("Cancelled", set())
@@ -14,8 +14,9 @@ def kb_service():
 
 # 测试get_pagination方法
 @patch("parts.knowledge_base.service.db")
-def test_get_pagination(mock_db, kb_service):
-    mock_db.paginate.return_value = MagicMock()
+@patch("parts.knowledge_base.service.keyset_paginate")
+def test_get_pagination(mock_paginate, mock_db, kb_service):
+    mock_paginate.return_value = MagicMock()
     result = kb_service.get_pagination({"page": 1, "page_size": 10})
     assert result is not None
 
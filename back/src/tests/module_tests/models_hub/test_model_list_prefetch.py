@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+from flask import g
+from flask_restful import marshal
+from sqlalchemy import event
+
+from parts.models_hub import fields
+from parts.models_hub.model import Lazymodel, LazyModelConfigInfo, LazymodelOnlineModels
+from parts.tag.model import TagBinding
+from utils.util_database import db
+
+TENANT_ID = "11111111-1111-1111-1111-111111111111"
+ACCOUNT_ID = "22222222-2222-2222-2222-222222222222"
+TABLES = [
+    Lazymodel.__table__,
+    LazymodelOnlineModels.__table__,
+    LazyModelConfigInfo.__table__,
+    TagBinding.__table__,
+]
+
+
+def _model(name, model_type, **kwargs):
+    return Lazymodel(
+        model_icon="",
+        model_type=model_type,
+        model_name=name,
+        model_path="",
+        model_from="",
+        user_id=ACCOUNT_ID,
+        tenant_id=TENANT_ID,
+        model_kind="OnlineLLM" if model_type == "online" else "localLLM",
+        model_key=name,
+        model_status=0,
+        prompt_keys="",
+        model_brand="",
+        model_url="",
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def models(app):
+    db.metadata.create_all(db.engine, tables=TABLES)
+    g.qtype = "already"
+    g.current_user = SimpleNamespace(id=ACCOUNT_ID, current_tenant_id=TENANT_ID)
+    for i in range(3):
+        online = _model(f"online{i}", "online")
+        local = _model(f"local{i}", "local")
+        db.session.add_all([online, local])
+        db.session.flush()
+        db.session.add_all(
+            [
+                LazymodelOnlineModels(
+                    model_id=online.id,
+                    model_name=f"sub{i}",
+                    model_key=f"sub{i}",
+                    tenant_id=TENANT_ID,
+                    user_id=ACCOUNT_ID,
+                ),
+                LazyModelConfigInfo(
+                    model_id=online.id,
+                    tenant_id=TENANT_ID,
+                    user_id=ACCOUNT_ID,
+                    api_key=f"key{i}",
+                ),
+                _model(f"ft{i}", "local", parent_model_id=local.id),
+                TagBinding(
+                    tenant_id=TENANT_ID, type="model", name=f"tag{i}", target_id=online.id
+                ),
+            ]
+        )
+    db.session.commit()
+    yield
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=TABLES)
+
+
+def test_marshal_prefetched_page_without_per_item_queries(models):
+    db.session.expunge_all()
+    items = Lazymodel.query.filter(Lazymodel.parent_model_id == 0).order_by(Lazymodel.id).all()
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        Lazymodel.prefetch_list_fields(items)
+        # 在线子模型、本地微调模型、API 密钥、标签各一次
+        assert len(statements) == 4
+        data = marshal(items, fields.model_fields)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    assert len(statements) == 4
+    assert [d["model_name"] for d in data] == [
+        "online0", "local0", "online1", "local1", "online2", "local2"
+    ]
+    assert [d["model_list"][0]["model_key"] for d in data] == [
+        "sub0", "ft0", "sub1", "ft1", "sub2", "ft2"
+    ]
+    assert [d["api_key"] for d in data] == ["key0", "", "key1", "", "key2", ""]
+    assert [d["tags"] for d in data] == [["tag0"], [], ["tag1"], [], ["tag2"], []]
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from libs.pagination import decode_cursor, encode_cursor, keyset_paginate
+from parts.prompt.model import Prompt
+from utils.util_database import db
+
+
+@pytest.fixture
+def prompts(app):
+    db.metadata.create_all(db.engine, tables=[Prompt.__table__])
+    base = datetime(2025, 1, 1)
+    # 每两条共用一个创建时间，验证按 id 打破并列
+    db.session.add_all(
+        Prompt(
+            id=i,
+            name=f"p{i}",
+            content="c",
+            tenant_id="t1" if i % 3 else "t2",
+            created_at=base + timedelta(minutes=i // 2),
+        )
+        for i in range(1, 24)
+    )
+    db.session.commit()
+    yield
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=[Prompt.__table__])
+
+
+def _ordered_ids(query):
+    rows = query.order_by(Prompt.created_at.desc(), Prompt.id.desc()).all()
+    return [p.id for p in rows]
+
+
+def test_cursor_pages_match_full_ordering(prompts):
+    query = Prompt.query.filter(Prompt.tenant_id == "t1")
+    expected = _ordered_ids(query)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = keyset_paginate(
+            query, [Prompt.created_at, Prompt.id], per_page=4, cursor=cursor
+        )
+        pages += 1
+        seen.extend(p.id for p in page.items)
+        assert page.total == len(expected)
+        if not page.has_next:
+            assert page.next_cursor is None
+            break
+        cursor = page.next_cursor
+
+    assert seen == expected
+    assert pages == (len(expected) + 3) // 4
+
+
+def test_offset_page_matches_cursor_page(prompts):
+    query = Prompt.query
+    first = keyset_paginate(query, [Prompt.created_at, Prompt.id], per_page=5)
+    by_cursor = keyset_paginate(
+        query,
+        [Prompt.created_at, Prompt.id],
+        page=2,
+        per_page=5,
+        cursor=first.next_cursor,
+    )
+    by_offset = keyset_paginate(
+        query, [Prompt.created_at, Prompt.id], page=2, per_page=5
+    )
+
+    assert [p.id for p in by_cursor.items] == [p.id for p in by_offset.items]
+    assert by_offset.pages == 5
+    assert by_offset.prev_num == 1 and by_offset.next_num == 3
+
+
+def test_cursor_pages_skip_count(prompts):
+    first = keyset_paginate(Prompt.query, [Prompt.created_at, Prompt.id], per_page=5)
+
+    # 总数随游标带到后续页，不再执行 count
+    with patch.object(type(Prompt.query), "count") as count:
+        page = keyset_paginate(
+            Prompt.query,
+            [Prompt.created_at, Prompt.id],
+            per_page=5,
+            cursor=first.next_cursor,
+        )
+    count.assert_not_called()
+    assert page.total == first.total == 23
+    assert decode_cursor(page.next_cursor)
+
+
+def test_first_page_total_reflects_writes(prompts):
+    assert keyset_paginate(Prompt.query, [Prompt.created_at, Prompt.id]).total == 23
+
+    db.session.add(Prompt(id=100, name="new", content="c", tenant_id="t1"))
+    db.session.commit()
+    assert keyset_paginate(Prompt.query, [Prompt.created_at, Prompt.id]).total == 24
+
+    db.session.delete(db.session.get(Prompt, 100))
+    db.session.commit()
+    assert keyset_paginate(Prompt.query, [Prompt.created_at, Prompt.id]).total == 23
+
+
+def test_cursor_round_trip_and_invalid_cursor():
+    values = [datetime(2025, 1, 1, 8, 30), 42]
+    assert decode_cursor(encode_cursor(values)) == values
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
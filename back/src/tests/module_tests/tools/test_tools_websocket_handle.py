@@ -1,24 +1,154 @@
+import json
+import logging
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from parts.tools.websocket_handle import (RealtimeMyLogger, get_tool_logger,
-                                          send_log)
+from parts.tools import websocket_handle
+from parts.tools.websocket_handle import (LOG_HISTORY_SIZE, RealtimeMyLogger,
+                                          evict_idle_loggers, get_tool_logger,
+                                          send_log, tool_log_hub)
+from utils.util_websocket import ConnectionSender, WebSocketHub
+
+
+def _wait_until(predicate, timeout=2):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
 
 
 # 测试send_log函数
-@patch("parts.tools.websocket_handle.user_connections", {"user_id": MagicMock()})
 def test_send_log():
     log_entry = {
         "level": "INFO",
         "msg": "Test message",
         "timestamp": "2023-01-01T00:00:00",
     }
-    with patch(
-        'parts.tools.websocket_handle.user_connections["user_id"].send'
-    ) as mock_send:
+    with patch.object(tool_log_hub, "publish") as mock_publish:
         send_log("user_id", log_entry)
-        mock_send.assert_called_once_with(json.dumps(log_entry))
+        mock_publish.assert_called_once_with("user_id", log_entry)
+
+
+def test_hub_falls_back_to_local_delivery():
+    hub = WebSocketHub("test:channel")
+    ws = MagicMock()
+    with patch("utils.util_websocket.redis_client") as mock_redis, patch.object(
+        hub, "_ensure_subscriber"
+    ):
+        mock_redis.publish.side_effect = ConnectionError("redis down")
+        conn_id = hub.register("user_id", ws)
+        hub.publish("user_id", {"msg": "hello"})
+
+        assert _wait_until(lambda: ws.send.called)
+        ws.send.assert_called_once_with(json.dumps({"msg": "hello"}))
+        hub.unregister("user_id", conn_id)
+        assert not hub.has_connection("user_id")
+
+
+def test_slow_client_does_not_block_producer():
+    release = threading.Event()
+    ws = MagicMock()
+    ws.send.side_effect = lambda payload: release.wait()
+    sender = ConnectionSender(ws, maxsize=2)
+
+    start = time.time()
+    for i in range(100):
+        sender.offer(str(i))
+    assert time.time() - start < 1
+    # 发送线程卡在第一条消息上，队列只保留最新的两条
+    assert sender.dropped >= 97
+    assert list(sender._queue) == ["98", "99"]
+
+    release.set()
+    sender.close()
+
+
+def test_failed_send_closes_connection():
+    hub = WebSocketHub("test:channel")
+    ws = MagicMock(closed=False)
+    ws.send.side_effect = ConnectionError("gone")
+    with patch.object(hub, "_ensure_subscriber"):
+        hub.register("user_id", ws)
+    hub.deliver_local("user_id", "payload")
+
+    assert _wait_until(lambda: hub.clean_closed() == ["user_id"])
+    assert not hub.has_connection("user_id")
+
+
+def test_log_history_is_bounded():
+    logger = RealtimeMyLogger("logger_tool1")
+    with patch.object(websocket_handle, "send_log") as mock_send:
+        for i in range(LOG_HISTORY_SIZE + 10):
+            logger.info(f"line {i}")
+
+    history = logger.get_log_history()
+    assert len(history) == LOG_HISTORY_SIZE
+    assert history[0]["msg"] == "line 10"
+    assert mock_send.call_args[0][0] == "tool1"
+
+
+def test_non_tool_logger_is_not_published():
+    logger = RealtimeMyLogger("parts.tools.service")
+    with patch.object(websocket_handle, "send_log") as mock_send:
+        logger.info("hello")
+
+    mock_send.assert_not_called()
+    assert logger.get_log_history() == []
+
+
+def test_log_history_spills_to_redis():
+    logger = RealtimeMyLogger("logger_tool2")
+    stored = []
+    mock_redis = MagicMock()
+    mock_redis.pipeline.return_value.rpush.side_effect = (
+        lambda key, value: stored.append(value)
+    )
+    mock_redis.lrange.side_effect = lambda key, start, end: stored
+    mock_config = MagicMock(TOOL_LOG_REDIS_SPILL=True)
+    with patch.object(websocket_handle, "redis_client", mock_redis), patch.object(
+        websocket_handle, "lazy_config", mock_config
+    ), patch.object(websocket_handle, "send_log"):
+        logger.info("hello")
+        # 其他进程读取时本地没有历史，仍能从Redis取到
+        logger.log_history.clear()
+        history = logger.get_log_history()
+
+    assert [entry["msg"] for entry in history] == ["hello"]
+    mock_redis.pipeline.return_value.ltrim.assert_called_once_with(
+        "tool_log_history:tool2", -LOG_HISTORY_SIZE, -1
+    )
+
+
+def test_failed_spill_is_logged(caplog):
+    mock_redis = MagicMock()
+    mock_redis.pipeline.return_value.execute.side_effect = ConnectionError("down")
+    with patch.object(websocket_handle, "redis_client", mock_redis), caplog.at_level(
+        logging.WARNING
+    ):
+        websocket_handle._spill_log_entry("tool3", {"msg": "hello"})
+
+    assert "Failed to save log history of tool tool3: down" in caplog.text
+
+
+def test_evict_idle_loggers():
+    logger_dict = logging.Logger.manager.loggerDict
+    idle = RealtimeMyLogger("logger_idle")
+    idle.last_active = time.monotonic() - 3600
+    active = RealtimeMyLogger("logger_active")
+    logger_dict["logger_idle"] = idle
+    logger_dict["logger_active"] = active
+    try:
+        assert evict_idle_loggers(idle_seconds=60) == ["logger_idle"]
+        assert "logger_idle" not in logger_dict
+        assert logger_dict["logger_active"] is active
+    finally:
+        logger_dict.pop("logger_idle", None)
+        logger_dict.pop("logger_active", None)
 
 
 # 测试get_tool_logger函数
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.account_manager import AccountService, PrincipalCache
+from models.model_account import Account, Tenant, TenantAccountJoin
+from utils.util_database import db
+
+ACCOUNT_ID = "11111111-1111-1111-1111-111111111111"
+TENANT_ID = "22222222-2222-2222-2222-222222222222"
+
+
+@pytest.fixture
+def tables(app):
+    """创建账户相关的表"""
+    tables = [Account.__table__, Tenant.__table__, TenantAccountJoin.__table__]
+    db.metadata.create_all(db.engine, tables=tables)
+    yield
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=tables)
+
+
+@pytest.fixture
+def account(tables):
+    now = datetime.now()
+    tenant = Tenant(id=TENANT_ID, name="组", created_at=now, updated_at=now)
+    account = Account(
+        id=ACCOUNT_ID,
+        name="user",
+        email="user@example.com",
+        last_active_at=now,
+        created_at=now,
+        updated_at=now,
+    )
+    join = TenantAccountJoin(
+        id="33333333-3333-3333-3333-333333333333",
+        tenant_id=tenant.id,
+        account_id=account.id,
+        current=True,
+        role="admin",
+        created_at=now,
+        updated_at=now,
+    )
+    db.session.add_all([tenant, account, join])
+    db.session.commit()
+    account.current_tenant_id = tenant.id
+    return account
+
+
+class FakeRedis:
+    """只实现认证缓存用到的命令"""
+
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def test_restore_cached_principal_without_queries(account):
+    fake_redis = FakeRedis()
+    with patch("core.account_manager.redis_client", fake_redis):
+        PrincipalCache.save(account)
+        db.session.expunge_all()
+
+        fake_redis.set(f"account_login:{ACCOUNT_ID}:token", "1")
+        statements = []
+        with patch.object(db.session, "execute", side_effect=statements.append):
+            restored = AccountService.load_logged_in_account(
+                account_id=ACCOUNT_ID, token="token"
+            )
+
+    assert statements == []
+    assert restored.email == "user@example.com"
+    assert restored.current_tenant_id == TENANT_ID
+    assert restored.current_role == "admin"
+    assert isinstance(restored.last_active_at, datetime)
+    # 租户对象在首次访问时才加载
+    assert restored.current_tenant.name == "组"
+
+
+def test_invalidate_falls_back_to_database(account):
+    fake_redis = FakeRedis()
+    with patch("core.account_manager.redis_client", fake_redis):
+        PrincipalCache.save(account)
+        PrincipalCache.invalidate(account.id)
+        assert fake_redis.mget(f"account_principal:{ACCOUNT_ID}") == [None]
+
+        fake_redis.set(f"account_login:{ACCOUNT_ID}:token", "1")
+        restored = AccountService.load_logged_in_account(
+            account_id=ACCOUNT_ID, token="token"
+        )
+        assert restored.current_tenant_id == TENANT_ID
+        assert fake_redis.mget(f"account_principal:{ACCOUNT_ID}")[0] is not None
+
+
+def test_logged_out_token_is_rejected(account):
+    fake_redis = FakeRedis()
+    with patch("core.account_manager.redis_client", fake_redis):
+        PrincipalCache.save(account)
+        assert (
+            AccountService.load_logged_in_account(account_id=ACCOUNT_ID, token="t")
+            is None
+        )
+
+
+def test_touch_last_active_is_coalesced(account):
+    fake_redis = FakeRedis()
+    account.last_active_at = datetime.now() - timedelta(hours=1)
+    task = MagicMock()
+    with patch("core.account_manager.redis_client", fake_redis), patch(
+        "tasks.account_task.update_account_last_active_task", task
+    ):
+        AccountService.touch_last_active(account)
+        AccountService.touch_last_active(account)
+
+    task.delay.assert_called_once()
+    assert task.delay.call_args[0][0] == ACCOUNT_ID
+
+
+def test_secret_columns_are_not_cached(account):
+    account.password = "hashed"
+    account.password_salt = "salt"
+    db.session.commit()
+    fake_redis = FakeRedis()
+    with patch("core.account_manager.redis_client", fake_redis):
+        PrincipalCache.save(account)
+        raw = fake_redis.data[f"account_principal:{ACCOUNT_ID}"]
+        db.session.expunge_all()
+        restored = PrincipalCache.restore(raw)
+
+    assert b"hashed" not in raw and b"salt" not in raw
+    # 未缓存的字段访问时从数据库加载
+    assert restored.password == "hashed"
+
+
+def test_update_password_invalidates_principal(account):
+    fake_redis = FakeRedis()
+    with patch("core.account_manager.redis_client", fake_redis):
+        PrincipalCache.save(account)
+        AccountService.update_account_password(account, None, "new-password")
+
+    assert f"account_principal:{ACCOUNT_ID}" not in fake_redis.data
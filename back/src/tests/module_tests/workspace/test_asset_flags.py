@@ -0,0 +1,169 @@
+from unittest.mock import patch
+
+import pytest
+
+from core import asset_manager
+from core.asset_manager import AssetFlagCache, AssetManager
+from parts.app.model import App
+from utils.util_database import db
+
+TENANT_ID = "11111111-1111-1111-1111-111111111111"
+OTHER_TENANT_ID = "22222222-2222-2222-2222-222222222222"
+ACCOUNT_ID = "33333333-3333-3333-3333-333333333333"
+OTHER_ACCOUNT_ID = "44444444-4444-4444-4444-444444444444"
+
+
+class FakeRedis:
+    """只实现资产标记用到的命令"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def setex(self, key, ex, value):
+        self.data[key] = value.encode()
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture
+def tables(app):
+    """只保留应用一种资产，其余资产表使用 MySQL 专有的默认值，无法在 SQLite 中创建"""
+    db.metadata.create_all(db.engine, tables=[App.__table__])
+    with patch.multiple(
+        asset_manager,
+        CREATED_MODELS=[App],
+        USERNAME_MODELS=[],
+        USERID_MODELS=[],
+        TENANT_ONLY_MODELS=[],
+        ASSET_MODELS=frozenset([App]),
+    ):
+        yield
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=[App.__table__])
+
+
+@pytest.fixture
+def fake_redis():
+    fake_redis = FakeRedis()
+    with patch.object(asset_manager, "redis_client", fake_redis):
+        yield fake_redis
+
+
+def _add_app(tenant_id, account_id):
+    app = App(
+        tenant_id=tenant_id,
+        name="app",
+        description="",
+        created_by=account_id,
+    )
+    db.session.add(app)
+    db.session.commit()
+    return app
+
+
+def test_owned_assets_are_checked_in_one_query(tables, fake_redis):
+    _add_app(TENANT_ID, ACCOUNT_ID)
+    statements = []
+    original_execute = db.session.execute
+
+    def execute(statement, *args, **kwargs):
+        statements.append(statement)
+        return original_execute(statement, *args, **kwargs)
+
+    with patch.object(db.session, "execute", side_effect=execute):
+        result = AssetManager.get_account_list_tenant_assets(
+            [ACCOUNT_ID, OTHER_ACCOUNT_ID], TENANT_ID
+        )
+        assert result == {ACCOUNT_ID: True, OTHER_ACCOUNT_ID: False}
+        assert len(statements) == 1
+
+        # 第二次从 Redis 标记读取，不再查询数据库
+        assert AssetManager.get_tenant_list_account_assets(
+            [TENANT_ID], ACCOUNT_ID
+        ) == {TENANT_ID: True}
+        assert len(statements) == 1
+
+
+def test_commit_invalidates_flags(tables, fake_redis):
+    manager = AssetManager(operator=None)
+    assert manager._has_no_assets(OTHER_TENANT_ID, ACCOUNT_ID)
+    assert manager._has_no_assets(None, ACCOUNT_ID)
+
+    app = _add_app(OTHER_TENANT_ID, ACCOUNT_ID)
+    assert not manager._has_no_assets(OTHER_TENANT_ID, ACCOUNT_ID)
+    assert not manager._has_no_assets(None, ACCOUNT_ID)
+
+    App.query.filter_by(id=app.id).update({App.created_by: OTHER_ACCOUNT_ID})
+    db.session.commit()
+    assert manager._has_no_assets(OTHER_TENANT_ID, ACCOUNT_ID)
+    assert AssetManager.get_account_list_tenant_assets(
+        [OTHER_ACCOUNT_ID], OTHER_TENANT_ID
+    ) == {OTHER_ACCOUNT_ID: True}
+
+
+def test_renaming_asset_keeps_flags(tables, fake_redis):
+    app = _add_app(TENANT_ID, ACCOUNT_ID)
+    data = dict(fake_redis.data)
+    app.name = "renamed"
+    db.session.commit()
+    assert fake_redis.data == data
+
+
+def test_asset_change_only_invalidates_affected_pairs(tables, fake_redis):
+    _add_app(TENANT_ID, OTHER_ACCOUNT_ID)
+    assert AssetManager.get_account_list_tenant_assets(
+        [ACCOUNT_ID, OTHER_ACCOUNT_ID], TENANT_ID
+    ) == {ACCOUNT_ID: False, OTHER_ACCOUNT_ID: True}
+
+    _add_app(OTHER_TENANT_ID, ACCOUNT_ID)
+    with patch.object(
+        asset_manager, "_query_owned_pairs", wraps=asset_manager._query_owned_pairs
+    ) as query:
+        assert AssetManager.get_account_list_tenant_assets(
+            [ACCOUNT_ID, OTHER_ACCOUNT_ID], TENANT_ID
+        ) == {ACCOUNT_ID: False, OTHER_ACCOUNT_ID: True}
+        assert AssetManager.get_account_list_tenant_assets(
+            [ACCOUNT_ID], OTHER_TENANT_ID
+        ) == {ACCOUNT_ID: True}
+
+    # 其他租户下的资产不影响 TENANT_ID 的标记，只有新增资产所在的组合重新查询
+    assert query.call_args_list == [
+        (([(OTHER_TENANT_ID, ACCOUNT_ID)],), {}),
+    ]
+    assert AssetFlagCache.VERSION_KEY not in fake_redis.data
+
+
+def test_transfer_invalidates_old_and_new_owner(tables, fake_redis):
+    manager = AssetManager(operator=None)
+    app = _add_app(TENANT_ID, ACCOUNT_ID)
+    assert not manager._has_no_assets(TENANT_ID, ACCOUNT_ID)
+    assert manager._has_no_assets(TENANT_ID, OTHER_ACCOUNT_ID)
+
+    # 旧归属已加载时只刷新新旧归属对应的标记
+    assert app.created_by == ACCOUNT_ID
+    app.created_by = OTHER_ACCOUNT_ID
+    db.session.commit()
+    assert AssetFlagCache.VERSION_KEY not in fake_redis.data
+    assert manager._has_no_assets(TENANT_ID, ACCOUNT_ID)
+    assert manager._has_no_assets(None, ACCOUNT_ID)
+    assert not manager._has_no_assets(TENANT_ID, OTHER_ACCOUNT_ID)
+
+    # 旧归属未加载时无法确定受影响的组合，使所有标记失效
+    app.created_by = ACCOUNT_ID
+    db.session.commit()
+    assert fake_redis.get(AssetFlagCache.VERSION_KEY) == b"1"
+    assert not manager._has_no_assets(TENANT_ID, ACCOUNT_ID)
+    assert manager._has_no_assets(TENANT_ID, OTHER_ACCOUNT_ID)
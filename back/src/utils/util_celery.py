@@ -82,6 +82,8 @@ def init_app(app: Flask) -> Celery:
         "tasks.mail_reset_password_task",
         "tasks.inferservice_start_node_task",
         "tasks.cost_audit_stat_task",
+        "tasks.account_task",
+        "tasks.data_reflux_task",
     ]
 
     routing_rules = ({"tasks.*": {"queue": "celery"}},)
@@ -96,6 +98,11 @@ def init_app(app: Flask) -> Celery:
             "schedule": crontab(hour=1, minute=0),  # 每日凌晨1点运行
             "options": {"expires": 7200},
         },
+        "flush-reflux-data-every-5-seconds": {
+            "task": "tasks.data_reflux_task.flush_reflux_data",
+            "schedule": timedelta(seconds=5),
+            "options": {"expires": 30},
+        },
     }
 
     # 聚合所有conf更新，减少多次update调用
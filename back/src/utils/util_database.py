@@ -13,8 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import sqlalchemy
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event
+from sqlalchemy.orm import Session
 
 POSTGRES_INDEXES_NAMING_CONVENTION = {
     "ix": "%(column_0_label)s_idx",
@@ -49,3 +51,77 @@ def init_app(app):
     """
     print("SQLALCHEMY_DATABASE_URI:", app.config.get("SQLALCHEMY_DATABASE_URI"))
     db.init_app(app)
+
+
+def invalidate_on_commit(name, tables, invalidate, collect=None):
+    """在事务提交后, 若本事务改动了指定的表则调用 invalidate。
+
+    after_flush 记录记录的新增、删除及关注字段的修改, do_orm_execute 记录批量
+    update / delete, 提交后调用一次 invalidate, 回滚时丢弃记录。
+    用于维护依赖这些表的 Redis 缓存。
+
+    Args:
+        name (str): 标记名, 用于在 session.info 中区分不同的缓存。
+        tables (dict): 表名到关注字段的映射, 字段为空时只关注记录的增删。
+        invalidate (callable): 提交后执行的失效操作。
+        collect (callable, optional): 从变化的记录中取出受影响的缓存键。
+            提供时 invalidate 接收本事务收集到的键集合; 批量 update / delete
+            或 collect 返回 None 时无法确定具体的键, 此时传入 None 表示全部失效。
+    """
+
+    def _is_watched(obj):
+        return getattr(obj, "__tablename__", None) in tables
+
+    def _changes_watched_fields(obj):
+        state = sqlalchemy.inspect(obj)
+        for field in tables[obj.__tablename__]:
+            if field in state.attrs and state.attrs[field].history.has_changes():
+                return True
+        return False
+
+    def _mark(session, obj=None):
+        """记录变化, session.info 中为 True 表示全部失效, 否则为受影响的键集合。"""
+        changed = None if collect is None or obj is None else collect(obj)
+        if changed is None:
+            session.info[name] = True
+            return
+        keys = session.info.setdefault(name, set())
+        if keys is not True:
+            keys.update(changed)
+
+    @event.listens_for(Session, "after_flush")
+    def _mark_flush(session, flush_context):
+        if session.info.get(name) is True:
+            return
+        changed = [
+            obj for obj in list(session.new) + list(session.deleted) if _is_watched(obj)
+        ]
+        changed += [
+            obj for obj in session.dirty if _is_watched(obj) and _changes_watched_fields(obj)
+        ]
+        for obj in changed:
+            _mark(session, obj)
+            if collect is None:
+                return
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _mark_bulk_execute(orm_execute_state):
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.local_table.name in tables:
+            _mark(orm_execute_state.session)
+
+    @event.listens_for(Session, "after_commit")
+    def _invalidate(session):
+        changed = session.info.pop(name, None)
+        if not changed:
+            return
+        if collect is None:
+            invalidate()
+        else:
+            invalidate(None if changed is True else changed)
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session):
+        session.info.pop(name, None)
@@ -0,0 +1,195 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+# Author: LazyLLM Team,  https://github.com/LazyAGI/LazyLLM
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any
+
+from utils.util_redis import redis_client
+
+# 每个连接最多缓存的待发送消息数，超出后丢弃最早的消息
+SEND_QUEUE_SIZE = 256
+# 订阅线程断线后的重连间隔（秒）
+RESUBSCRIBE_INTERVAL = 3
+
+
+class ConnectionSender:
+    """单个WebSocket连接的有界发送队列。
+
+    生产者只把消息放入队列，由独立的发送线程写入socket，
+    客户端较慢时丢弃最早的消息，生产者不会被阻塞。
+    """
+
+    def __init__(self, ws, maxsize: int = SEND_QUEUE_SIZE):
+        self.ws = ws
+        self.dropped = 0
+        self.closed = False
+        self._queue = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def offer(self, payload: str):
+        """放入一条待发送的消息，不阻塞。
+
+        Args:
+            payload (str): 已序列化的消息。
+        """
+        with self._cond:
+            if self.closed:
+                return
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(payload)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._queue.clear()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self.closed:
+                    self._cond.wait()
+                if self.closed:
+                    return
+                payload = self._queue.popleft()
+            try:
+                self.ws.send(payload)
+            except Exception as e:
+                logging.info(f"WebSocket send failed, closing sender: {e}")
+                self.close()
+                return
+
+
+class WebSocketHub:
+    """跨进程的WebSocket消息分发。
+
+    消息通过Redis频道广播，每个进程的订阅线程只投递给本进程持有的连接，
+    因此生产者所在进程不需要持有目标连接。Redis不可用时退化为本进程投递。
+
+    Attributes:
+        channel (str): Redis发布订阅频道名。
+        queue_size (int): 每个连接的发送队列长度。消息是进度快照时可设为1，
+            慢客户端只会收到最新的一条。
+    """
+
+    def __init__(self, channel: str, queue_size: int = SEND_QUEUE_SIZE):
+        self.channel = channel
+        self.queue_size = queue_size
+        self._connections: dict[str, dict[str, ConnectionSender]] = {}
+        self._lock = threading.Lock()
+        self._subscriber = None
+
+    def register(self, key: str, ws) -> str:
+        """登记一个连接。
+
+        Args:
+            key (str): 消息的目标标识，如用户ID或任务ID。
+            ws: WebSocket连接。
+
+        Returns:
+            str: 连接ID，注销时使用。
+        """
+        self._ensure_subscriber()
+        conn_id = str(uuid.uuid4())
+        with self._lock:
+            self._connections.setdefault(key, {})[conn_id] = ConnectionSender(
+                ws, self.queue_size
+            )
+        return conn_id
+
+    def unregister(self, key: str, conn_id: str):
+        """注销连接并停止其发送线程。"""
+        with self._lock:
+            senders = self._connections.get(key, {})
+            sender = senders.pop(conn_id, None)
+            if not senders:
+                self._connections.pop(key, None)
+        if sender:
+            sender.close()
+
+    def has_connection(self, key: str) -> bool:
+        """本进程是否持有该标识的连接。"""
+        with self._lock:
+            return key in self._connections
+
+    def clean_closed(self) -> list:
+        """注销发送失败或已关闭的连接。
+
+        Returns:
+            list: 被清理的连接的目标标识。
+        """
+        closed = []
+        with self._lock:
+            for key, senders in list(self._connections.items()):
+                for conn_id, sender in list(senders.items()):
+                    if sender.closed or getattr(sender.ws, "closed", False):
+                        closed.append((key, conn_id))
+        for key, conn_id in closed:
+            self.unregister(key, conn_id)
+        return [key for key, _ in closed]
+
+    def publish(self, key: str, message: dict[str, Any]):
+        """向目标标识的所有连接（任意进程）发送消息。
+
+        Args:
+            key (str): 消息的目标标识。
+            message (dict[str, Any]): 消息内容。
+        """
+        payload = json.dumps(message)
+        try:
+            redis_client.publish(
+                self.channel, json.dumps({"key": key, "payload": payload})
+            )
+        except Exception as e:
+            logging.warning(f"Publish to {self.channel} failed, deliver locally: {e}")
+            self.deliver_local(key, payload)
+
+    def deliver_local(self, key: str, payload: str):
+        """投递给本进程持有的连接。"""
+        with self._lock:
+            senders = list(self._connections.get(key, {}).values())
+        for sender in senders:
+            sender.offer(payload)
+
+    def _ensure_subscriber(self):
+        with self._lock:
+            if self._subscriber is None:
+                self._subscriber = threading.Thread(
+                    target=self._subscribe_loop, daemon=True
+                )
+                self._subscriber.start()
+
+    def _subscribe_loop(self):
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    data = json.loads(item["data"])
+                    self.deliver_local(data["key"], data["payload"])
+            except Exception as e:
+                logging.warning(f"Subscription to {self.channel} lost: {e}")
+                time.sleep(RESUBSCRIBE_INTERVAL)
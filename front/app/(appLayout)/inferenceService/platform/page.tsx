@@ -21,6 +21,7 @@ const showText: any = {
   InQueue: { text: '启动中', color: 'processing' },
   Running: { text: '启动中', color: 'processing' },
   Pending: { text: '启动中', color: 'processing' },
+  Unknown: { text: '状态获取中', color: 'warning' },
 }
 const formItemLayout = {
   labelCol: {